@@ -1,28 +1,25 @@
+from typing import TYPE_CHECKING
+
 import numpy as np
-import tensorflow as tf
-from tensorflow.keras import Input
-from tensorflow.keras import Sequential
-from tensorflow.keras.layers import Conv2D, Dense
-from tensorflow.keras.layers import Flatten
-from tensorflow.keras.optimizers import Adam
-from tensorflow_core.python.keras.layers import GlobalMaxPooling2D
-
-from agents.trainable_agent import TrainableAgent
+
+from agents.trainable_agent import TrainableAgent, configure_tensorflow
+from utils.position_codec import decode_split
 from utils.reshapes import split
 
-try:
-	physical_devices = tf.config.experimental.list_physical_devices('GPU')
-	tf.config.experimental.set_memory_growth(physical_devices[0], True)
-	tf.config.optimizer.set_jit(True)  # XLA enabled
-except:
-	pass
+if TYPE_CHECKING:
+	from tensorflow.keras import Sequential
 
 
 class CNNTrainableAgent(TrainableAgent):
 	def __str__(self) -> str:
 		return f'CNN{super().__str__()})'
 
-	def create_model(self, verbose: bool = False, lr: float = 0.001) -> Sequential:
+	def create_model(self, verbose: bool = False, lr: float = 0.001) -> 'Sequential':
+		configure_tensorflow()
+		from tensorflow.keras import Input, Sequential
+		from tensorflow.keras.layers import Conv2D, Dense, Flatten, GlobalMaxPooling2D
+		from tensorflow.keras.optimizers import Adam
+
 		model: Sequential = Sequential([
 			Input(shape=(2, self.board_size, self.board_size)),
 			Conv2D(self.board_size ** 2 * 4, (3, 3), padding='same', data_format='channels_first', activation='relu',
@@ -42,3 +39,6 @@ class CNNTrainableAgent(TrainableAgent):
 
 	def board_to_nn_input(self, board: np.array) -> np.array:
 		return split(board, self.color)
+
+	def positions_to_nn_input(self, positions: np.array) -> np.array:
+		return decode_split(positions, self.board_size)
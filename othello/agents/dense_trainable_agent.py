@@ -1,17 +1,27 @@
+from typing import Callable, List, TYPE_CHECKING
+
 import numpy as np
-from tensorflow.keras import Sequential, Input
-from tensorflow.keras.layers import Dense
-from tensorflow.keras.optimizers import Adam
 
-from agents.trainable_agent import TrainableAgent
+from agents.trainable_agent import TrainableAgent, configure_tensorflow
+from utils.position_codec import decode_flatten_negative
 from utils.reshapes import flatten_negative
 
+if TYPE_CHECKING:
+	from tensorflow.keras import Sequential
+
 
 class DenseTrainableAgent(TrainableAgent):
+	inference_copies_weights: bool = True
+
 	def __str__(self) -> str:
 		return f'Dense{super().__str__()})'
 
-	def create_model(self, verbose: bool = False, lr: float = 0.01) -> Sequential:
+	def create_model(self, verbose: bool = False, lr: float = 0.01) -> 'Sequential':
+		configure_tensorflow()
+		from tensorflow.keras import Input, Sequential
+		from tensorflow.keras.layers import Dense
+		from tensorflow.keras.optimizers import Adam
+
 		model: Sequential = Sequential([
 			Input(shape=(self.board_size ** 2)),
 			Dense(self.board_size ** 2, activation='relu', kernel_initializer='he_uniform'),
@@ -23,5 +33,25 @@ class DenseTrainableAgent(TrainableAgent):
 
 		return model
 
+	def create_inference(self) -> Callable[[np.array], np.array]:
+		# a small fully connected network is fastest as plain matrix products on a copy of the weights
+		weights: List[np.array] = self.dnn.get_weights()
+		kernels: List[np.array] = weights[0::2]
+		biases: List[np.array] = weights[1::2]
+
+		def forward(states: np.array) -> np.array:
+			x: np.array = states.astype(np.float32)
+			for kernel, bias in zip(kernels[:-1], biases[:-1]):
+				x: np.array = np.maximum(x @ kernel + bias, 0.0)
+			x: np.array = x @ kernels[-1] + biases[-1]
+			# softmax
+			x: np.array = np.exp(x - x.max(axis=1, keepdims=True))
+			return x / x.sum(axis=1, keepdims=True)
+
+		return forward
+
 	def board_to_nn_input(self, board: np.array) -> np.array:
 		return flatten_negative(board, self.color)
+
+	def positions_to_nn_input(self, positions: np.array) -> np.array:
+		return decode_flatten_negative(positions, self.board_size)
@@ -1,5 +1,3 @@
-import tkinter as tk
-
 import numpy as np
 
 from agents.agent import Agent
@@ -20,6 +18,9 @@ class HumanAgent(Agent):
 		return f'Human{super().__str__()})'
 
 	def __update_board(self, board: Board, legal_directions: dict) -> None:
+		# tkinter is only imported when a human plays
+		import tkinter as tk
+
 		disks: np.array = board.board
 		board_size: int = board.board_size
 		if self.first_move:
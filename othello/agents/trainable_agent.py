@@ -1,22 +1,55 @@
 from abc import abstractmethod
-from typing import Union
+from functools import lru_cache
+from typing import Callable, TYPE_CHECKING, Tuple, Union
 
 import numpy as np
-from tensorflow.keras import Sequential
 
 from agents.agent import Agent
 from game_logic.board import Board
+from policies.endgame_untrainable_policy import EndgameUntrainablePolicy
 from policies.optimal_trainable_policy import OptimalTrainablePolicy
 from policies.trainable_policy import TrainablePolicy
+from policies.untrainable_policy import UntrainablePolicy
 from rewards.reward import Reward
 from utils.color import Color
+from utils.inference_cache import InferenceCache
+from utils.position_codec import decode_legal_masks
+from utils.prioritized_replay_buffer import PrioritizedReplayBuffer
+from utils.profiler import profiler
 from utils.replay_buffer import ReplayBuffer
+from utils.td_targets import masked_max, n_step_returns
 from utils.types import Action, Actions
 
+if TYPE_CHECKING:
+	# tensorflow takes seconds to import, it is only imported once a network is made
+	from tensorflow.keras import Sequential
+
+
+@lru_cache(maxsize=None)
+def configure_tensorflow() -> None:
+	# once per process, before the first network is made, instead of on import
+	import tensorflow as tf
+
+	try:
+		physical_devices = tf.config.experimental.list_physical_devices('GPU')
+		tf.config.experimental.set_memory_growth(physical_devices[0], True)
+		tf.config.optimizer.set_jit(True)  # XLA enabled
+	except:
+		pass
+
 
 class TrainableAgent(Agent):
+	# whether create_inference works on a copy of the weights, which is made again for every weights version
+	inference_copies_weights: bool = False
+
 	def __init__(self, color: Color, model_name: str, train_policy: TrainablePolicy, immediate_reward: Reward,
-	             final_reward: Reward, board_size: int, discount_factor: float = 1.0) -> None:
+	             final_reward: Reward, board_size: int, discount_factor: float = 1.0,
+	             endgame_policy: Union[EndgameUntrainablePolicy, None] = None, inference_cache_size: int = 2 ** 16,
+	             replay_capacity: int = 0, batch_size: int = 256, num_steps: int = 1) -> None:
+		assert 0 <= replay_capacity, f'Invalid replay capacity: replay_capacity should be at least 0, but got {replay_capacity}'
+		assert 0 < batch_size, f'Invalid batch size: batch_size should be positive, but got {batch_size}'
+		assert 1 <= num_steps, f'Invalid number of steps: num_steps should be at least 1, but got {num_steps}'
+
 		super().__init__(color)
 
 		self.weights_path: str = f'weights\\{model_name}_{self.color.name}'
@@ -26,10 +59,31 @@ class TrainableAgent(Agent):
 		self.final_reward: Reward = final_reward
 		self.board_size = board_size
 		self.discount_factor: float = discount_factor
+		# number of own moves of real rewards in a target before bootstrapping from the network
+		self.num_steps: int = num_steps
+		# solves the rest of the game exactly once few enough free spots are left
+		self.endgame_policy: Union[EndgameUntrainablePolicy, None] = endgame_policy
+		# searches with the network instead of playing its best q-value when not in train mode, e.g. MCTS
+		# set after creating the agent, a search usually needs the agent itself
+		self.search_policy: Union[UntrainablePolicy, None] = None
+		# q-values of positions seen with the current weights version, a size of 0 disables the cache
+		# agents sharing a network should share the cache too
+		self.inference_cache: Union[InferenceCache, None] = InferenceCache(board_size, inference_cache_size) \
+			if inference_cache_size > 0 else None
+		# moves of past games to sample minibatches from, a capacity of 0 trains on each game on its own
+		self.memory: Union[PrioritizedReplayBuffer, None] = PrioritizedReplayBuffer(replay_capacity, board_size) \
+			if replay_capacity > 0 else None
+		self.batch_size: int = batch_size
+		# training losses since they were last read with pop_mean_loss
+		self.loss_sum: float = 0.0
+		self.num_losses: int = 0
 
-		self.replay_buffer: ReplayBuffer = ReplayBuffer((board_size ** 2 - 4) // 2)
 		self.train_mode: Union[bool, None] = None
 
+		# q-values of a batch of network inputs without the overhead of predict,
+		# with the network and the weights version it was made for
+		self._inference: Union[Tuple[Sequential, int, Callable[[np.array], np.array]], None] = None
+
 		try:
 			# create new model
 			self.dnn: Sequential = self.create_model()
@@ -47,48 +101,157 @@ class TrainableAgent(Agent):
 		else:
 			return f'Trainable{super().__str__()}, policy={self.test_policy}'
 
-	def train(self) -> None:
+	def __getstate__(self) -> dict:
+		# networks cannot be pickled, send their weights to other processes instead
+		state: dict = self.__dict__.copy()
+		state['dnn'] = self.dnn.get_weights()
+		# traced functions cannot be pickled either, they are made again when needed
+		state['_inference'] = None
+		# only the learner trains, other processes do not need its memory
+		state['memory'] = None
+
+		return state
+
+	def __setstate__(self, state: dict) -> None:
+		weights: list = state.pop('dnn')
+		self.__dict__.update(state)
+		self.dnn: Sequential = self.create_model()
+		self.set_weights(weights)
+
+	def train(self, replay_buffer: ReplayBuffer) -> None:
 		assert self.train_mode, 'Cannot train while not in train mode'
 
-		states = np.array([self.board_to_nn_input(move[0]) for move in self.replay_buffer.buffer])
-		# the goal is to update these old_q_values
-		old_q_values = self.dnn.predict(states)
-
-		for i in range(len(self.replay_buffer.buffer) - 1):
-			# get move i: (s, a, r, t)
-			prev_state, prev_action, prev_reward, _, locations = self.replay_buffer.buffer[i]
-			# get move i+1: (s', a', r', t')
-			curr_state, _, _, _, _ = self.replay_buffer.buffer[i + 1]
-
-			# calculate the new estimate of Q(s,a)
-			# via formula Q(s,a) = r + gamma * max Q(s', a')
-			# but only consider the legal actions a'
-			if len(locations) == 0:
-				new_q_state_s = prev_reward
-			else:
-				indices = [row * self.board_size + col for (row, col) in locations]
-				q_values = old_q_values[i + 1, indices]
-				new_q_state_s = prev_reward + self.discount_factor * q_values.max()
-			old_q_values[i, prev_action[0] * self.board_size + prev_action[1]] = new_q_state_s
+		if self.memory is not None:
+			# remember the game and learn from a minibatch of all remembered games
+			self.memory.add_episode(replay_buffer)
+			self.train_on_memory()
+			return
+
+		positions, actions, rewards, terminals = replay_buffer.to_arrays(self.board_size)
+		# the game is over after its last move
+		terminals[-1] = True
+		states: np.array = self.positions_to_nn_input(positions)
+		legal_masks: np.array = decode_legal_masks(positions, self.board_size)
+		# the goal is to update these q_values, the bootstrap states are states of the same game
+		q_values: np.array = self.dnn.predict(states)
 
-		# use final reward
-		last_state, last_action, last_reward, last_terminal, _ = self.replay_buffer.buffer[-1]
-		old_q_values[-1, last_action[0] * self.board_size + last_action[1]] = last_reward
+		rows: np.array = np.arange(len(positions))
+		returns, discounts, bootstrap_rows = n_step_returns(rows, rewards, terminals, self.num_steps,
+		                                                    self.discount_factor)
+		# Q(s,a) = r + gamma * max Q(s', a') over the legal actions a' of s', or just r for the last move
+		q_values[rows, actions] = returns + discounts * masked_max(q_values[bootstrap_rows], legal_masks[bootstrap_rows])
 
 		# train the NN on the now updated q_values
-		self.dnn.train_on_batch(states, old_q_values)
+		with profiler.phase('train_on_batch'):
+			self.add_loss(self.dnn.train_on_batch(states, q_values))
+		self.weights_changed()
+
+	def train_on_memory(self) -> None:
+		indices, weights = self.memory.sample(self.batch_size)
+		positions, actions, returns, discounts, bootstrap_positions = self.memory.get_batch(
+			indices, self.num_steps, self.discount_factor)
+		states: np.array = self.positions_to_nn_input(positions)
+
+		# the goal is to update these q_values, one network call for both states and bootstrap states
+		q_values: np.array = self.dnn.predict(np.concatenate([states, self.positions_to_nn_input(bootstrap_positions)]))
+		q_values, bootstrap_q_values = q_values[:len(indices)], q_values[len(indices):]
+
+		rows: np.array = np.arange(len(indices))
+		bootstrap_legal_masks: np.array = decode_legal_masks(bootstrap_positions, self.board_size)
+		targets: np.array = returns + discounts * masked_max(bootstrap_q_values, bootstrap_legal_masks)
+		errors: np.array = targets - q_values[rows, actions]
+		q_values[rows, actions] = targets
+
+		# train the NN on the now updated q_values, weighted to undo the bias of prioritized sampling
+		with profiler.phase('train_on_batch'):
+			self.add_loss(self.dnn.train_on_batch(states, q_values, sample_weight=weights))
+		self.memory.update_priorities(indices, errors)
+		self.weights_changed()
+
+	def add_loss(self, loss: float) -> None:
+		self.loss_sum += float(loss)
+		self.num_losses += 1
+
+	def pop_mean_loss(self) -> Union[float, None]:
+		# mean training loss since the last call, None without training
+		mean_loss: Union[float, None] = self.loss_sum / self.num_losses if self.num_losses > 0 else None
+		self.loss_sum: float = 0.0
+		self.num_losses: int = 0
+
+		return mean_loss
+
+	def uses_network(self, board: Board) -> bool:
+		# whether the next action on this board is picked from q-values
+		if self.search_policy is not None and not self.train_mode:
+			return False
+		return self.endgame_policy is None or not self.endgame_policy.applies(board)
+
+	def predict(self, states: np.array) -> np.array:
+		# q-values of a batch of network inputs
+		profiler.count('predicted', len(states))
+		with profiler.phase('predict'):
+			if self.inference_cache is not None:
+				return self.inference_cache.predict(states, self.infer, self.weights_version)
+			return self.infer(states)
+
+	def infer(self, states: np.array) -> np.array:
+		# the network may have been replaced, e.g. to share it with another agent,
+		# or trained by another agent sharing it, which only changes the version on the network
+		version: int = self.weights_version if self.inference_copies_weights else 0
+		if self._inference is None or self._inference[0] is not self.dnn or self._inference[1] != version:
+			self._inference = (self.dnn, version, self.create_inference())
+
+		return self._inference[2](states)
+
+	def create_inference(self) -> Callable[[np.array], np.array]:
+		# predict sets up a data pipeline on every call, a traced call of the network does not
+		# the traced call reads the current weights of the network, so it never has to be traced again
+		import tensorflow as tf
+
+		dnn: Sequential = self.dnn
+		function = tf.function(lambda states: dnn(states, training=False),
+		                       input_signature=[tf.TensorSpec((None,) + tuple(dnn.input_shape[1:]), tf.float32)])
+
+		return lambda states: function(states.astype(np.float32)).numpy()
 
 	def next_action(self, board: Board, legal_actions: Actions) -> Action:
-		q_values = self.dnn.predict(np.expand_dims(self.board_to_nn_input(board.board), axis=0))
-		if self.train_mode:
-			action: Action = self.train_policy.get_action(legal_actions, q_values)
-		else:
-			action: Action = self.test_policy.get_action(legal_actions, q_values)
+		if not self.uses_network(board):
+			with profiler.phase('policy'):
+				if self.endgame_policy is not None and self.endgame_policy.applies(board):
+					return self.endgame_policy.get_action(board, legal_actions, self.color)
+				return self.search_policy.get_action(board, legal_actions, self.color)
+
+		q_values = self.predict(np.expand_dims(self.board_to_nn_input(board.board), axis=0))
+		action: Action = self.get_action(legal_actions, q_values)
 
 		return action
 
+	def get_action(self, legal_actions: Actions, q_values: np.array) -> Action:
+		# q_values has a batch dimension of 1
+		with profiler.phase('policy'):
+			if self.train_mode:
+				action: Action = self.train_policy.get_action(legal_actions, q_values)
+			else:
+				action: Action = self.test_policy.get_action(legal_actions, q_values)
+
+		return action
+
+	def set_weights(self, weights: list) -> None:
+		self.dnn.set_weights(weights)
+		self.weights_changed()
+
+	@property
+	def weights_version(self) -> int:
+		# kept on the network, so agents sharing a network see each other's changes
+		return getattr(self.dnn, 'weights_version', 0)
+
+	def weights_changed(self) -> None:
+		# cached q-values and copied weights of older versions are replaced when they are used next
+		self.dnn.weights_version = self.weights_version + 1
+
 	def load_weights(self):
 		self.dnn.load_weights(self.weights_path)
+		self.weights_changed()
 		print(f'Loaded weights from {self.weights_path}')
 
 	def save_weights(self):
@@ -96,9 +259,15 @@ class TrainableAgent(Agent):
 		print(f'Saved weights to {self.weights_path}')
 
 	@abstractmethod
-	def create_model(self, verbose: bool = False, lr: float = 0.01) -> Sequential:
+	def create_model(self, verbose: bool = False, lr: float = 0.01) -> 'Sequential':
 		raise NotImplementedError
 
 	@abstractmethod
 	def board_to_nn_input(self, board: np.array) -> np.array:
+		# a single board, or a batch of boards along the first axis
+		raise NotImplementedError
+
+	@abstractmethod
+	def positions_to_nn_input(self, positions: np.array) -> np.array:
+		# a batch of positions encoded with utils.position_codec, as seen by the agent that played them
 		raise NotImplementedError
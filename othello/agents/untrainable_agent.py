@@ -2,6 +2,7 @@ from agents.agent import Agent
 from game_logic.board import Board
 from policies.untrainable_policy import UntrainablePolicy
 from utils.color import Color
+from utils.profiler import profiler
 from utils.types import Actions, Action
 
 
@@ -15,6 +16,7 @@ class UntrainableAgent(Agent):
 		return f'Untrainable{super().__str__()}, policy={self.policy})'
 
 	def next_action(self, board: Board, legal_actions: Actions) -> Action:
-		action: Action = self.policy.get_action(board, legal_actions, self.color)
+		with profiler.phase('policy'):
+			action: Action = self.policy.get_action(board, legal_actions, self.color)
 
 		return action
@@ -0,0 +1,66 @@
+from time import perf_counter
+from typing import Callable, List
+
+import numpy as np
+
+from agents.cnn_trainable_agent import CNNTrainableAgent
+from agents.dense_trainable_agent import DenseTrainableAgent
+from agents.trainable_agent import TrainableAgent
+from game_logic.bit_board import BitBoard
+from game_logic.board import Board
+from policies.optimal_trainable_policy import OptimalTrainablePolicy
+from rewards.no_reward import NoReward
+from utils.color import Color
+
+
+def time_per_call(function: Callable[[np.array], np.array], states: np.array, repeats: int) -> float:
+	# warm up, e.g. tracing
+	function(states[:1])
+
+	start_time: float = perf_counter()
+	for i in range(repeats):
+		function(states[i % len(states):i % len(states) + 1])
+
+	return (perf_counter() - start_time) / repeats
+
+
+def random_boards(board_size: int, num_boards: int) -> List[np.array]:
+	boards: List[np.array] = []
+	while len(boards) < num_boards:
+		board: Board = BitBoard(board_size, random_start=True)
+		color: Color = Color.BLACK
+		while len(boards) < num_boards:
+			legal_actions = board.get_legal_actions(color)
+			if not legal_actions:
+				break
+			location = list(legal_actions)[np.random.randint(len(legal_actions))]
+			board.take_action(location, legal_actions[location], color)
+			boards.append(board.board.copy())
+			color: Color = Color.WHITE if color is Color.BLACK else Color.BLACK
+
+	return boards
+
+
+if __name__ == '__main__':
+	# latency of one move decision: the network's predict against the inference path used in games
+	board_size: int = 8
+	repeats: int = 200
+
+	boards: List[np.array] = random_boards(board_size, 64)
+	for agent_class in [DenseTrainableAgent, CNNTrainableAgent]:
+		agent: TrainableAgent = agent_class(
+			color=Color.BLACK,
+			model_name=f'benchmark_{agent_class.__name__}',
+			train_policy=OptimalTrainablePolicy(board_size),
+			immediate_reward=NoReward(),
+			final_reward=NoReward(),
+			board_size=board_size,
+			inference_cache_size=0,
+		)
+		states: np.array = np.array([agent.board_to_nn_input(board) for board in boards])
+
+		predict_time: float = time_per_call(agent.dnn.predict, states, repeats)
+		infer_time: float = time_per_call(agent.infer, states, repeats)
+		difference: float = np.abs(agent.dnn.predict(states) - agent.infer(states)).max()
+		print(f'{agent_class.__name__:>20}: predict {predict_time * 1000:>8.3f} ms, infer {infer_time * 1000:>8.3f} ms, '
+		      f'speedup {predict_time / infer_time:>6.1f}x, max difference {difference:.2e}')
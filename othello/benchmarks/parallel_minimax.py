@@ -0,0 +1,48 @@
+import os
+from time import perf_counter
+from typing import Dict, List, Tuple
+
+from game_logic.board import Board
+from game_logic.perft import Position, get_positions, set_up
+from move_orderings.killer_move_ordering import KillerMoveOrdering
+from policies.minimax_untrainable_policy import MinimaxUntrainablePolicy
+from rewards.weights_reward import WeightsReward
+from utils.risk_regions import heur
+from utils.types import Actions, Location
+
+if __name__ == '__main__':
+	# speedup and search overhead of root splitting against one process at equal depth
+	board_size: int = 8
+	depth: int = 5
+	workers: List[int] = sorted({1, 2, 4, os.cpu_count() or 1})
+	positions: List[Position] = get_positions(board_size)
+
+	# (seconds, nodes, locations) per number of workers
+	results: Dict[int, Tuple[float, int, List[Location]]] = {}
+	for num_workers in workers:
+		policy: MinimaxUntrainablePolicy = MinimaxUntrainablePolicy(
+			WeightsReward(heur(board_size)), depth, move_ordering=KillerMoveOrdering(), num_workers=num_workers)
+		duration: float = 0.0
+		num_nodes: int = 0
+		locations: List[Location] = []
+		# the workers are started by now
+		for moves, color in positions:
+			board: Board = set_up(Board, board_size, moves)
+			legal_actions: Actions = board.get_legal_actions(color)
+			if not legal_actions:
+				continue
+			start_time: float = perf_counter()
+			location, _ = policy.get_action(board, legal_actions, color)
+			duration += perf_counter() - start_time
+			num_nodes += policy.num_nodes
+			locations.append(location)
+		policy.close()
+		results[num_workers] = duration, num_nodes, locations
+
+		serial_duration, serial_num_nodes, serial_locations = results[1]
+		speedup: float = serial_duration / duration
+		overhead: float = (num_nodes / serial_num_nodes - 1) * 100
+		same: float = sum(a == b for a, b in zip(locations, serial_locations)) / len(locations) * 100
+		print(f'{num_workers:>2} workers: {duration:>7.2f} s, {num_nodes:>8} nodes, speedup {speedup:>5.2f}, '
+		      f'search overhead {overhead:>6.1f} %, same location {same:>5.1f} %')
+	print(f'{os.cpu_count()} cores, depth {depth}, {len(results[1][2])} positions of {board_size}x{board_size}')
@@ -0,0 +1,38 @@
+from time import perf_counter
+from typing import Dict, List, Type
+
+from game_logic.bit_board import BitBoard
+from game_logic.board import Board
+from game_logic.perft import KNOWN_PERFT_8X8, Position, compare, get_positions, perft, set_up
+from utils.color import Color
+
+if __name__ == '__main__':
+	# move generation speed and correctness of every backend against the reference Board
+	board_classes: List[Type[Board]] = [Board, BitBoard]
+	# deeper on small boards, which have fewer moves per ply
+	depths: Dict[int, int] = {4: 8, 6: 5, 8: 4, 10: 4, 12: 3}
+	check_depth: int = 3
+
+	for board_size, depth in depths.items():
+		positions: List[Position] = [([], Color.BLACK)] + get_positions(board_size)
+		for board_class in board_classes:
+			num_leaves: int = 0
+			start_time: float = perf_counter()
+			for moves, color in positions:
+				num_leaves += perft(set_up(board_class, board_size, moves), color, depth)
+			duration: float = perf_counter() - start_time
+			print(f'{board_size:>2}x{board_size:<2} {board_class.__name__:>8}: {len(positions):>3} positions, depth {depth}, '
+			      f'{num_leaves:>10} leaves, {num_leaves / duration:>10.0f} leaves/s')
+
+			if board_class is not Board:
+				for moves, color in positions:
+					compare(set_up(board_class, board_size, moves), set_up(Board, board_size, moves), color, check_depth)
+				print(f'{"":>15} same legal actions, flips, disks and hashes as Board to depth {check_depth}')
+
+	# known counts from the initial position
+	for board_class in board_classes:
+		for depth, known_num_leaves in enumerate(KNOWN_PERFT_8X8[:8]):
+			num_leaves: int = perft(board_class(8), Color.BLACK, depth)
+			assert num_leaves == known_num_leaves, \
+				f'Invalid perft({depth}) for {board_class.__name__}: expected {known_num_leaves}, but got {num_leaves}'
+		print(f'{board_class.__name__:>8}: perft matches the known 8x8 counts to depth 7')
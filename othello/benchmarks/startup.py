@@ -0,0 +1,79 @@
+import json
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from time import perf_counter
+from typing import List, Tuple
+
+# modules that take seconds to import, and are only needed for networks, plots and the GUI
+HEAVY_MODULES: List[str] = ['tensorflow', 'matplotlib', 'tkinter']
+
+# modules a run without networks, plots or GUI imports
+ENTRY_POINTS: List[str] = [
+	'game_logic.game',
+	'agents.untrainable_agent',
+	'policies.minimax_untrainable_policy',
+	'utils.endgame_solver',
+	'utils.parallel_evaluation',
+	# importing the agents is cheap, making their networks is not
+	'agents.cnn_trainable_agent',
+	'agents.dense_trainable_agent',
+	'agents.human_agent',
+	'utils.global_config',
+]
+
+# a process started for a tournament or solver should be ready in well under this
+BUDGET: float = 1.0
+
+_IMPORT: str = '''
+import json, sys
+from time import perf_counter
+start_time = perf_counter()
+import {module}
+print(json.dumps([perf_counter() - start_time, [name for name in {heavy} if name in sys.modules]]))
+'''
+
+
+def import_time(module: str) -> Tuple[float, List[str]]:
+	"""Time to import module in a fresh interpreter, and the heavy modules it imported."""
+	output: str = subprocess.run([sys.executable, '-c', _IMPORT.format(module=module, heavy=HEAVY_MODULES)],
+	                             capture_output=True, text=True, check=True).stdout
+	duration, imported = json.loads(output)
+
+	return duration, imported
+
+
+def _ready() -> List[str]:
+	# runs in the worker, after it imported what it needs to play games
+	import utils.parallel_evaluation
+
+	return [name for name in HEAVY_MODULES if name in sys.modules]
+
+
+def worker_start_time() -> Tuple[float, List[str]]:
+	"""Time until a freshly spawned worker is ready to play games, and the heavy modules it imported."""
+	start_time: float = perf_counter()
+	with ProcessPoolExecutor(1, get_context('spawn')) as executor:
+		imported: List[str] = executor.submit(_ready).result()
+
+	return perf_counter() - start_time, imported
+
+
+if __name__ == '__main__':
+	# startup of runs without networks, e.g. tournaments between untrainable agents and endgame solving
+	failures: List[str] = []
+	for module in ENTRY_POINTS:
+		duration, imported = import_time(module)
+		print(f'{module:>40}: {duration * 1000:>8.1f} ms {", ".join(imported)}')
+		failures += [f'{module} imports {name}' for name in imported]
+		if duration > BUDGET:
+			failures.append(f'{module} takes {duration:.2f} s to import')
+
+	duration, imported = worker_start_time()
+	print(f'{"spawned worker":>40}: {duration * 1000:>8.1f} ms {", ".join(imported)}')
+	failures += [f'a spawned worker imports {name}' for name in imported]
+	if duration > BUDGET:
+		failures.append(f'a spawned worker takes {duration:.2f} s to start')
+
+	assert not failures, 'Slow startup:\n\t' + '\n\t'.join(failures)
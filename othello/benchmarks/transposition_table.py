@@ -0,0 +1,44 @@
+from time import perf_counter
+from typing import List
+
+from game_logic.board import Board
+from game_logic.perft import Position, get_positions, set_up
+from move_orderings.killer_move_ordering import KillerMoveOrdering
+from policies.minimax_untrainable_policy import MinimaxUntrainablePolicy
+from rewards.weights_reward import WeightsReward
+from utils.risk_regions import heur
+from utils.types import Actions
+
+if __name__ == '__main__':
+	# nodes and time of minimax with and without the transposition table at equal depth
+	board_size: int = 8
+	depths: List[int] = [5, 6, 7, 8]
+	# the positions after a quarter and a half of the spots of two games, deeper searches take minutes each
+	positions: List[Position] = [position for position in get_positions(board_size, num_games=2)
+	                             if len(position[0]) < (board_size ** 2 - 4) * 3 // 4]
+
+	for depth in depths:
+		# (seconds, nodes) without and with the table
+		results: List[List[float]] = []
+		for transposition_table_size in [0, 2 ** 20]:
+			duration: float = 0.0
+			num_nodes: int = 0
+			for moves, color in positions:
+				board: Board = set_up(Board, board_size, moves)
+				legal_actions: Actions = board.get_legal_actions(color)
+				if not legal_actions:
+					continue
+				# a new policy per position, so no search profits from the table of another
+				policy: MinimaxUntrainablePolicy = MinimaxUntrainablePolicy(
+					WeightsReward(heur(board_size)), depth, transposition_table_size, move_ordering=KillerMoveOrdering())
+				start_time: float = perf_counter()
+				policy.get_action(board, legal_actions, color)
+				duration += perf_counter() - start_time
+				num_nodes += policy.num_nodes
+			results.append([duration, num_nodes])
+
+		(off_duration, off_num_nodes), (on_duration, on_num_nodes) = results
+		print(f'depth {depth}: {off_num_nodes:>9} nodes {off_duration:>7.2f} s without, '
+		      f'{on_num_nodes:>9} nodes {on_duration:>7.2f} s with the table, '
+		      f'{(1 - on_num_nodes / off_num_nodes) * 100:>5.1f} % fewer nodes, {off_duration / on_duration:>5.2f}x as fast')
+	print(f'{len(positions)} positions of {board_size}x{board_size}')
@@ -0,0 +1,271 @@
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+
+from game_logic.board import Board
+from utils.color import Color
+from utils.types import Actions, Direction, Directions, Location, Locations
+
+# (shift, mask) per direction, where mask removes the disks that wrapped around to the other side of the board
+Shifts = List[Tuple[int, int]]
+
+
+class BitBoard(Board):
+	"""Board backed by two integers, one per color, with bit i * board_size + j set for a disk on (i, j)."""
+
+	# initialize static variables
+	_shifts: Dict[int, Shifts] = {}
+
+	def _place_initial_disks(self) -> None:
+		board_size: int = self.board_size
+		center: int = board_size // 2
+		white: int = (1 << ((center - 1) * board_size + center - 1)) | (1 << (center * board_size + center))
+		black: int = (1 << (center * board_size + center - 1)) | (1 << ((center - 1) * board_size + center))
+
+		# indexed by color value
+		self.bitboards: List[int] = [black, white]
+		self.full: int = (1 << board_size ** 2) - 1
+		self.shifts: Shifts = self._get_shifts(board_size)
+		self.direction_shifts: Dict[Direction, Tuple[int, int]] = dict(zip(self._directions, self.shifts))
+
+		# cache of the numpy representation, invalidated on every action
+		self._board: Union[np.array, None] = None
+		self._prev_board: Union[np.array, None] = None
+
+	@property
+	def board(self) -> np.array:
+		if self._board is None:
+			self._board = self._to_array(self.bitboards)
+
+		return self._board
+
+	@property
+	def prev_bitboards(self) -> Union[List[int], None]:
+		if not self.history:
+			return None
+
+		location, flips, _, color = self.history[-1]
+		bit: int = 1 << (location[0] * self.board_size + location[1])
+		prev_bitboards: List[int] = list(self.bitboards)
+		prev_bitboards[color.value] &= ~(bit | flips)
+		prev_bitboards[1 - color.value] |= flips
+
+		return prev_bitboards
+
+	@property
+	def prev_board(self) -> Union[np.array, None]:
+		if self._prev_board is None and self.prev_bitboards is not None:
+			self._prev_board = self._to_array(self.prev_bitboards)
+
+		return self._prev_board
+
+	@property
+	def last_action(self) -> Union[Tuple[Location, Locations, Color], None]:
+		if not self.history:
+			return None
+
+		location, flips, _, color = self.history[-1]
+		flipped: Locations = []
+		while flips:
+			flip: int = flips & -flips
+			flips ^= flip
+			flipped.append(divmod(flip.bit_length() - 1, self.board_size))
+
+		return location, flipped, color
+
+	def get_deepcopy(self):
+		new_board: BitBoard = BitBoard.__new__(BitBoard)
+		new_board.__dict__.update(self.__dict__)
+		new_board.bitboards = list(self.bitboards)
+		new_board.history = list(self.history)
+		new_board.prev_hashes = list(self.prev_hashes)
+		new_board._board = None
+		new_board._prev_board = None
+
+		return new_board
+
+	def get_legal_actions(self, color: Color) -> Actions:
+		own: int = self.bitboards[color.value]
+		opponent: int = self.bitboards[1 - color.value]
+		empty: int = self.full & ~(own | opponent)
+
+		# legal locations per walking direction
+		moves: List[int] = []
+		all_moves: int = 0
+		for shift, mask in self.shifts:
+			masked_opponent: int = opponent & mask
+			masked_empty: int = empty & mask
+			# a line of opponent's disks is at most board_size - 2 long
+			if shift > 0:
+				line: int = (own << shift) & masked_opponent
+				for _ in range(self.board_size - 3):
+					line |= (line << shift) & masked_opponent
+				direction_moves: int = (line << shift) & masked_empty
+			else:
+				line: int = (own >> -shift) & masked_opponent
+				for _ in range(self.board_size - 3):
+					line |= (line >> -shift) & masked_opponent
+				direction_moves: int = (line >> -shift) & masked_empty
+			moves.append(direction_moves)
+			all_moves |= direction_moves
+
+		# walking from own disks in a direction finds moves that flip in the opposite direction
+		moves: List[int] = moves[4:] + moves[:4]
+
+		# lowest bits first, which is the same row-major order as Board
+		legal_actions: Actions = {}
+		while all_moves:
+			bit: int = all_moves & -all_moves
+			all_moves ^= bit
+			legal_directions: Directions = [direction for direction, direction_moves in zip(self._directions, moves)
+			                                if direction_moves & bit]
+			legal_actions[divmod(bit.bit_length() - 1, self.board_size)] = legal_directions
+
+		return legal_actions
+
+	def take_action(self, location: Location, legal_directions: Directions, color: Color) -> Tuple[bool, Locations]:
+		# policies may pick numpy integers, which overflow when shifted into the high bits
+		location: Location = (int(location[0]), int(location[1]))
+		bit: int = 1 << (location[0] * self.board_size + location[1])
+		own: int = self.bitboards[color.value]
+		opponent: int = self.bitboards[1 - color.value]
+
+		# check if location does point to an empty spot
+		assert not (own | opponent) & bit, f'Invalid location: location ({location}) does not point to an empty spot on the board)'
+
+		# turn around opponent's disks
+		flips: int = 0
+		for direction in legal_directions:
+			shift, mask = self.direction_shifts[direction]
+			line: int = 0
+			cursor: int = (bit << shift if shift > 0 else bit >> -shift) & mask
+			while cursor & opponent:
+				line |= cursor
+				cursor = (cursor << shift if shift > 0 else cursor >> -shift) & mask
+			if cursor & own:
+				# encountered own disk
+				flips |= line
+
+		# put down own disk in the provided location
+		self.bitboards[color.value] = own | bit | flips
+		self.bitboards[1 - color.value] = opponent & ~flips
+		self._board = None
+		self._prev_board = None
+
+		# update hash
+		self.prev_hashes.append(self.hash)
+		self.hash ^= self.zobrist.disk_keys[color.value][location[0] * self.board_size + location[1]]
+		flipped: Locations = []
+		remaining_flips: int = flips
+		while remaining_flips:
+			flip: int = remaining_flips & -remaining_flips
+			remaining_flips ^= flip
+			index: int = flip.bit_length() - 1
+			self.hash ^= self.zobrist.flip_keys[index]
+			flipped.append(divmod(index, self.board_size))
+
+		# remember the action so it can be undone
+		self.history.append((location, flips, len(flipped), color))
+
+		# update scores
+		self._update_score(color, len(flipped))
+
+		# check if othello is finished
+		done: bool = self._is_game_finished()
+
+		return done, flipped
+
+	def undo_action(self) -> None:
+		# check if there is an action to undo
+		assert self.history, 'Invalid undo: no action has been taken on this board'
+
+		location, flips, num_flipped, color = self.history.pop()
+		bit: int = 1 << (location[0] * self.board_size + location[1])
+
+		# remove own disk from the provided location and turn back opponent's disks
+		self.bitboards[color.value] &= ~(bit | flips)
+		self.bitboards[1 - color.value] |= flips
+		self._board = None
+		self._prev_board = None
+
+		# update hash
+		self.hash = self.prev_hashes.pop()
+
+		# update scores
+		self._update_score(color, -num_flipped, -1)
+
+	def _to_array(self, bitboards: List[int]) -> np.array:
+		board: np.array = -np.ones(self.board_size ** 2, dtype=int)
+		for value, bitboard in enumerate(bitboards):
+			while bitboard:
+				bit: int = bitboard & -bitboard
+				bitboard ^= bit
+				board[bit.bit_length() - 1] = value
+
+		return board.reshape(self.board_size, self.board_size)
+
+	@staticmethod
+	def to_bitboards(board: np.array) -> List[int]:
+		# indexed by color value
+		bitboards: List[int] = [0, 0]
+		for index, value in enumerate(board.flatten()):
+			if value == Color.BLACK.value or value == Color.WHITE.value:
+				bitboards[value] |= 1 << index
+
+		return bitboards
+
+	@staticmethod
+	def get_moves(own: int, opponent: int, board_size: int) -> int:
+		# legal locations of own in all directions at once
+		empty: int = ((1 << board_size ** 2) - 1) & ~(own | opponent)
+		moves: int = 0
+		for shift, mask in BitBoard._get_shifts(board_size):
+			masked_opponent: int = opponent & mask
+			if shift > 0:
+				line: int = (own << shift) & masked_opponent
+				for _ in range(board_size - 3):
+					line |= (line << shift) & masked_opponent
+				moves |= (line << shift) & mask
+			else:
+				line: int = (own >> -shift) & masked_opponent
+				for _ in range(board_size - 3):
+					line |= (line >> -shift) & masked_opponent
+				moves |= (line >> -shift) & mask
+
+		return moves & empty
+
+	@staticmethod
+	def get_flips(own: int, opponent: int, bit: int, board_size: int) -> int:
+		# opponent's disks turned around by own disk on bit, 0 if bit is not a legal location
+		flips: int = 0
+		for shift, mask in BitBoard._get_shifts(board_size):
+			line: int = 0
+			cursor: int = (bit << shift if shift > 0 else bit >> -shift) & mask
+			while cursor & opponent:
+				line |= cursor
+				cursor = (cursor << shift if shift > 0 else cursor >> -shift) & mask
+			if cursor & own:
+				flips |= line
+
+		return flips
+
+	@staticmethod
+	def _get_shifts(board_size: int) -> Shifts:
+		if board_size not in BitBoard._shifts:
+			full: int = (1 << board_size ** 2) - 1
+			first_column: int = sum(1 << (i * board_size) for i in range(board_size))
+			last_column: int = first_column << (board_size - 1)
+
+			shifts: Shifts = []
+			for di, dj in BitBoard._directions:
+				mask: int = full
+				if dj == +1:
+					# moving right must never land in the first column
+					mask &= ~first_column
+				elif dj == -1:
+					# moving left must never land in the last column
+					mask &= ~last_column
+				shifts.append((di * board_size + dj, mask))
+			BitBoard._shifts[board_size] = shifts
+
+		return BitBoard._shifts[board_size]
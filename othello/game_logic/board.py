@@ -1,15 +1,20 @@
 import random
-from typing import Union
+from typing import List, Tuple, Union
 
 import numpy as np
-from numpy.random import choice
 
 from utils.color import Color
-from utils.types import Actions, Directions, Location
+from utils.types import Actions, Directions, Location, Locations
+from utils.zobrist import Zobrist
+
+# (location, flipped disks, number of flipped disks, color) per action, most recent last
+History = List[Tuple[Location, Union[Locations, int], int, Color]]
 
 
 class Board:
 	# initialize static variables
+	# set to True to check the disk counts against the full board after every action
+	debug: bool = False
 	_directions: Directions = [
 		(+1, +0),  # down
 		(+1, +1),  # down right
@@ -29,37 +34,44 @@ class Board:
 		self.board_size: int = board_size
 
 		# create board
-		board: np.array = -np.ones([board_size, board_size], dtype=int)
-		board[board_size // 2 - 1, board_size // 2 - 1] = 1  # white
-		board[board_size // 2, board_size // 2 - 1] = 0  # black
-		board[board_size // 2 - 1, board_size // 2] = 0  # black
-		board[board_size // 2, board_size // 2] = 1  # white
-
-		self.board: np.array = board
+		self._place_initial_disks()
 		self.num_black_disks: int = 2
 		self.num_white_disks: int = 2
 		self.num_free_spots: int = board_size ** 2 - 4
 
-		self.prev_board: Union[np.array, None] = None
-		self.prev_num_black_disks: Union[int, None] = None
-		self.prev_num_white_disks: Union[int, None] = None
-		self.prev_num_free_spots: Union[int, None] = None
+		self.history: History = []
+
+		# incremental zobrist hash of the disks, with the hashes before each action in history
+		self.zobrist: Zobrist = Zobrist.get(board_size)
+		self.hash: int = self.zobrist.hash(self.board)
+		self.prev_hashes: List[int] = []
 
-		# 0, 1, or 2 plays (0, 2, or 4 plies)
-		num_plays: int = choice(3, 1, p=[0.2, 0.4, 0.4])[0]
-		if random_start and num_plays > 0:
+		if random_start:
+			# 0, 1, or 2 plays (0, 2, or 4 plies)
+			# from the random module like every other random choice of a game, so seeded games play the same anywhere
+			num_plays: int = random.choices(range(3), weights=[0.2, 0.4, 0.4])[0]
 			# adding random start at 2 or 4 steps in future (B - W or B - W - B - W)
 			for play in range(num_plays):
-				legal_actions: Actions = self._get_legal_actions(self.board, self.board_size, Color.BLACK)
+				legal_actions: Actions = self.get_legal_actions(Color.BLACK)
 				location: Location = random.choice(list(legal_actions))
 				directions: Directions = legal_actions[location]
 				self.take_action(location, directions, Color.BLACK)
 
-				legal_actions = self._get_legal_actions(self.board, self.board_size, Color.WHITE)
+				legal_actions = self.get_legal_actions(Color.WHITE)
 				location: Location = random.choice(list(legal_actions))
 				directions: Directions = legal_actions[location]
 				self.take_action(location, directions, Color.WHITE)
 
+	def _place_initial_disks(self) -> None:
+		board_size: int = self.board_size
+		board: np.array = -np.ones([board_size, board_size], dtype=int)
+		board[board_size // 2 - 1, board_size // 2 - 1] = 1  # white
+		board[board_size // 2, board_size // 2 - 1] = 0  # black
+		board[board_size // 2 - 1, board_size // 2] = 0  # black
+		board[board_size // 2, board_size // 2] = 1  # white
+
+		self.board: np.array = board
+
 	def __str__(self) -> str:
 		string: str = '\t\t\u2502'
 		for j in range(self.board_size):
@@ -84,34 +96,79 @@ class Board:
 			string += '\n'
 		return string
 
+	@property
+	def prev_board(self) -> Union[np.array, None]:
+		if not self.history:
+			return None
+
+		location, flipped, _, color = self.history[-1]
+		prev_board: np.array = np.copy(self.board)
+		for i, j in flipped:
+			prev_board[i, j] = 1 - color.value
+		prev_board[location[0], location[1]] = Color.EMPTY.value
+
+		return prev_board
+
+	@property
+	def prev_num_black_disks(self) -> Union[int, None]:
+		if not self.history:
+			return None
+
+		_, _, num_flipped, color = self.history[-1]
+		if color is Color.BLACK:
+			return self.num_black_disks - num_flipped - 1
+		return self.num_black_disks + num_flipped
+
+	@property
+	def prev_num_white_disks(self) -> Union[int, None]:
+		if not self.history:
+			return None
+
+		_, _, num_flipped, color = self.history[-1]
+		if color is Color.WHITE:
+			return self.num_white_disks - num_flipped - 1
+		return self.num_white_disks + num_flipped
+
+	@property
+	def prev_num_free_spots(self) -> Union[int, None]:
+		if not self.history:
+			return None
+
+		return self.num_free_spots + 1
+
+	@property
+	def last_action(self) -> Union[Tuple[Location, Locations, Color], None]:
+		# location, flipped disks and color of the last action, enough to update evaluations incrementally
+		if not self.history:
+			return None
+
+		location, flipped, _, color = self.history[-1]
+
+		return location, flipped, color
+
 	def get_deepcopy(self):
-		new_board = Board(self.board_size, random_start=False)
-		new_board.num_black_disks = self.num_black_disks
-		new_board.num_white_disks = self.num_white_disks
-		new_board.num_free_spots = self.num_free_spots
+		# bypass __init__, which would set up a fresh board first
+		new_board: Board = type(self).__new__(type(self))
+		new_board.__dict__.update(self.__dict__)
+		new_board.history = list(self.history)
+		new_board.prev_hashes = list(self.prev_hashes)
 
 		new_board.board = np.copy(self.board)
-		new_board.prev_board = np.copy(self.prev_board)
 
 		return new_board
 
 	def get_legal_actions(self, color: Color) -> Actions:
 		return self._get_legal_actions(self.board, self.board_size, color)
 
-	def take_action(self, location: Location, legal_directions: Directions, color: Color) -> bool:
+	def take_action(self, location: Location, legal_directions: Directions, color: Color) -> Tuple[bool, Locations]:
 		# check if location does point to an empty spot
 		assert self.board[location[0], location[1]] == Color.EMPTY.value, f'Invalid location: location ({location}) does not point to an empty spot on the board)'
 
-		# save state before action
-		self.prev_board: np.array = np.copy(self.board)
-		self.prev_num_black_disks: int = self.num_black_disks
-		self.prev_num_white_disks: int = self.num_white_disks
-		self.prev_num_free_spots: int = self.prev_num_free_spots
-
 		# put down own disk in the provided location
 		self.board[location[0], location[1]]: int = color.value
 
 		# turn around opponent's disks
+		flipped: Locations = []
 		for direction in legal_directions:
 			i: int = location[0] + direction[0]
 			j: int = location[1] + direction[1]
@@ -127,19 +184,60 @@ class Board:
 				if self.board[i, j] == 1 - color.value:
 					# encountered opponent's disk
 					self.board[i, j] = color.value
+					flipped.append((i, j))
 
 				i += direction[0]
 				j += direction[1]
 
+		# remember the action so it can be undone
+		self.history.append((location, flipped, len(flipped), color))
+
+		# update hash
+		self.prev_hashes.append(self.hash)
+		self.hash ^= self.zobrist.disk_keys[color.value][location[0] * self.board_size + location[1]]
+		for i, j in flipped:
+			self.hash ^= self.zobrist.flip_keys[i * self.board_size + j]
+
 		# update scores
-		self._update_score()
+		self._update_score(color, len(flipped))
 
 		# check if othello is finished
 		done: bool = self._is_game_finished()
 
-		return done
+		return done, flipped
+
+	def undo_action(self) -> None:
+		# check if there is an action to undo
+		assert self.history, 'Invalid undo: no action has been taken on this board'
+
+		location, flipped, num_flipped, color = self.history.pop()
+
+		# turn back opponent's disks
+		for i, j in flipped:
+			self.board[i, j] = 1 - color.value
+
+		# remove own disk from the provided location
+		self.board[location[0], location[1]] = Color.EMPTY.value
+
+		# update hash
+		self.hash = self.prev_hashes.pop()
+
+		# update scores
+		self._update_score(color, -num_flipped, -1)
+
+	def _update_score(self, color: Color, num_flipped: int, num_placed: int = 1) -> None:
+		if color is Color.BLACK:
+			self.num_black_disks += num_flipped + num_placed
+			self.num_white_disks -= num_flipped
+		else:
+			self.num_white_disks += num_flipped + num_placed
+			self.num_black_disks -= num_flipped
+		self.num_free_spots -= num_placed
+
+		if self.debug:
+			self._check_score()
 
-	def _update_score(self) -> None:
+	def _check_score(self) -> None:
 		# get scores
 		num_black_disks: int = len(np.where(self.board == Color.BLACK.value)[0])
 		num_white_disks: int = len(np.where(self.board == Color.WHITE.value)[0])
@@ -152,9 +250,8 @@ class Board:
 		assert 0 <= num_free_spots <= self.board_size ** 2 - 4, f'Invalid number of free spots: num_free_spots should be between 0 and {self.board_size ** 2 - 4}, but got {num_free_spots}'
 		assert num_disks + num_free_spots == self.board_size ** 2, f'Invalid number of disks and free spots: sum of disks and num_free_spots should be {self.board_size ** 2}, but got {num_disks + num_free_spots}'
 
-		self.num_black_disks: int = num_black_disks
-		self.num_white_disks: int = num_white_disks
-		self.num_free_spots: int = num_free_spots
+		# check incremental scores
+		assert (self.num_black_disks, self.num_white_disks, self.num_free_spots) == (num_black_disks, num_white_disks, num_free_spots), f'Invalid scores: expected ({num_black_disks}, {num_white_disks}, {num_free_spots}), but got ({self.num_black_disks}, {self.num_white_disks}, {self.num_free_spots})'
 
 	def _is_game_finished(self) -> bool:
 		# return whether or not game is finished
@@ -1,114 +1,218 @@
+import random
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Tuple, Union
+
 import numpy as np
 from termcolor import colored
 
 from agents.agent import Agent
 from agents.trainable_agent import TrainableAgent
+from game_logic.bit_board import BitBoard
 from game_logic.board import Board
+from game_logic.game_record import GameRecordWriter, encode_move
+from policies.annealing_trainable_policy import AnnealingTrainablePolicy
 from utils.color import Color
 from utils.config import Config
-from utils.types import Actions
+from utils.position_codec import encode
+from utils.profiler import profiler
+from utils.replay_buffer import ReplayBuffer
+from utils.types import Action, Actions
+
+
+def seed_game(seed: int, episode: int) -> None:
+	# every game gets its own random numbers, whichever process plays it and whatever it played before
+	random.seed(int(np.random.SeedSequence([seed, episode]).generate_state(1)[0]))
+
+
+# state of the random number generator of the random module, which policies and random starts draw from
+RandomState = Tuple[Any, ...]
 
 
 class Game:
-	def __init__(self, board_size: int, black: Agent, config: Config, episode: int, random_start: bool = False) -> None:
+	def __init__(self, board_size: int, black: Agent, config: Config, episode: int, random_start: bool = False,
+	             train_agents: bool = True, recorder: Union[GameRecordWriter, None] = None,
+	             seed: Union[int, None] = None) -> None:
 		self.board_size = board_size
 		self.config: Config = config
 		self.episode: int = episode
+		# whether agents in train mode learn from this game when it is done, or only keep its moves in replay_buffers
+		self.train_agents: bool = train_agents
 
-		self.board: Board = Board(self.board_size, random_start=random_start)
+		# a seeded game draws its own random numbers seeded by seed and episode, also when played in lockstep
+		# with other games or in another process, None draws from the global random number generator
+		self.random_state: Union[RandomState, None] = None
+		if seed is not None:
+			outer_state: RandomState = random.getstate()
+			seed_game(seed, episode)
+			self.random_state: RandomState = random.getstate()
+			random.setstate(outer_state)
+
+		with self.own_random_state():
+			self.board: Board = BitBoard(self.board_size, random_start=random_start)
 		self.ply = self.board.num_black_disks + self.board.num_white_disks - 4
+		# appends the game to a record file when it is done
+		self.recorder: Union[GameRecordWriter, None] = recorder
+		# the random start, then every move or pass
+		self.num_random_plies: int = len(self.board.history)
+		self.moves: List[int] = [encode_move(move[0], board_size) for move in self.board.history]
 		self.black = black
 		self.agent: Agent = black
 		self.prev_pass: bool = False
 		self.done: bool = False
 
+		# moves of this game per trainable agent, so agents can play several games at once
+		self.replay_buffers: Dict[Agent, ReplayBuffer] = {
+			agent: ReplayBuffer((board_size ** 2 - 4) // 2) for agent in [black, config.white] if isinstance(agent, TrainableAgent)
+		}
+
+	@contextmanager
+	def own_random_state(self) -> Iterator[None]:
+		# draw the random numbers of this game, and leave the global random number generator as it was
+		if self.random_state is None:
+			yield
+			return
+		outer_state: RandomState = random.getstate()
+		random.setstate(self.random_state)
+		try:
+			yield
+		finally:
+			self.random_state: RandomState = random.getstate()
+			random.setstate(outer_state)
+
 	def play(self) -> None:
+		self.start()
+
+		# play until done
+		with self.own_random_state():
+			while not self.done:
+				legal_actions: Actions = self.get_legal_actions()
+				action: Union[Action, None] = self.agent.next_action(self.board, legal_actions) if legal_actions else None
+				self.step(legal_actions, action)
+
+	def start(self) -> None:
 		if self.config.verbose_live:
 			print(f'Episode {self.episode}:')
 			print(f'\tPly {self.ply}: INIT')
 			print(self.board)
 
-		# play until done
-		while not self.done:
-			# update
-			self.ply += 1
+	def get_legal_actions(self) -> Actions:
+		# update
+		self.ply += 1
 
-			if self.config.verbose_live:
-				disk_icon: str = u'\u25CF' if self.agent.color is Color.BLACK else u'\u25CB'
-				print(f'\tPly {self.ply}: {self.agent.color.name} {disk_icon}')
+		if self.config.verbose_live:
+			disk_icon: str = u'\u25CF' if self.agent.color is Color.BLACK else u'\u25CB'
+			print(f'\tPly {self.ply}: {self.agent.color.name} {disk_icon}')
 
-			# get legal actions
+		# get legal actions
+		with profiler.phase('movegen'):
 			legal_actions: Actions = self.board.get_legal_actions(self.agent.color)
 
-			if not legal_actions:
-				# pass if no legal actions
-				if self.config.verbose_live:
-					print(f'\tNo legal actions')
-					print(self.board)
-					print(f'\tNext action: PASS')
-				if self.prev_pass:
-					self.done = True  # no agent has legal actions, deadlock
-				self.prev_pass = True  # this agent has no legal actions, pass
-			else:
-				# get next action from legal actions and take it
-				location, legal_directions = self.agent.next_action(self.board, legal_actions)
-				if self.config.verbose_live:
-					print(f'\tLegal actions: {list(legal_actions)}')
-					board_copy: Board = self.board.get_deepcopy()
-					for legal_location in legal_actions:
-						board_copy.board[legal_location] = Color.LEGAL.value
-					print(board_copy)
-					print(f'\tNext action: {location}')
-				self.prev_pass = False  # this agent has legal actions, no pass
-
-				self.done = self.board.take_action(location, legal_directions, self.agent.color)
-				if self.config.verbose_live:
-					print(self.board)
+		return legal_actions
 
-				# get immediate reward if agent makes use of it
-				if isinstance(self.agent, TrainableAgent):
-					immediate_reward: float = self.agent.immediate_reward.reward(self.board, self.agent.color)
-					if self.config.verbose_live:
-						print(f'Immediate reward: {immediate_reward}')
-					# remember the board, the taken action and the resulting reward
-					if isinstance(self.agent, TrainableAgent):
-						self.agent.replay_buffer.add(self.board.prev_board, location, immediate_reward, False, list(legal_actions))
+	def step(self, legal_actions: Actions, action: Union[Action, None]) -> None:
+		self.take_action(legal_actions, action)
+		self.end_step(legal_actions, action)
 
+	def take_action(self, legal_actions: Actions, action: Union[Action, None]) -> None:
+		# the first half of a step: pass or play, end_step finishes it
+		if not legal_actions:
+			# pass if no legal actions
 			if self.config.verbose_live:
+				print(f'\tNo legal actions')
 				print(self.board)
+				print(f'\tNext action: PASS')
+			if self.prev_pass:
+				self.done = True  # no agent has legal actions, deadlock
+			self.prev_pass = True  # this agent has no legal actions, pass
+			self.moves.append(encode_move(None, self.board_size))
+			profiler.count('passes')
+		else:
+			# take the next action from legal actions
+			location, legal_directions = action
+			if self.config.verbose_live:
+				print(f'\tLegal actions: {list(legal_actions)}')
+				board_copy: Board = self.board.get_deepcopy()
+				for legal_location in legal_actions:
+					board_copy.board[legal_location] = Color.LEGAL.value
+				print(board_copy)
+				print(f'\tNext action: {location}')
+			self.prev_pass = False  # this agent has legal actions, no pass
+			self.moves.append(encode_move(location, self.board_size))
 
-			if not self.done:
-				# change turns
-				self.agent = self.black if self.agent == self.config.white else self.config.white
-			else:
-				# the game is done
-				# update scores of both agents
-				self.black.update_score(self.board)
-				self.config.white.update_score(self.board)
-
-				# train the agents on the made moves
-				for agent in [self.black, self.config.white]:
-					if isinstance(agent, TrainableAgent) and agent.train_mode:
-						# use a final reward for winning/losing
-						final_reward: float = agent.final_reward.reward(self.board, agent.color)
-						# change reward in last buffer entry
-						agent.replay_buffer.add_final_reward(final_reward)
-						# learn from the game
-						agent.train()
-						# clear the buffer
-						agent.replay_buffer.clear()
-
-				# print end result
+			with profiler.phase('take_action'):
+				self.done, _ = self.board.take_action(location, legal_directions, self.agent.color)
+			profiler.count('moves')
+			if self.config.verbose_live:
+				print(self.board)
+
+	def end_step(self, legal_actions: Actions, action: Union[Action, None],
+	             immediate_reward: Union[float, None] = None,
+	             final_rewards: Union[Dict[Agent, float], None] = None) -> None:
+		# the second half of a step, rewards that are None are computed here, e.g. VectorizedGame batches them
+		if legal_actions:
+			location, _ = action
+			# get immediate reward if agent makes use of it
+			if isinstance(self.agent, TrainableAgent):
+				if immediate_reward is None:
+					with profiler.phase('reward'):
+						immediate_reward: float = self.agent.immediate_reward.reward(self.board, self.agent.color)
 				if self.config.verbose_live:
-					if self.board.num_black_disks > self.board.num_white_disks:
-						print(colored(
-							f'{self.episode:>5}: BLACK ({self.board.num_black_disks:>3}|{self.board.num_white_disks:>3}|{self.board.num_free_spots:>3})',
-							'red'))
-					elif self.board.num_black_disks < self.board.num_white_disks:
-						print(colored(
-							f'{self.episode:>5}: WHITE ({self.board.num_black_disks:>3}|{self.board.num_white_disks:>3}|{self.board.num_free_spots:>3})',
-							'green'))
-					else:
-						print(colored(
-							f'{self.episode:>5}: DRAW  ({self.board.num_black_disks:>3}|{self.board.num_white_disks:>3}|{self.board.num_free_spots:>3})',
-							'cyan'))
+					print(f'Immediate reward: {immediate_reward}')
+				# remember the board with its legal actions, the taken action and the resulting reward
+				position: np.array = encode(self.board.prev_board, self.agent.color, list(legal_actions))
+				self.replay_buffers[self.agent].add(position, location, immediate_reward, False)
+
+		if self.config.verbose_live:
+			print(self.board)
+
+		if not self.done:
+			# change turns
+			self.agent = self.black if self.agent == self.config.white else self.config.white
+		else:
+			self.end(final_rewards)
+
+	def end(self, final_rewards: Union[Dict[Agent, float], None] = None) -> None:
+		# the game is done
+		profiler.count('games')
+		# update scores of both agents
+		self.black.update_score(self.board)
+		self.config.white.update_score(self.board)
+
+		# record the game
+		if self.recorder is not None:
+			self.recorder.write(self.board_size, self.num_random_plies, self.black, self.config.white,
+			                    self.board.num_black_disks, self.board.num_white_disks, self.moves)
+
+		# train the agents on the made moves
+		for agent in [self.black, self.config.white]:
+			if isinstance(agent, TrainableAgent) and agent.train_mode:
+				# use a final reward for winning/losing
+				if final_rewards is not None and agent in final_rewards:
+					final_reward: float = final_rewards[agent]
+				else:
+					with profiler.phase('reward'):
+						final_reward: float = agent.final_reward.reward(self.board, agent.color)
+				# change reward in last buffer entry
+				self.replay_buffers[agent].add_final_reward(final_reward)
+				# learn from the game
+				if self.train_agents:
+					with profiler.phase('train'):
+						agent.train(self.replay_buffers[agent])
+				# one step of the exploration schedule per finished game, also for games played in lockstep
+				if isinstance(agent.train_policy, AnnealingTrainablePolicy) and agent.train_policy.num_episodes is not None:
+					agent.train_policy.step()
+
+		# print end result
+		if self.config.verbose_live:
+			if self.board.num_black_disks > self.board.num_white_disks:
+				print(colored(
+					f'{self.episode:>5}: BLACK ({self.board.num_black_disks:>3}|{self.board.num_white_disks:>3}|{self.board.num_free_spots:>3})',
+					'red'))
+			elif self.board.num_black_disks < self.board.num_white_disks:
+				print(colored(
+					f'{self.episode:>5}: WHITE ({self.board.num_black_disks:>3}|{self.board.num_white_disks:>3}|{self.board.num_free_spots:>3})',
+					'green'))
+			else:
+				print(colored(
+					f'{self.episode:>5}: DRAW  ({self.board.num_black_disks:>3}|{self.board.num_white_disks:>3}|{self.board.num_free_spots:>3})',
+					'cyan'))
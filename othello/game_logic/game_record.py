@@ -0,0 +1,171 @@
+import mmap
+import os
+import struct
+from typing import BinaryIO, Dict, Iterator, List, TextIO, Tuple, Union
+
+import numpy as np
+
+from agents.agent import Agent
+from game_logic.bit_board import BitBoard
+from game_logic.board import Board
+from utils.color import Color
+from utils.types import Actions, Location
+
+# start of every record file, with the format version
+MAGIC: bytes = b'OTHELLO\x01'
+# board size, number of random start plies, black agent id, white agent id, black disks, white disks, number of moves
+HEADER: struct.Struct = struct.Struct('<BBHHHHH')
+# one byte per move: row * board size + col, or PASS
+PASS: int = 255
+
+
+def encode_move(location: Union[Location, None], board_size: int) -> int:
+	return PASS if location is None else int(location[0]) * board_size + int(location[1])
+
+
+def decode_move(move: int, board_size: int) -> Union[Location, None]:
+	return None if move == PASS else divmod(move, board_size)
+
+
+class GameRecord:
+	def __init__(self, board_size: int, num_random_plies: int, black: str, white: str, num_black_disks: int,
+	             num_white_disks: int, moves: bytes) -> None:
+		self.board_size: int = board_size
+		# the first moves are the random start, not chosen by the agents
+		self.num_random_plies: int = num_random_plies
+		self.black: str = black
+		self.white: str = white
+		self.num_black_disks: int = num_black_disks
+		self.num_white_disks: int = num_white_disks
+		self.moves: bytes = moves
+
+	def __len__(self) -> int:
+		return len(self.moves)
+
+	def __str__(self) -> str:
+		return f'GameRecord(board_size={self.board_size}, black={self.black}, white={self.white}, ' \
+		       f'score={self.num_black_disks}|{self.num_white_disks}, moves={len(self.moves)})'
+
+	@property
+	def locations(self) -> List[Union[Location, None]]:
+		return [decode_move(move, self.board_size) for move in self.moves]
+
+	def replay(self) -> Iterator[Tuple[Board, Color, Union[Location, None]]]:
+		"""Every position before a move, the color to move and its location, None for a pass."""
+		board: Board = BitBoard(self.board_size)
+		color: Color = Color.BLACK
+		for location in self.locations:
+			yield board, color, location
+			if location is not None:
+				legal_actions: Actions = board.get_legal_actions(color)
+				assert location in legal_actions, f'Invalid record: {location} is not a legal action for {color.name}'
+				board.take_action(location, legal_actions[location], color)
+			color: Color = Color.WHITE if color is Color.BLACK else Color.BLACK
+
+		assert (board.num_black_disks, board.num_white_disks) == (self.num_black_disks, self.num_white_disks), \
+			f'Invalid record: replayed score {board.num_black_disks}|{board.num_white_disks} does not match ' \
+			f'the recorded score {self.num_black_disks}|{self.num_white_disks}'
+
+
+class GameRecordWriter:
+	"""Appends games to a record file, with a file of record offsets (.idx) and a file of agent descriptions (.agents)."""
+
+	def __init__(self, path: str) -> None:
+		self.path: str = path
+
+		# agent ids are line numbers in the agents file
+		self.agent_ids: Dict[str, int] = {}
+		if os.path.exists(f'{path}.agents'):
+			with open(f'{path}.agents') as agents_file:
+				for agent_id, description in enumerate(agents_file.read().splitlines()):
+					self.agent_ids[description] = agent_id
+
+		self.records: BinaryIO = open(path, 'ab')
+		if self.records.tell() == 0:
+			self.records.write(MAGIC)
+		self.index: BinaryIO = open(f'{path}.idx', 'ab')
+		self.agents: TextIO = open(f'{path}.agents', 'a')
+
+	def __enter__(self) -> 'GameRecordWriter':
+		return self
+
+	def __exit__(self, *args) -> None:
+		self.close()
+
+	def agent_id(self, agent: Agent) -> int:
+		description: str = str(agent)
+		if description not in self.agent_ids:
+			self.agent_ids[description] = len(self.agent_ids)
+			self.agents.write(f'{description}\n')
+
+		return self.agent_ids[description]
+
+	def write(self, board_size: int, num_random_plies: int, black: Agent, white: Agent, num_black_disks: int,
+	          num_white_disks: int, moves: List[int]) -> None:
+		offset: int = self.records.tell()
+		self.records.write(HEADER.pack(board_size, num_random_plies, self.agent_id(black), self.agent_id(white),
+		                               num_black_disks, num_white_disks, len(moves)))
+		self.records.write(bytes(moves))
+		# a reader may open the files at any time, the offset goes to disk only after everything it points to
+		self.agents.flush()
+		self.records.flush()
+		self.index.write(struct.pack('<Q', offset))
+		self.index.flush()
+
+	def close(self) -> None:
+		self.records.close()
+		self.index.close()
+		self.agents.close()
+
+
+class GameRecordReader:
+	"""Reads games from a record file through a memory map, so only the games that are read are loaded."""
+
+	def __init__(self, path: str) -> None:
+		self.path: str = path
+
+		with open(f'{path}.agents') as agents_file:
+			self.agents: List[str] = agents_file.read().splitlines()
+
+		self.file: BinaryIO = open(path, 'rb')
+		self.records: mmap.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+		assert self.records[:len(MAGIC)] == MAGIC, f'Invalid record file: {path} does not start with {MAGIC}'
+
+		# only the offsets of complete records count, a writer may still be appending
+		with open(f'{path}.idx', 'rb') as index_file:
+			index: bytes = index_file.read()
+		self.offsets: np.array = np.frombuffer(index[:len(index) - len(index) % 8], dtype='<u8')
+		while len(self.offsets) and not self._is_complete(int(self.offsets[-1])):
+			self.offsets: np.array = self.offsets[:-1]
+
+	def __enter__(self) -> 'GameRecordReader':
+		return self
+
+	def __exit__(self, *args) -> None:
+		self.close()
+
+	def __len__(self) -> int:
+		return len(self.offsets)
+
+	def __getitem__(self, index: int) -> GameRecord:
+		offset: int = int(self.offsets[index])
+		board_size, num_random_plies, black_id, white_id, num_black_disks, num_white_disks, num_moves = \
+			HEADER.unpack_from(self.records, offset)
+		start: int = offset + HEADER.size
+
+		return GameRecord(board_size, num_random_plies, self.agents[black_id], self.agents[white_id], num_black_disks,
+		                  num_white_disks, self.records[start:start + num_moves])
+
+	def __iter__(self) -> Iterator[GameRecord]:
+		for index in range(len(self)):
+			yield self[index]
+
+	def _is_complete(self, offset: int) -> bool:
+		if offset + HEADER.size > len(self.records):
+			return False
+		num_moves: int = HEADER.unpack_from(self.records, offset)[-1]
+		return offset + HEADER.size + num_moves <= len(self.records)
+
+	def close(self) -> None:
+		self.records.close()
+		self.file.close()
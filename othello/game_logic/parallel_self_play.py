@@ -0,0 +1,136 @@
+import multiprocessing
+from multiprocessing.context import BaseContext
+from multiprocessing.process import BaseProcess
+from queue import Empty
+from typing import Dict, Iterable, List, Tuple, Union
+
+from agents.agent import Agent
+from agents.trainable_agent import TrainableAgent
+from game_logic.game import Game
+from policies.annealing_trainable_policy import AnnealingTrainablePolicy
+from utils.config import Config
+from utils.replay_buffer import ReplayBuffer
+
+# (episode, replay buffer per color value of the agents in train mode)
+Trajectories = Tuple[int, Dict[int, ReplayBuffer]]
+# network weights per color value of the agents in train mode
+Weights = Dict[int, list]
+
+
+def _get_learners(black: Agent, config: Config) -> List[TrainableAgent]:
+	# agents that learn from the games, a network shared by both colors is listed twice
+	return [agent for agent in [black, config.white] if isinstance(agent, TrainableAgent) and agent.train_mode]
+
+
+def _run_actor(board_size: int, black: Agent, config: Config, tasks: multiprocessing.Queue,
+               trajectories: multiprocessing.Queue, weights: multiprocessing.Queue) -> None:
+	# the agents are copies with frozen networks, they never train themselves
+	learners: List[TrainableAgent] = _get_learners(black, config)
+
+	while True:
+		episode: Union[int, None] = tasks.get()
+		if episode is None:
+			break
+
+		# only the most recent broadcast matters
+		latest_weights: Union[Weights, None] = None
+		try:
+			while True:
+				latest_weights: Weights = weights.get_nowait()
+		except Empty:
+			pass
+		if latest_weights is not None:
+			for agent in learners:
+				agent.set_weights(latest_weights[agent.color.value])
+
+		# update policies
+		for agent in learners:
+			if isinstance(agent.train_policy, AnnealingTrainablePolicy):
+				agent.train_policy.update(episode)
+
+		game: Game = Game(board_size, black, config, episode, random_start=True, train_agents=False)
+		game.play()
+		trajectories.put((episode, {agent.color.value: game.replay_buffers[agent] for agent in learners}))
+
+
+class ParallelSelfPlay:
+	"""Plays training games in worker processes and trains the agents on their moves in this process."""
+
+	def __init__(self, board_size: int, black: Agent, config: Config, num_workers: int,
+	             broadcast_every: int = 16) -> None:
+		assert 1 <= num_workers, f'Invalid number of workers: num_workers should be at least 1, but got {num_workers}'
+		assert 1 <= broadcast_every, f'Invalid broadcast interval: broadcast_every should be at least 1, but got {broadcast_every}'
+
+		self.board_size: int = board_size
+		self.black: Agent = black
+		self.config: Config = config
+		self.num_workers: int = num_workers
+		# number of trained games between sending the new weights to the workers
+		self.broadcast_every: int = broadcast_every
+
+		# spawn instead of fork, tensorflow does not survive being forked
+		self.context: BaseContext = multiprocessing.get_context('spawn')
+		self.tasks: Union[multiprocessing.Queue, None] = None
+		self.trajectories: Union[multiprocessing.Queue, None] = None
+		self.weights: List[multiprocessing.Queue] = []
+		self.workers: List[BaseProcess] = []
+
+		self.num_games: int = 0
+
+	def __enter__(self) -> 'ParallelSelfPlay':
+		self.start()
+
+		return self
+
+	def __exit__(self, *args) -> None:
+		self.close()
+
+	def start(self) -> None:
+		# the agents are pickled with their train modes, policies and current weights
+		self.tasks = self.context.Queue()
+		self.trajectories = self.context.Queue()
+		self.weights: List[multiprocessing.Queue] = [self.context.Queue() for _ in range(self.num_workers)]
+		self.workers: List[BaseProcess] = [
+			self.context.Process(target=_run_actor, daemon=True, args=(
+				self.board_size, self.black, self.config, self.tasks, self.trajectories, weights))
+			for weights in self.weights
+		]
+		for worker in self.workers:
+			worker.start()
+
+	def play(self, episodes: Iterable[int]) -> None:
+		episodes: List[int] = list(episodes)
+		for episode in episodes:
+			self.tasks.put(episode)
+
+		# train on the games in the order they finish
+		learners: List[TrainableAgent] = _get_learners(self.black, self.config)
+		for _ in episodes:
+			_, replay_buffers = self._get_trajectories()
+			for agent in learners:
+				agent.train(replay_buffers[agent.color.value])
+
+			self.num_games += 1
+			if self.num_games % self.broadcast_every == 0:
+				self.broadcast()
+
+	def _get_trajectories(self) -> Trajectories:
+		while True:
+			try:
+				return self.trajectories.get(timeout=1.0)
+			except Empty:
+				# a crashed worker never sends its game, do not wait for it forever
+				for worker in self.workers:
+					assert worker.exitcode is None, f'Self-play worker {worker.name} died with exit code {worker.exitcode}'
+
+	def broadcast(self) -> None:
+		weights: Weights = {agent.color.value: agent.dnn.get_weights() for agent in _get_learners(self.black, self.config)}
+		for queue in self.weights:
+			queue.put(weights)
+
+	def close(self) -> None:
+		for _ in self.workers:
+			self.tasks.put(None)
+		for worker in self.workers:
+			worker.join()
+		self.workers: List[BaseProcess] = []
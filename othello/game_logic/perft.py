@@ -0,0 +1,136 @@
+import random
+from typing import Dict, List, Tuple, Type, Union
+
+from game_logic.board import Board
+from utils.color import Color
+from utils.types import Actions, Location
+
+# number of leaves from the initial 8x8 position by depth, passes count as a ply and finished games as a leaf
+KNOWN_PERFT_8X8: List[int] = [1, 4, 12, 56, 244, 1396, 8200, 55092, 390216, 3005288, 24571284]
+
+# moves from the initial position, None for a pass, and the color to move after them
+Position = Tuple[List[Union[Location, None]], Color]
+
+
+def _other(color: Color) -> Color:
+	return Color.WHITE if color is Color.BLACK else Color.BLACK
+
+
+def perft(board: Board, color: Color, depth: int) -> int:
+	"""Number of leaves depth plies from board with color to move."""
+	if depth == 0:
+		return 1
+
+	legal_actions: Actions = board.get_legal_actions(color)
+	if not legal_actions:
+		if not board.get_legal_actions(_other(color)):
+			# the game is over before depth
+			return 1
+		# pass
+		return perft(board, _other(color), depth - 1)
+	if depth == 1:
+		# every legal action is a leaf
+		return len(legal_actions)
+
+	num_leaves: int = 0
+	for location, directions in legal_actions.items():
+		board.take_action(location, directions, color)
+		num_leaves += perft(board, _other(color), depth - 1)
+		board.undo_action()
+
+	return num_leaves
+
+
+def divide(board: Board, color: Color, depth: int) -> Dict[Union[Location, None], int]:
+	"""Number of leaves per legal action of color, which narrows a wrong count down to a single move."""
+	legal_actions: Actions = board.get_legal_actions(color)
+	if not legal_actions:
+		return {None: perft(board, color, depth)}
+
+	leaves: Dict[Union[Location, None], int] = {}
+	for location, directions in legal_actions.items():
+		board.take_action(location, directions, color)
+		leaves[location] = perft(board, _other(color), depth - 1)
+		board.undo_action()
+
+	return leaves
+
+
+def compare(board: Board, reference: Board, color: Color, depth: int) -> int:
+	"""Perft on two backends in lockstep, checking legal actions, flips and disks at every node."""
+	assert (board.board == reference.board).all(), f'Different boards:\n{board}\n{reference}'
+	assert (board.num_black_disks, board.num_white_disks, board.num_free_spots) == \
+	       (reference.num_black_disks, reference.num_white_disks, reference.num_free_spots), \
+		f'Different disk counts:\n{board}\n{reference}'
+	assert board.hash == reference.hash, f'Different hashes:\n{board}\n{reference}'
+	if depth == 0:
+		return 1
+
+	legal_actions: Actions = board.get_legal_actions(color)
+	reference_legal_actions: Actions = reference.get_legal_actions(color)
+	assert sorted(legal_actions) == sorted(reference_legal_actions), \
+		f'Different legal actions for {color.name}: {sorted(legal_actions)} instead of ' \
+		f'{sorted(reference_legal_actions)}\n{reference}'
+	for location in legal_actions:
+		assert sorted(legal_actions[location]) == sorted(reference_legal_actions[location]), \
+			f'Different legal directions at {location} for {color.name}: {legal_actions[location]} instead of ' \
+			f'{reference_legal_actions[location]}\n{reference}'
+
+	if not legal_actions:
+		if not board.get_legal_actions(_other(color)):
+			return 1
+		return compare(board, reference, _other(color), depth - 1)
+
+	num_leaves: int = 0
+	for location, directions in legal_actions.items():
+		done, flipped = board.take_action(location, directions, color)
+		reference_done, reference_flipped = reference.take_action(location, directions, color)
+		assert done == reference_done, f'Different end of game after {location} for {color.name}\n{reference}'
+		assert sorted(flipped) == sorted(reference_flipped), \
+			f'Different flips after {location} for {color.name}: {flipped} instead of {reference_flipped}\n{reference}'
+		num_leaves += compare(board, reference, _other(color), depth - 1)
+		board.undo_action()
+		reference.undo_action()
+
+	return num_leaves
+
+
+def get_positions(board_size: int, num_games: int = 4, seed: int = 0) -> List[Position]:
+	"""Fixed positions from seeded random games: after a quarter, a half and three quarters of the spots, and passes."""
+	generator: random.Random = random.Random(seed)
+	num_plies: List[int] = [(board_size ** 2 - 4) * fraction // 4 for fraction in (1, 2, 3)]
+
+	positions: List[Position] = []
+	for _ in range(num_games):
+		board: Board = Board(board_size)
+		color: Color = Color.BLACK
+		moves: List[Union[Location, None]] = []
+		while True:
+			legal_actions: Actions = board.get_legal_actions(color)
+			if not legal_actions:
+				if not board.get_legal_actions(_other(color)):
+					break
+				# a position where color has to pass
+				positions.append((list(moves), color))
+				moves.append(None)
+			else:
+				if len(moves) in num_plies:
+					positions.append((list(moves), color))
+				location: Location = generator.choice(list(legal_actions))
+				board.take_action(location, legal_actions[location], color)
+				moves.append(location)
+			color: Color = _other(color)
+
+	return positions
+
+
+def set_up(board_class: Type[Board], board_size: int, moves: List[Union[Location, None]]) -> Board:
+	"""Play moves from the initial position on a board of board_class."""
+	board: Board = board_class(board_size)
+	color: Color = Color.BLACK
+	for location in moves:
+		if location is not None:
+			board.take_action(location, board.get_legal_actions(color)[location], color)
+		color: Color = _other(color)
+
+	return board
@@ -0,0 +1,108 @@
+from collections import defaultdict
+from typing import DefaultDict, Dict, List, Tuple, Union
+
+import numpy as np
+
+from agents.agent import Agent
+from agents.trainable_agent import TrainableAgent
+from game_logic.game import Game
+from rewards.reward import Reward
+from utils.color import Color
+from utils.profiler import profiler
+from utils.types import Action, Actions
+
+# a game with the legal actions and the action of its last take_action, waiting for end_step
+Step = Tuple[Game, Actions, Union[Action, None]]
+
+
+class VectorizedGame:
+	"""Plays several games in lockstep, with one network call per step for all trainable agents sharing a network."""
+
+	def __init__(self, games: List[Game]) -> None:
+		self.games: List[Game] = games
+
+	def play(self) -> None:
+		for game in self.games:
+			game.start()
+
+		# play until all games are done
+		games: List[Game] = list(self.games)
+		while games:
+			# positions waiting for q-values, per network
+			pending: DefaultDict[int, List[Tuple[Game, Actions]]] = defaultdict(list)
+			steps: List[Step] = []
+			for game in games:
+				# seeded games play as they would on their own
+				with game.own_random_state():
+					legal_actions: Actions = game.get_legal_actions()
+					if not legal_actions:
+						# pass
+						game.take_action(legal_actions, None)
+						steps.append((game, legal_actions, None))
+					elif isinstance(game.agent, TrainableAgent) and game.agent.uses_network(game.board):
+						pending[id(game.agent.dnn)].append((game, legal_actions))
+					else:
+						action: Action = game.agent.next_action(game.board, legal_actions)
+						game.take_action(legal_actions, action)
+						steps.append((game, legal_actions, action))
+			self.end_steps(steps)
+
+			for batch in pending.values():
+				# agents sharing a network may still prepare their inputs differently, e.g. per color
+				states: np.array = np.array([game.agent.board_to_nn_input(game.board.board) for game, _ in batch])
+				q_values: np.array = batch[0][0].agent.predict(states)
+				steps: List[Step] = []
+				for i, (game, legal_actions) in enumerate(batch):
+					with game.own_random_state():
+						action: Action = game.agent.get_action(legal_actions, q_values[i:i + 1])
+						game.take_action(legal_actions, action)
+					steps.append((game, legal_actions, action))
+				self.end_steps(steps)
+
+			games: List[Game] = [game for game in games if not game.done]
+
+	@staticmethod
+	def end_steps(steps: List[Step]) -> None:
+		# the rewards of all steps together, one call per reward instead of one per game
+		moved: List[Game] = [game for game, legal_actions, _ in steps if legal_actions and isinstance(game.agent, TrainableAgent)]
+		immediate_rewards: Dict[Game, float] = dict(zip(moved, get_rewards(
+			[game.agent.immediate_reward for game in moved], moved, [game.agent.color for game in moved])))
+
+		# final rewards of both agents of the games that just ended
+		finished: List[Tuple[Game, Agent]] = [
+			(game, agent) for game, _, _ in steps if game.done for agent in [game.black, game.config.white]
+			if isinstance(agent, TrainableAgent) and agent.train_mode
+		]
+		final_rewards: DefaultDict[Game, Dict[Agent, float]] = defaultdict(dict)
+		for (game, agent), final_reward in zip(finished, get_rewards(
+				[agent.final_reward for _, agent in finished], [game for game, _ in finished],
+				[agent.color for _, agent in finished])):
+			final_rewards[game][agent] = final_reward
+
+		for game, legal_actions, action in steps:
+			with game.own_random_state():
+				game.end_step(legal_actions, action, immediate_rewards.get(game), final_rewards.get(game))
+
+
+def get_rewards(rewards: List[Reward], games: List[Game], colors: List[Color]) -> List[float]:
+	"""The reward of each game for its color, the games sharing a reward are scored in one call of Reward.rewards."""
+	values: List[float] = [0.0] * len(games)
+	indices: DefaultDict[int, List[int]] = defaultdict(list)
+	for i, reward in enumerate(rewards):
+		indices[id(reward)].append(i)
+
+	with profiler.phase('reward'):
+		for group in indices.values():
+			reward: Reward = rewards[group[0]]
+			try:
+				group_values: List[float] = reward.rewards(
+					np.array([games[i].board.board for i in group]),
+					np.array([games[i].board.prev_board for i in group]),
+					np.array([colors[i].value for i in group])).tolist()
+			except NotImplementedError:
+				# e.g. rewards that search score one board at a time
+				group_values: List[float] = [reward.reward(games[i].board, colors[i]) for i in group]
+			for i, value in zip(group, group_values):
+				values[i] = value
+
+	return values
@@ -34,7 +34,7 @@ class Controller:
 				# Process white players turn
 				legal_directions: Directions = self.legal_actions[move]
 				self.prev_pass = False
-				self.done = self.game.board.take_action(move, legal_directions, Color.WHITE)
+				self.done, _ = self.game.board.take_action(move, legal_directions, Color.WHITE)
 				if self.done:
 					self._end_game()
 					return
@@ -64,7 +64,7 @@ class Controller:
 			# get next action from legal actions and take it
 			location, legal_directions = self.game.agent.next_action(self.game.board, legal_actions_black)
 			self.prev_pass = False  # this agent has legal actions, no pass
-			self.done = self.game.board.take_action(location, legal_directions, Color.BLACK)
+			self.done, _ = self.game.board.take_action(location, legal_directions, Color.BLACK)
 
 		if self.done:
 			self._end_game()
@@ -1,7 +1,5 @@
 import tkinter
 
-import numpy as np
-
 from game_logic.board import Board
 from utils.color import Color
 
@@ -11,7 +9,7 @@ PLAYERS = {Color.BLACK: 'Black', Color.WHITE: 'White'}
 class Score:
 	def __init__(self, color: Color, board: Board, root_window) -> None:
 		self._player: Color = color
-		self._board: np.array = board.board
+		self._board: Board = board
 		self._score: int = self.get_total_cells(self._player)
 		self._score_label: tkinter.Label = tkinter.Label(master=root_window,
 		                                                 text=self._score_text(),
@@ -36,4 +34,6 @@ class Score:
 		return f'{self._player.name}: {self._score}'
 
 	def get_total_cells(self, color: Color) -> int:
-		return len(np.where(self._board == color.value)[0])
+		if color is Color.BLACK:
+			return self._board.num_black_disks
+		return self._board.num_white_disks
@@ -20,6 +20,18 @@ from utils.risk_regions import heur, bench
 if __name__ == '__main__':
 	# board size
 	board_size: int = 8
+	# number of games played in lockstep, with batched network calls, 1 plays one game at a time
+	# more games train less often per game and draw other random numbers
+	num_envs: int = 1
+	# number of processes playing the training games, 0 plays them in this process
+	num_workers: int = 0
+	# number of moves of past games to sample minibatches from, 0 trains on each game on its own
+	# e.g. 2 ** 17 keeps about 4000 games of 8x8 and trains on minibatches sampled by priority from all of them
+	replay_capacity: int = 0
+	# number of processes playing the evaluation and test games, 0 plays them in this process
+	num_eval_workers: int = 0
+	# time the phases of every training config, e.g. move generation, predict and train_on_batch
+	profile: bool = False
 
 	# trainable black agent
 	black: TrainableAgent = CNNTrainableAgent(
@@ -33,6 +45,7 @@ if __name__ == '__main__':
 		immediate_reward=NoReward(),
 		final_reward=FixedReward(win=1, draw=0.5, loss=0),
 		board_size=board_size,
+		replay_capacity=replay_capacity,
 	)
 
 	# white agent for self-play
@@ -47,9 +60,11 @@ if __name__ == '__main__':
 		immediate_reward=NoReward(),
 		final_reward=FixedReward(win=1, draw=0.5, loss=0),
 		board_size=board_size,
+		replay_capacity=replay_capacity,
 	)
 	# share same networks:
 	self_play.dnn = black.dnn
+	self_play.inference_cache = black.inference_cache
 
 	# train strategy
 	train_configs: List[Config] = [
@@ -142,4 +157,5 @@ if __name__ == '__main__':
 	]
 
 	# run all configs
-	GlobalConfig(board_size, black, train_configs, eval_configs, test_configs, human_configs).start()
+	GlobalConfig(board_size, black, train_configs, eval_configs, test_configs, human_configs, num_envs, num_workers,
+	             num_eval_workers=num_eval_workers, profile=profile).start()
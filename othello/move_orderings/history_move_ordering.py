@@ -0,0 +1,41 @@
+from typing import Dict, List, Union
+
+from game_logic.board import Board
+from move_orderings.move_ordering import MoveOrdering
+from move_orderings.no_move_ordering import NoMoveOrdering
+from utils.color import Color
+from utils.types import Actions, Location, Locations
+
+
+class HistoryMoveOrdering(MoveOrdering):
+	def __init__(self, inner_move_ordering: Union[MoveOrdering, None] = None) -> None:
+		self.inner_move_ordering: MoveOrdering = inner_move_ordering if inner_move_ordering is not None else NoMoveOrdering()
+
+		# cutoff scores per color value and location, kept over searches
+		self.history: List[Dict[Location, int]] = [{}, {}]
+
+	def __str__(self) -> str:
+		return f'History{super().__str__()}(inner_move_ordering={self.inner_move_ordering})'
+
+	def order(self, board: Board, legal_actions: Actions, color: Color, ply: int) -> Locations:
+		history: Dict[Location, int] = self.history[color.value]
+		# highest history scores first, the inner order breaks ties
+		locations: Locations = self.inner_move_ordering.order(board, legal_actions, color, ply)
+		locations: Locations = sorted(locations, key=lambda location: history.get(location, 0), reverse=True)
+
+		return locations
+
+	def cutoff(self, location: Location, color: Color, depth: int, ply: int) -> None:
+		self.inner_move_ordering.cutoff(location, color, depth, ply)
+
+		# cutoffs close to the root prune the most
+		history: Dict[Location, int] = self.history[color.value]
+		history[location] = history.get(location, 0) + depth ** 2
+
+	def reset(self) -> None:
+		self.inner_move_ordering.reset()
+
+		# age the scores of earlier searches
+		for history in self.history:
+			for location in history:
+				history[location] //= 2
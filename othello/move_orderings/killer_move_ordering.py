@@ -0,0 +1,45 @@
+from typing import List, Union
+
+from game_logic.board import Board
+from move_orderings.move_ordering import MoveOrdering
+from move_orderings.no_move_ordering import NoMoveOrdering
+from utils.color import Color
+from utils.types import Actions, Location, Locations
+
+
+class KillerMoveOrdering(MoveOrdering):
+	def __init__(self, inner_move_ordering: Union[MoveOrdering, None] = None, num_killers: int = 2) -> None:
+		assert 1 <= num_killers, f'Invalid number of killers: num_killers should be at least 1, but got {num_killers}'
+
+		self.inner_move_ordering: MoveOrdering = inner_move_ordering if inner_move_ordering is not None else NoMoveOrdering()
+		self.num_killers: int = num_killers
+
+		# most recent cutoff locations per ply, most recent first
+		self.killers: List[Locations] = []
+
+	def __str__(self) -> str:
+		return f'Killer{super().__str__()}(inner_move_ordering={self.inner_move_ordering})'
+
+	def order(self, board: Board, legal_actions: Actions, color: Color, ply: int) -> Locations:
+		locations: Locations = self.inner_move_ordering.order(board, legal_actions, color, ply)
+		if ply < len(self.killers):
+			# killers of this ply that are legal here go first
+			killers: Locations = [killer for killer in self.killers[ply] if killer in legal_actions]
+			locations: Locations = killers + [location for location in locations if location not in killers]
+
+		return locations
+
+	def cutoff(self, location: Location, color: Color, depth: int, ply: int) -> None:
+		self.inner_move_ordering.cutoff(location, color, depth, ply)
+
+		while len(self.killers) <= ply:
+			self.killers.append([])
+		killers: Locations = self.killers[ply]
+		if location in killers:
+			killers.remove(location)
+		killers.insert(0, location)
+		del killers[self.num_killers:]
+
+	def reset(self) -> None:
+		self.inner_move_ordering.reset()
+		self.killers: List[Locations] = []
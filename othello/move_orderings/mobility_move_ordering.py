@@ -0,0 +1,26 @@
+from typing import Dict
+
+from game_logic.board import Board
+from move_orderings.move_ordering import MoveOrdering
+from utils.color import Color
+from utils.types import Actions, Location, Locations
+
+
+class MobilityMoveOrdering(MoveOrdering):
+	def __str__(self) -> str:
+		return f'Mobility{super().__str__()}'
+
+	def order(self, board: Board, legal_actions: Actions, color: Color, ply: int) -> Locations:
+		opponent_color: Color = Color.WHITE if color is Color.BLACK else Color.BLACK
+
+		# number of legal actions left to the opponent after each location
+		mobilities: Dict[Location, int] = {}
+		for location in legal_actions:
+			board.take_action(location, legal_actions[location], color)
+			mobilities[location] = len(board.get_legal_actions(opponent_color))
+			board.undo_action()
+
+		# lowest opponent's mobility first
+		locations: Locations = sorted(legal_actions, key=mobilities.get)
+
+		return locations
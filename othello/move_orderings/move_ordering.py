@@ -0,0 +1,22 @@
+from abc import abstractmethod
+
+from game_logic.board import Board
+from utils.color import Color
+from utils.types import Actions, Location, Locations
+
+
+class MoveOrdering:
+	def __str__(self) -> str:
+		return 'MoveOrdering'
+
+	@abstractmethod
+	def order(self, board: Board, legal_actions: Actions, color: Color, ply: int) -> Locations:
+		raise NotImplementedError
+
+	def cutoff(self, location: Location, color: Color, depth: int, ply: int) -> None:
+		# called when location caused a beta cutoff
+		pass
+
+	def reset(self) -> None:
+		# called before every new search
+		pass
@@ -0,0 +1,15 @@
+from game_logic.board import Board
+from move_orderings.move_ordering import MoveOrdering
+from utils.color import Color
+from utils.types import Actions, Locations
+
+
+class NoMoveOrdering(MoveOrdering):
+	def __str__(self) -> str:
+		return f'No{super().__str__()}'
+
+	def order(self, board: Board, legal_actions: Actions, color: Color, ply: int) -> Locations:
+		# row-major order of the legal actions
+		locations: Locations = list(legal_actions)
+
+		return locations
@@ -0,0 +1,20 @@
+import numpy as np
+
+from game_logic.board import Board
+from move_orderings.move_ordering import MoveOrdering
+from utils.color import Color
+from utils.types import Actions, Locations
+
+
+class WeightsMoveOrdering(MoveOrdering):
+	def __init__(self, weights: np.array) -> None:
+		self.weights: np.array = weights
+
+	def __str__(self) -> str:
+		return f'Weights{super().__str__()}'
+
+	def order(self, board: Board, legal_actions: Actions, color: Color, ply: int) -> Locations:
+		# highest weights first
+		locations: Locations = sorted(legal_actions, key=lambda location: self.weights[location], reverse=True)
+
+		return locations
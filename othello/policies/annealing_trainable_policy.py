@@ -11,6 +11,8 @@ class AnnealingTrainablePolicy(TrainablePolicy):
 	def __init__(self, inner_policy: TrainablePolicy) -> None:
 		self.inner_policy: TrainablePolicy = inner_policy
 		self.num_episodes: Union[int, None] = None
+		# episode of the next game
+		self.episode: int = 0
 
 	def __str__(self) -> str:
 		return f'Annealing{super().__str__()}'
@@ -19,6 +21,17 @@ class AnnealingTrainablePolicy(TrainablePolicy):
 	def update(self, episode: int) -> None:
 		raise NotImplementedError
 
+	def start(self, num_episodes: int) -> None:
+		# a new schedule of num_episodes games, the first game is episode 1
+		self.num_episodes: int = num_episodes
+		self.episode: int = 1
+		self.update(self.episode)
+
+	def step(self, num_games: int = 1) -> None:
+		# once per finished game, so the schedule does not depend on how many games are played at once
+		self.episode: int = min(self.episode + num_games, self.num_episodes)
+		self.update(self.episode)
+
 	def get_action(self, legal_actions: Actions, q_values: np.array) -> Action:
 		action: Action = self.inner_policy.get_action(legal_actions, q_values)
 
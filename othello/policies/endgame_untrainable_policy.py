@@ -0,0 +1,32 @@
+from game_logic.board import Board
+from policies.untrainable_policy import UntrainablePolicy
+from utils.color import Color
+from utils.endgame_solver import EndgameSolver
+from utils.types import Actions, Location, Directions, Action
+
+
+class EndgameUntrainablePolicy(UntrainablePolicy):
+	def __init__(self, board_size: int, num_empties: int = 10, exact: bool = True) -> None:
+		assert 0 <= num_empties <= board_size ** 2 - 4, f'Invalid number of empties: num_empties should be between 0 and {board_size ** 2 - 4}, but got {num_empties}'
+
+		# other policies switch to this policy from num_empties free spots on, an exact solve from 14 takes seconds
+		self.num_empties: int = num_empties
+		# exact solves maximize the final disk difference, otherwise any winning location will do
+		self.exact: bool = exact
+		self.solver: EndgameSolver = EndgameSolver(board_size)
+
+	def __str__(self) -> str:
+		return f'Endgame{super().__str__()}'
+
+	def applies(self, board: Board) -> bool:
+		return board.num_free_spots <= self.num_empties
+
+	def get_action(self, board: Board, legal_actions: Actions, color: Color) -> Action:
+		_, location = self.solver.solve(board, color, self.exact)
+		if location not in legal_actions:
+			# cannot happen for a legal position, but never return an illegal action
+			location: Location = next(iter(legal_actions))
+		directions: Directions = legal_actions[location]
+		action: Action = (location, directions)
+
+		return action
@@ -0,0 +1,177 @@
+from typing import List, Tuple, Union
+
+import numpy as np
+
+from agents.trainable_agent import TrainableAgent
+from game_logic.board import Board
+from policies.untrainable_policy import UntrainablePolicy
+from utils.color import Color
+from utils.mcts_tree import MCTSTree, PASS
+from utils.network_evaluation import evaluate_positions
+from utils.types import Action, Actions, Directions, Location
+
+# a leaf waiting for its evaluation: path from the root, board, color to move and legal location indices
+Leaf = Tuple[List[int], np.array, Color, List[int]]
+
+
+class MCTSUntrainablePolicy(UntrainablePolicy):
+	def __init__(self, agent: TrainableAgent, num_simulations: int = 200, batch_size: int = 16,
+	             c_puct: float = 1.5, virtual_loss: float = 1.0, reuse_tree: bool = True) -> None:
+		assert 1 <= num_simulations, f'Invalid number of simulations: num_simulations should be at least 1, but got {num_simulations}'
+		assert 1 <= batch_size, f'Invalid batch size: batch_size should be at least 1, but got {batch_size}'
+
+		# the network of agent gives the priors and values of positions of both colors
+		self.agent: TrainableAgent = agent
+		self.board_size: int = agent.board_size
+		# number of leaves evaluated or terminal positions reached per move
+		self.num_simulations: int = num_simulations
+		# number of leaves evaluated in one network call
+		self.batch_size: int = batch_size
+		# exploration, how much the priors count against the values
+		self.c_puct: float = c_puct
+		# value of a pending evaluation, so the leaves of a batch spread over the tree
+		self.virtual_loss: float = virtual_loss
+		# continue with the subtree of the actual moves instead of a new tree
+		self.reuse_tree: bool = reuse_tree
+
+		self.tree: MCTSTree = MCTSTree()
+		# (number of actions before the last move, hash before the last move, its location, its node)
+		self._last_move: Union[Tuple[int, int, Location, int], None] = None
+
+		# counters of the last search
+		self.num_batches: int = 0
+		self.num_collisions: int = 0
+		self.num_reused_visits: int = 0
+
+	def __str__(self) -> str:
+		return f'MCTS{super().__str__()}'
+
+	def get_action(self, board: Board, legal_actions: Actions, color: Color) -> Action:
+		self._set_root(board, color)
+		self.num_batches: int = 0
+		self.num_collisions: int = 0
+
+		# search on a single copy, so the game's board is never touched
+		search_board: Board = board.get_deepcopy()
+		num_simulations: int = 0
+		while num_simulations < self.num_simulations:
+			num_simulations += self._simulate(search_board, color, min(self.batch_size,
+			                                                            self.num_simulations - num_simulations))
+
+		node: int = self.tree.best_child(0)
+		location: Location = divmod(int(self.tree.locations[node]), self.board_size)
+		self._last_move = (len(board.history), board.hash, location, node)
+		directions: Directions = legal_actions[location]
+		action: Action = (location, directions)
+
+		return action
+
+	def _set_root(self, board: Board, color: Color) -> None:
+		# find the node of board below the node of the last move, through the moves and passes since
+		node: Union[int, None] = None
+		if self.reuse_tree and self._last_move is not None:
+			num_actions, hash_value, location, node = self._last_move
+			if len(board.history) <= num_actions or board.prev_hashes[num_actions] != hash_value or \
+					board.history[num_actions][0] != location:
+				# another game, or another board
+				node = None
+			else:
+				# the opponent moves after the last move, a player that did not move passed
+				to_move: Color = Color.WHITE if color is Color.BLACK else Color.BLACK
+				for history_location, _, _, mover in board.history[num_actions + 1:]:
+					if node is not None and mover is not to_move:
+						node = self._find_child(node, PASS)
+					if node is not None:
+						node = self._find_child(node, history_location[0] * self.board_size + history_location[1])
+					to_move: Color = Color.WHITE if mover is Color.BLACK else Color.BLACK
+				if node is not None and to_move is not color:
+					node = self._find_child(node, PASS)
+
+		if node is None:
+			self.tree: MCTSTree = MCTSTree()
+		elif node != 0:
+			self.tree: MCTSTree = self.tree.subtree(node)
+		self.num_reused_visits: int = int(self.tree.visits[0])
+		self._last_move = None
+
+	def _find_child(self, node: int, location: int) -> Union[int, None]:
+		for child in self.tree.children(node):
+			if self.tree.locations[child] == location:
+				return int(child)
+		return None
+
+	def _simulate(self, board: Board, color: Color, max_simulations: int) -> int:
+		"""Run up to num_simulations simulations, evaluate their leaves in one batch and back up their values."""
+		tree: MCTSTree = self.tree
+		leaves: List[Leaf] = []
+		num_simulations: int = 0
+		# terminal positions count as simulations too, or a solved tree would never fill a batch
+		while num_simulations < max_simulations:
+			path, leaf_board, leaf_color, locations = self._select(board, color)
+			num_simulations += 1
+			if tree.terminals[path[-1]]:
+				# the result is known, no evaluation needed
+				tree.virtual_losses[path] -= 1
+				tree.backup(path, float(tree.terminal_values[path[-1]]))
+				continue
+			if any(path[-1] == leaf[0][-1] for leaf in leaves):
+				# every path leads to a pending leaf, evaluate what there is
+				tree.virtual_losses[path] -= 1
+				num_simulations -= 1
+				self.num_collisions += 1
+				break
+			leaves.append((path, leaf_board, leaf_color, locations))
+
+		if leaves:
+			self.num_batches += 1
+			priors, values = self._evaluate(leaves)
+			for (path, _, _, locations), leaf_priors, value in zip(leaves, priors, values):
+				tree.virtual_losses[path] -= 1
+				if not tree.is_expanded(path[-1]):
+					tree.expand(path[-1], locations, leaf_priors)
+				tree.backup(path, value)
+
+		return num_simulations
+
+	def _select(self, board: Board, color: Color) -> Leaf:
+		# walk down the tree on board, and back up again, passes are nodes of their own
+		tree: MCTSTree = self.tree
+		node: int = 0
+		path: List[int] = [0]
+		num_actions: int = 0
+		locations: List[int] = []
+		while not tree.terminals[node]:
+			opponent_color: Color = Color.WHITE if color is Color.BLACK else Color.BLACK
+			if not tree.is_expanded(node):
+				legal_actions: Actions = board.get_legal_actions(color)
+				if legal_actions:
+					# a leaf
+					locations: List[int] = [row * self.board_size + col for row, col in legal_actions]
+					break
+				if board.get_legal_actions(opponent_color):
+					tree.expand(node, [PASS], np.ones(1))
+				else:
+					tree.terminals[node] = True
+					own: int = board.num_black_disks if color is Color.BLACK else board.num_white_disks
+					opponent: int = board.num_white_disks if color is Color.BLACK else board.num_black_disks
+					tree.terminal_values[node] = np.sign(own - opponent)
+					break
+
+			node: int = tree.select(node, self.c_puct, self.virtual_loss)
+			if tree.locations[node] != PASS:
+				location: Location = divmod(int(tree.locations[node]), self.board_size)
+				board.take_action(location, board.get_legal_actions(color)[location], color)
+				num_actions += 1
+			color: Color = opponent_color
+			path.append(node)
+
+		tree.virtual_losses[path] += 1
+		leaf_board: np.array = board.board.copy()
+		for _ in range(num_actions):
+			board.undo_action()
+
+		return path, leaf_board, color, locations
+
+	def _evaluate(self, leaves: List[Leaf]) -> Tuple[List[np.array], np.array]:
+		return evaluate_positions(self.agent, [leaf[1] for leaf in leaves], [leaf[2] for leaf in leaves],
+		                          [leaf[3] for leaf in leaves])
@@ -1,90 +1,441 @@
-from typing import Tuple, Union
+import multiprocessing
+import pickle
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from math import inf
+from time import perf_counter, time
+from typing import Dict, List, Tuple, Union
 
 from game_logic.board import Board
-from policies.policy import Policy
+from move_orderings.move_ordering import MoveOrdering
+from move_orderings.no_move_ordering import NoMoveOrdering
+from policies.endgame_untrainable_policy import EndgameUntrainablePolicy
 from policies.untrainable_policy import UntrainablePolicy
 from rewards.reward import Reward
 from utils.color import Color
-from utils.types import Actions, Location, Directions, Action
+from utils.pattern_evaluator import PatternEvaluator
+from utils.transposition_table import Bound, TranspositionTable
+from utils.types import Actions, Location, Directions, Action, Locations
+
+
+class SearchTimeout(Exception):
+	pass
+
+
+# (score, number of nodes, number of cutoffs, best locations of the exact nodes) of one root location
+MoveResult = Tuple[float, int, int, Dict[int, Location]]
+
+# the copy of the policy in a worker process of a parallel search, and the search its state belongs to
+_worker_policy: Union['MinimaxUntrainablePolicy', None] = None
+_worker_search: int = -1
+
+
+def _init_worker(snapshot: bytes) -> None:
+	global _worker_policy
+	_worker_policy = pickle.loads(snapshot)
+
+
+def _ready() -> None:
+	# nothing to do, the worker is ready once it ran _init_worker
+	pass
+
+
+def _search_move(board: Board, color: Color, location: Location, depth: int, alpha: float, beta: float,
+                 search: int, pv_locations: Dict[int, Location], deadline: Union[float, None]) -> Union[MoveResult, None]:
+	# runs in a worker process, None when the time ran out
+	global _worker_search
+	policy: MinimaxUntrainablePolicy = _worker_policy
+	if search != _worker_search:
+		# keep the transposition table of earlier root locations of the same search, age the rest
+		if policy.transposition_table is None and policy.transposition_table_size > 0:
+			policy.transposition_table = TranspositionTable(policy.transposition_table_size)
+		if policy.transposition_table is not None:
+			policy.transposition_table.new_search()
+		policy.move_ordering.reset()
+		_worker_search = search
+	policy.num_nodes: int = 0
+	policy.num_cutoffs: int = 0
+	policy._exact_locations = {}
+	policy._pv_locations = pv_locations
+	# a location may wait for a free worker, its time is up at the same moment as the others'
+	policy._deadline = None if deadline is None else perf_counter() + deadline - time()
+	if policy.evaluator is not None:
+		policy.evaluator.set_board(board)
+
+	try:
+		score: float = policy.search_move(board, color, location, depth, alpha, beta)
+	except SearchTimeout:
+		return None
+
+	return score, policy.num_nodes, policy.num_cutoffs, policy._exact_locations
 
 
 class MinimaxUntrainablePolicy(UntrainablePolicy):
-	def __init__(self, immediate_reward: Reward, depth: int) -> None:
-		assert 2 <= depth <= 3, f'Invalid depth: depth should be between 2 and 3, but got {depth}'
+	def __init__(self, immediate_reward: Reward, depth: int, transposition_table_size: int = 2 ** 18,
+	             time_budget: Union[float, None] = None, aspiration_window: float = 50.0,
+	             move_ordering: Union[MoveOrdering, None] = None,
+	             endgame_policy: Union[EndgameUntrainablePolicy, None] = None,
+	             evaluator: Union[PatternEvaluator, None] = None, num_workers: int = 1) -> None:
+		assert 1 <= depth, f'Invalid depth: depth should be at least 1, but got {depth}'
+		assert 1 <= num_workers, f'Invalid number of workers: num_workers should be at least 1, but got {num_workers}'
+		if time_budget is not None:
+			assert 0 < time_budget, f'Invalid time budget: time_budget should be positive, but got {time_budget}'
 
 		self.immediate_reward: Reward = immediate_reward
+		# number of plies to search, or the maximum number of plies when searching with a time budget
 		self.depth: int = depth
+		# a size of 0 disables the transposition table
+		self.transposition_table_size: int = transposition_table_size
+		# made at the first search, so policies that never search, e.g. copies in other processes, do not hold one
+		self.transposition_table: Union[TranspositionTable, None] = None
+		# seconds per move for iterative deepening, None searches to a fixed depth
+		self.time_budget: Union[float, None] = time_budget
+		# half width of the window around the previous iteration's score
+		self.aspiration_window: float = aspiration_window
+		# a move ordering of its own per policy, move orderings remember cutoffs
+		self.move_ordering: MoveOrdering = move_ordering if move_ordering is not None else NoMoveOrdering()
+		# solves the rest of the game exactly once few enough free spots are left
+		self.endgame_policy: Union[EndgameUntrainablePolicy, None] = endgame_policy
+		# scores the leaves by the value of the position instead of the immediate reward of the last move
+		self.evaluator: Union[PatternEvaluator, None] = evaluator
+		# processes that search the root locations in parallel, 1 searches in this process only
+		self.num_workers: int = num_workers
+
+		# counters of the last search
+		self.num_nodes: int = 0
+		self.num_cutoffs: int = 0
+		self.completed_depth: int = 0
+		self.principal_variation: Locations = []
+
+		# best locations of the exact nodes of the current and previous iteration, by hash
+		self._exact_locations: Dict[int, Location] = {}
+		self._pv_locations: Dict[int, Location] = {}
+		self._deadline: Union[float, None] = None
+
+		# the workers keep their transposition tables between searches
+		self._executor: Union[ProcessPoolExecutor, None] = None
+		# what scores the workers' copies of the policy, they are started again once it changes
+		self._worker_state: bytes = b''
+		self._search: int = 0
+		if num_workers > 1:
+			# started now, so their startup does not count against the time budget of the first search
+			self._start_workers()
 
 	def __str__(self) -> str:
 		return f'Minimax{super().__str__()}'
 
+	def __getstate__(self) -> dict:
+		# copies in other processes search on their own, e.g. the workers themselves, and make their own table
+		state: dict = self.__dict__.copy()
+		state['num_workers'] = 1
+		state['_executor'] = None
+		state['_worker_state'] = b''
+		state['transposition_table'] = None
+
+		return state
+
+	def _get_worker_state(self) -> bytes:
+		# e.g. new weights of the evaluator, the rest of the policy is sent with every location
+		return pickle.dumps((self.immediate_reward, self.evaluator))
+
+	def _start_workers(self) -> None:
+		self._worker_state: bytes = self._get_worker_state()
+		# spawn instead of fork, tensorflow does not survive being forked
+		self._executor = ProcessPoolExecutor(self.num_workers, multiprocessing.get_context('spawn'),
+		                                     initializer=_init_worker, initargs=(pickle.dumps(self),))
+		# processes are spawned as tasks come in, so give every worker one and wait until all of them are ready
+		for future in [self._executor.submit(_ready) for _ in range(self.num_workers)]:
+			future.result()
+
+	def close(self) -> None:
+		if self._executor is not None:
+			self._executor.shutdown(cancel_futures=True)
+			self._executor = None
+
+	@property
+	def effective_branching_factor(self) -> float:
+		# the branching factor of a uniform tree with as many nodes as the last search
+		if self.completed_depth == 0:
+			return 0.0
+		return self.num_nodes ** (1 / self.completed_depth)
+
 	@staticmethod
-	def _finished(board: Board) -> Tuple[bool, Color]:
-		black_legal_actions: Actions = board.get_legal_actions(Color.BLACK)
-		white_legal_actions: Actions = board.get_legal_actions(Color.WHITE)
-
-		ended: bool = False
-		won: Union[Color, None] = None
-		if not white_legal_actions and not black_legal_actions:
-			ended: bool = True  # someone won
-			if board.num_black_disks > board.num_white_disks:
-				won: Color = Color.BLACK
-			elif board.num_white_disks > board.num_black_disks:
-				won: Color = Color.WHITE
+	def _final_score(board: Board, color: Color) -> float:
+		# nobody can play anymore
+		if board.num_black_disks == board.num_white_disks:
+			return 0.0
+		if (board.num_black_disks > board.num_white_disks) == (color is Color.BLACK):
+			return 1000.0
+		return -1000.0
+
+	def minimax(self, board: Board, color: Color, depth: int, alpha: float = -inf, beta: float = inf,
+	            ply: int = 0) -> Tuple[float, Union[Location, None]]:
+		# negamax with alpha-beta pruning: scores are always from the point of view of color
+		self.num_nodes += 1
+		if self._deadline is not None and self.num_nodes & 15 == 0 and perf_counter() > self._deadline:
+			raise SearchTimeout
+		opponent_color: Color = Color.WHITE if color is Color.BLACK else Color.BLACK
+
+		# probe the transposition table
+		key: int = board.hash ^ board.zobrist.color_keys[color.value]
+		tt_location: Union[Location, None] = None
+		if self.transposition_table is not None:
+			entry = self.transposition_table.lookup(key)
+			if entry is not None:
+				tt_depth, bound, score, tt_location = entry
+				# never cut at the root, where a location is needed
+				if tt_depth >= depth and ply > 0:
+					if bound is Bound.EXACT:
+						return score, tt_location
+					if bound is Bound.LOWER and score >= beta:
+						return score, tt_location
+					if bound is Bound.UPPER and score <= alpha:
+						return score, tt_location
+
+		legal_actions: Actions = board.get_legal_actions(color)
+		if not legal_actions:
+			if not board.get_legal_actions(opponent_color):
+				return self._final_score(board, color), None
+			# pass -> opponent plays next ply
+			score, _ = self.minimax(board, opponent_color, depth, -beta, -alpha, ply + 1)
+			return -score, None
+
+		# try the principal variation of the previous iteration first, then the best location of an earlier search,
+		# then the rest in the order of the move ordering
+		locations: Locations = self.move_ordering.order(board, legal_actions, color, ply)
+		for first_location in (tt_location, self._pv_locations.get(key)):
+			if first_location in legal_actions:
+				locations.remove(first_location)
+				locations.insert(0, first_location)
+
+		original_alpha: float = alpha
+		best_score: float = -inf
+		best_location: Union[Location, None] = None
+		for location in locations:
+			# walk the tree in place, the action is undone before the next one is tried
+			_, flipped = board.take_action(location, legal_actions[location], color)
+			if self.evaluator is not None:
+				self.evaluator.update(location, flipped, color)
+			if depth == 1:
+				self.num_nodes += 1
+				if self.evaluator is not None:
+					score: float = self.evaluator.evaluate(color)
+				else:
+					score: float = self.immediate_reward.reward(board, color)
 			else:
-				won: Color = Color.EMPTY
+				score, _ = self.minimax(board, opponent_color, depth - 1, -beta, -alpha, ply + 1)
+				score: float = -score
+			board.undo_action()
+			if self.evaluator is not None:
+				self.evaluator.undo()
 
-		return ended, won
+			if score > best_score:
+				best_score: float = score
+				best_location: Location = location
+			alpha: float = max(alpha, score)
+			if alpha >= beta:
+				# the opponent will never allow this line
+				self.num_cutoffs += 1
+				self.move_ordering.cutoff(location, color, depth, ply)
+				break
 
-	def minimax(self, board: Board, legal_actions: Actions, color: Color, level: int = 0,
-	            prev_best_points: float = None) -> Tuple[float, Location]:
-		cur_best_score: None = None
-		cur_best_location: None = None
+		# store the result in the transposition table
+		if best_score <= original_alpha:
+			bound: Bound = Bound.UPPER
+		elif best_score >= beta:
+			bound: Bound = Bound.LOWER
+		else:
+			bound: Bound = Bound.EXACT
+			self._exact_locations[key] = best_location
+		if self.transposition_table is not None:
+			self.transposition_table.store(key, depth, bound, best_score, best_location)
+
+		return best_score, best_location
+
+	def search_move(self, board: Board, color: Color, location: Location, depth: int, alpha: float = -inf,
+	                beta: float = inf) -> float:
+		"""Score of location for color at the root, searched to depth with the window of the root."""
 		opponent_color: Color = Color.WHITE if color is Color.BLACK else Color.BLACK
+		_, flipped = board.take_action(location, board.get_legal_actions(color)[location], color)
+		if self.evaluator is not None:
+			self.evaluator.update(location, flipped, color)
+		score, _ = self.minimax(board, opponent_color, depth - 1, -beta, -alpha, 1)
+		board.undo_action()
+		if self.evaluator is not None:
+			self.evaluator.undo()
 
-		for location in legal_actions:
-			new_board: Board = board.get_deepcopy()
-			new_board.take_action(location, legal_actions[location], color)
-			if level < self.depth:
-				new_legal_actions: Actions = new_board.get_legal_actions(
-					opponent_color)
-				if not new_legal_actions:  # opponent passes -> player plays again
-					new_legal_actions: Actions = new_board.get_legal_actions(
-						color)
-					points, _ = self.minimax(new_board, new_legal_actions, color, level + 1, cur_best_score)
-				else:  # opponent plays next ply
-					points, _ = self.minimax(new_board, new_legal_actions, opponent_color, level + 1, cur_best_score)
-			else:
-				points: float = self.immediate_reward.reward(new_board, color)
-
-			# when points is not assigned -> due to nobody can play anymore
-			if points is None:
-				ended, won = self._finished(new_board)
-				if ended:
-					if won == color.value:
-						points: float = 1000.0
-					elif won == 1 - color.value:
-						points: float = -1000.0
-					else:
-						points: float = 0.0
-
-			if color.value == color.value:  # max_step
-				if cur_best_score is None or cur_best_score < points:
-					cur_best_score: float = points
-					cur_best_location: Location = location
-				if prev_best_points is not None and cur_best_score > prev_best_points:
-					break
-			elif opponent_color == color.value:  # min step
-				if cur_best_score is None or cur_best_score > points:
-					cur_best_score: float = points
-					cur_best_location: Location = location
-				if prev_best_points is not None and cur_best_score < prev_best_points:
+		return -score
+
+	def split_root(self, board: Board, color: Color, depth: int, alpha: float = -inf,
+	               beta: float = inf) -> Tuple[float, Union[Location, None]]:
+		"""Root splitting: the first location is searched here for a bound, the others in the workers with it.
+
+		Every worker has its own transposition table, so the nodes searched, and with ties even the location, may
+		differ from a search in one process.
+		"""
+		legal_actions: Actions = board.get_legal_actions(color)
+		if depth == 1 or len(legal_actions) < 2:
+			# nothing to split
+			return self.minimax(board, color, depth, alpha, beta)
+		self.num_nodes += 1
+
+		# the same order as minimax at the root, so the first location is most likely the best one
+		key: int = board.hash ^ board.zobrist.color_keys[color.value]
+		entry = self.transposition_table.lookup(key) if self.transposition_table is not None else None
+		tt_location: Union[Location, None] = entry[3] if entry is not None else None
+		locations: Locations = self.move_ordering.order(board, legal_actions, color, 0)
+		for first_location in (tt_location, self._pv_locations.get(key)):
+			if first_location in legal_actions:
+				locations.remove(first_location)
+				locations.insert(0, first_location)
+
+		original_alpha: float = alpha
+		best_score: float = self.search_move(board, color, locations[0], depth, alpha, beta)
+		best_location: Location = locations[0]
+		alpha: float = max(alpha, best_score)
+		if alpha < beta:
+			# perf_counter is per process, the workers get the deadline in wall clock time
+			deadline: Union[float, None] = None if self._deadline is None else time() + self._deadline - perf_counter()
+			futures: List[Future] = [
+				self._executor.submit(_search_move, board, color, location, depth, alpha, beta, self._search,
+				                      self._pv_locations, deadline)
+				for location in locations[1:]]
+			# in the order of the locations, so ties go to the same location every time
+			best_exact_locations: Dict[int, Location] = {}
+			for location, future in zip(locations[1:], futures):
+				result: Union[MoveResult, None] = future.result()
+				if result is None:
+					for other in futures:
+						other.cancel()
+					raise SearchTimeout
+				score, num_nodes, num_cutoffs, exact_locations = result
+				self.num_nodes += num_nodes
+				self.num_cutoffs += num_cutoffs
+				if score > best_score:
+					best_score: float = score
+					best_location: Location = location
+					best_exact_locations: Dict[int, Location] = exact_locations
+				if score >= beta:
+					self.num_cutoffs += 1
+					for other in futures:
+						other.cancel()
 					break
+			# the principal variation continues in the worker that found it
+			self._exact_locations.update(best_exact_locations)
+
+		if best_score <= original_alpha:
+			bound: Bound = Bound.UPPER
+		elif best_score >= beta:
+			bound: Bound = Bound.LOWER
+		else:
+			bound: Bound = Bound.EXACT
+			self._exact_locations[key] = best_location
+		if self.transposition_table is not None:
+			self.transposition_table.store(key, depth, bound, best_score, best_location)
 
-		return cur_best_score, cur_best_location
+		return best_score, best_location
+
+	def search_root(self, board: Board, color: Color, depth: int, alpha: float = -inf,
+	                beta: float = inf) -> Tuple[float, Union[Location, None]]:
+		if self.num_workers > 1:
+			return self.split_root(board, color, depth, alpha, beta)
+		return self.minimax(board, color, depth, alpha, beta)
+
+	def iterative_deepening(self, board: Board, color: Color) -> Location:
+		self._deadline = None
+		self._pv_locations = {}
+		start_time: float = perf_counter()
+		best_location: Union[Location, None] = None
+		best_score: Union[float, None] = None
+		for depth in range(1, self.depth + 1):
+			self._exact_locations = {}
+			try:
+				if best_score is None:
+					score, location = self.search_root(board, color, depth)
+				else:
+					# aspiration window around the previous score, searched again with a full window on a fail
+					alpha: float = best_score - self.aspiration_window
+					beta: float = best_score + self.aspiration_window
+					score, location = self.search_root(board, color, depth, alpha, beta)
+					if score <= alpha or score >= beta:
+						self._exact_locations = {}
+						score, location = self.search_root(board, color, depth)
+			except SearchTimeout:
+				# the interrupted iteration leaves the board mid-search, it is a copy that is thrown away
+				break
+			finally:
+				# the first iteration always completes
+				self._deadline = start_time + self.time_budget
+
+			best_score, best_location = score, location
+			self.completed_depth: int = depth
+			self._pv_locations = self._exact_locations
+			self.principal_variation: Locations = self._get_principal_variation(board, color)
+
+			if perf_counter() > self._deadline:
+				break
+
+		self._deadline = None
+
+		return best_location
+
+	def _get_principal_variation(self, board: Board, color: Color) -> Locations:
+		principal_variation: Locations = []
+		key: int = board.hash ^ board.zobrist.color_keys[color.value]
+		while key in self._pv_locations and len(principal_variation) < self.depth:
+			location: Location = self._pv_locations[key]
+			legal_actions: Actions = board.get_legal_actions(color)
+			if location not in legal_actions:
+				break
+			board.take_action(location, legal_actions[location], color)
+			principal_variation.append(location)
+			color: Color = Color.WHITE if color is Color.BLACK else Color.BLACK
+			if not board.get_legal_actions(color):
+				# pass
+				color: Color = Color.WHITE if color is Color.BLACK else Color.BLACK
+			key: int = board.hash ^ board.zobrist.color_keys[color.value]
+		for _ in principal_variation:
+			board.undo_action()
+
+		return principal_variation
+
+	def search(self, board: Board, color: Color) -> Location:
+		if self.transposition_table is None and self.transposition_table_size > 0:
+			self.transposition_table: TranspositionTable = TranspositionTable(self.transposition_table_size)
+		if self.transposition_table is not None:
+			self.transposition_table.new_search()
+		self.move_ordering.reset()
+		self.num_nodes: int = 0
+		self.num_cutoffs: int = 0
+		self._search += 1
+		if self.num_workers > 1 and (self._executor is None or self._get_worker_state() != self._worker_state):
+			# the workers got a copy of the policy when they started, it is out of date
+			self.close()
+			self._start_workers()
+
+		# search on a single copy, so the game's board is never touched
+		board: Board = board.get_deepcopy()
+		if self.evaluator is not None:
+			self.evaluator.set_board(board)
+		if self.time_budget is None:
+			_, location = self.search_root(board, color, self.depth)
+			self.completed_depth: int = self.depth
+		else:
+			location: Location = self.iterative_deepening(board, color)
+
+		return location
 
 	def get_action(self, board: Board, legal_actions: Actions, color: Color) -> Action:
-		_, location = self.minimax(board, legal_actions, color)
+		if self.endgame_policy is not None and self.endgame_policy.applies(board):
+			return self.endgame_policy.get_action(board, legal_actions, color)
+
+		try:
+			location: Location = self.search(board, color)
+		except BrokenProcessPool:
+			# a worker died, e.g. out of memory, search in this process from now on
+			self.close()
+			self.num_workers: int = 1
+			location: Location = self.search(board, color)
 		directions: Directions = legal_actions[location]
 		action: Action = (location, directions)
 
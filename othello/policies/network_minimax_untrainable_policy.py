@@ -0,0 +1,249 @@
+from enum import Enum
+from math import inf
+from queue import Queue
+from threading import Thread
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+
+from agents.trainable_agent import TrainableAgent
+from game_logic.board import Board
+from policies.untrainable_policy import UntrainablePolicy
+from utils.color import Color
+from utils.mcts_tree import PASS
+from utils.minimax_tree import MinimaxTree
+from utils.network_evaluation import evaluate_positions
+from utils.types import Action, Actions, Directions, Location
+
+# nodes, boards, colors to move and legal location indices of leaves, evaluated together
+Batch = Tuple[List[int], List[np.array], List[Color], List[List[int]]]
+
+
+class NodeType(Enum):
+	PV = 0
+	CUT = 1  # the first child is expected to cut the others off
+	ALL = 2  # every child is expected to be searched
+
+
+class NetworkMinimaxUntrainablePolicy(UntrainablePolicy):
+	"""Alpha-beta on a tree whose leaves are valued by the network of agent.
+
+	Iterative deepening: each depth is searched in passes of alpha-beta on the values of the depth before, which order
+	the children. A leaf the network has not valued yet counts with the value of its parent, and values that depend on
+	one neither narrow windows nor cut off. The siblings of a node wait for its first child, and the children of a cut
+	node for each other, so few leaves are evaluated that alpha-beta would cut off. The leaves of a pass are evaluated
+	in batches by a thread that runs the network while the pass goes on, until a pass needs no new leaf and is exact.
+	Passes do not count as a ply.
+	"""
+
+	def __init__(self, agent: TrainableAgent, depth: int = 3, batch_size: int = 1024) -> None:
+		assert 1 <= depth, f'Invalid depth: depth should be at least 1, but got {depth}'
+		assert 1 <= batch_size, f'Invalid batch size: batch_size should be at least 1, but got {batch_size}'
+
+		# the network of agent gives the values of positions of both colors
+		self.agent: TrainableAgent = agent
+		self.board_size: int = agent.board_size
+		# number of plies to search
+		self.depth: int = depth
+		# number of leaves evaluated in one network call
+		self.batch_size: int = batch_size
+
+		# tree of the current search, with the legal actions of its expanded nodes and the leaves waiting to be handed
+		# to the network
+		self._tree: MinimaxTree = MinimaxTree()
+		self._legal_actions: Dict[int, Actions] = {}
+		self._batch: Batch = ([], [], [], [])
+		self._queue: Union[Queue, None] = None
+		# an exception of the network thread, raised again by the searching thread
+		self._error: Union[BaseException, None] = None
+		self._best_location: Union[Location, None] = None
+
+		# counters of the last search, over all of its passes
+		self.num_nodes: int = 0
+		self.num_leaves: int = 0
+		self.num_batches: int = 0
+		self.num_passes: int = 0
+		self.num_cutoffs: int = 0
+
+	def __str__(self) -> str:
+		return f'NetworkMinimax{super().__str__()}'
+
+	def get_action(self, board: Board, legal_actions: Actions, color: Color) -> Action:
+		self._tree: MinimaxTree = MinimaxTree()
+		self._legal_actions: Dict[int, Actions] = {}
+		self._batch: Batch = ([], [], [], [])
+		self._best_location: Union[Location, None] = None
+		self.num_leaves: int = 0
+		self.num_batches: int = 0
+		self.num_passes: int = 0
+		self.num_cutoffs: int = 0
+
+		# the network evaluates full batches while the pass goes on
+		self._queue: Queue = Queue()
+		self._error: Union[BaseException, None] = None
+		results: List[Tuple[List[int], np.array]] = []
+		thread: Thread = Thread(target=self._evaluate_batches, args=(self._queue, results))
+		thread.start()
+		try:
+			# search on a single copy, so the game's board is never touched
+			board: Board = board.get_deepcopy()
+			for depth in range(1, self.depth + 1):
+				self._tree.new_depth()
+				while True:
+					num_leaves: int = self.num_leaves
+					self.num_passes += 1
+					self._search(board, color, 0, depth, -inf, inf, NodeType.PV)
+					if self.num_leaves == num_leaves:
+						# the network valued every leaf of the pass, it was alpha-beta on its values alone
+						break
+					# the next pass needs the values of this one
+					self._flush()
+					self._queue.join()
+					if self._error is not None:
+						raise self._error
+					for nodes, values in results:
+						self._tree.set_leaf_values(nodes, values)
+					results.clear()
+		finally:
+			self._queue.put(None)
+			thread.join()
+			self._queue = None
+		self.num_nodes: int = len(self._tree)
+
+		location: Location = self._best_location
+		directions: Directions = legal_actions[location]
+		action: Action = (location, directions)
+
+		return action
+
+	def _expand(self, board: Board, color: Color, node: int) -> None:
+		legal_actions: Actions = board.get_legal_actions(color)
+		if legal_actions:
+			# every pass walks the same nodes again
+			self._legal_actions[node] = legal_actions
+			self._tree.expand(node, [row * self.board_size + col for row, col in legal_actions])
+			return
+
+		opponent_color: Color = Color.WHITE if color is Color.BLACK else Color.BLACK
+		if board.get_legal_actions(opponent_color):
+			self._tree.expand(node, [PASS])
+			return
+
+		# nobody can play anymore, the result is known
+		own: int = board.num_black_disks if color is Color.BLACK else board.num_white_disks
+		opponent: int = board.num_white_disks if color is Color.BLACK else board.num_black_disks
+		self._tree.set_terminal(node, float(np.sign(own - opponent)))
+
+	def _search(self, board: Board, color: Color, node: int, depth: int, alpha: float, beta: float,
+	            node_type: NodeType) -> float:
+		# negamax with alpha-beta pruning: values are from the point of view of the player to move in node
+		tree: MinimaxTree = self._tree
+		opponent_color: Color = Color.WHITE if color is Color.BLACK else Color.BLACK
+		if not tree.expanded[node]:
+			self._expand(board, color, node)
+		if tree.terminals[node]:
+			return float(tree.values[node])
+
+		if depth == 0 and not tree.is_pass(node):
+			if tree.evaluated[node]:
+				return float(tree.leaf_values[node])
+			# a leaf the network has not valued yet, the estimate stands in for it during this pass
+			self._add_leaf(board, color, node)
+			return float(tree.values[node])
+
+		# a subtree without new leaves is searched the same way again, except at the root, where a location is needed
+		if node > 0:
+			value: Union[float, None] = tree.lookup(node, depth, alpha, beta)
+			if value is not None:
+				return value
+
+		num_leaves: int = self.num_leaves
+		if tree.is_pass(node):
+			# pass -> opponent plays at the same depth
+			value: float = -self._search(board, opponent_color, int(tree.first_children[node]), depth, -beta, -alpha,
+			                             node_type)
+		else:
+			value: float = self._search_children(board, color, node, depth, alpha, beta, node_type)
+		if self.num_leaves == num_leaves:
+			tree.store(node, depth, alpha, beta, value)
+		else:
+			tree.set_estimate(node, value)
+
+		return value
+
+	def _search_children(self, board: Board, color: Color, node: int, depth: int, alpha: float, beta: float,
+	                     node_type: NodeType) -> float:
+		tree: MinimaxTree = self._tree
+		opponent_color: Color = Color.WHITE if color is Color.BLACK else Color.BLACK
+
+		# best first for the player to move, by the values of the depth before
+		children: np.array = tree.children(node)
+		children: np.array = children[np.argsort(tree.prev_values[children], kind='stable')]
+		legal_actions: Actions = self._legal_actions[node]
+		best_value: float = -inf
+		for i, child in enumerate(children.tolist()):
+			location: Location = divmod(int(tree.locations[child]), self.board_size)
+			if node_type is NodeType.CUT:
+				child_type: NodeType = NodeType.ALL
+			elif node_type is NodeType.PV and i == 0:
+				child_type: NodeType = NodeType.PV
+			else:
+				child_type: NodeType = NodeType.CUT
+			num_leaves: int = self.num_leaves
+			# walk the tree in place, the action is undone before the next one is tried
+			board.take_action(location, legal_actions[location], color)
+			value: float = -self._search(board, opponent_color, child, depth - 1, -beta, -alpha, child_type)
+			board.undo_action()
+
+			if value > best_value:
+				best_value: float = value
+				if node == 0:
+					self._best_location: Location = location
+			if self.num_leaves > num_leaves:
+				# an estimate until the network valued the new leaves, it neither narrows the window nor cuts off
+				if i == 0 or node_type is NodeType.CUT:
+					# the siblings wait for its value
+					break
+				continue
+			alpha: float = max(alpha, value)
+			if alpha >= beta:
+				# the opponent will never allow this line, the network never values the rest
+				self.num_cutoffs += 1
+				break
+
+		return best_value
+
+	def _add_leaf(self, board: Board, color: Color, node: int) -> None:
+		self._batch[0].append(node)
+		self._batch[1].append(board.board.copy())
+		self._batch[2].append(color)
+		self._batch[3].append(self._tree.locations[self._tree.children(node)].tolist())
+		self.num_leaves += 1
+		if len(self._batch[0]) == self.batch_size:
+			self._flush()
+
+	def _flush(self) -> None:
+		# hand the collected leaves to the network, unless it already failed
+		if self._error is not None:
+			raise self._error
+		if self._batch[0]:
+			self._queue.put(self._batch)
+			self.num_batches += 1
+			self._batch = ([], [], [], [])
+
+	def _evaluate_batches(self, queue: Queue, results: List[Tuple[List[int], np.array]]) -> None:
+		# runs in its own thread until None, the network releases the interpreter while it runs
+		while True:
+			batch: Union[Batch, None] = queue.get()
+			try:
+				if batch is None:
+					break
+				if self._error is None:
+					nodes, boards, colors, locations = batch
+					_, values = evaluate_positions(self.agent, boards, colors, locations)
+					results.append((nodes, values))
+			except BaseException as error:
+				# an exception would end only this thread, the searching thread raises it instead
+				self._error: BaseException = error
+			finally:
+				queue.task_done()
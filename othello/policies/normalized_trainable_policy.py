@@ -1,7 +1,7 @@
+import random
 from typing import List
 
 import numpy as np
-from numpy.random import choice
 
 from policies.trainable_policy import TrainablePolicy
 from utils.types import Actions, Action, Location, Directions
@@ -21,7 +21,7 @@ class NormalizedTrainablePolicy(TrainablePolicy):
 		indices: List[int] = [row * self.board_size + col for (row, col) in list(legal_actions)]
 		q_values: np.array = q_values[0, indices]
 		q_values /= sum(q_values)
-		index: int = choice(np.arange(len(q_values)), p=q_values)
+		index: int = random.choices(range(len(q_values)), weights=q_values)[0]
 		location: Location = list(legal_actions)[index]
 		directions: Directions = legal_actions[location]
 		action: Action = (location, directions)
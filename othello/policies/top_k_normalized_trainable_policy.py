@@ -1,7 +1,7 @@
+import random
 from typing import List
 
 import numpy as np
-from numpy.random import choice
 
 from policies.trainable_policy import TrainablePolicy
 from utils.types import Actions, Action, Directions, Location
@@ -29,7 +29,7 @@ class TopKNormalizedTrainablePolicy(TrainablePolicy):
 		else:
 			normalized_q_values: np.array = np.array([1 / k] * k)
 		locations: np.array = np.array(list(legal_actions))[indices]
-		index: int = choice(np.arange(len(normalized_q_values)), p=normalized_q_values)
+		index: int = random.choices(range(len(normalized_q_values)), weights=normalized_q_values)[0]
 		location: Location = locations[index]
 		directions: Directions = legal_actions[(location[0], location[1])]
 		action: Action = (location, directions)
@@ -13,3 +13,7 @@ class UntrainablePolicy(Policy):
 	@abstractmethod
 	def get_action(self, board: Board, legal_actions: Actions, color: Color) -> Action:
 		raise NotImplementedError
+
+	def close(self) -> None:
+		# nothing to release, unless the policy holds e.g. worker processes
+		pass
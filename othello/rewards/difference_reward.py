@@ -1,3 +1,5 @@
+import numpy as np
+
 from game_logic.board import Board
 from rewards.reward import Reward
 from utils.color import Color
@@ -20,3 +22,11 @@ class DifferenceReward(Reward):
 		reward: float = 100.0 * (score - prev_score)
 
 		return reward
+
+	def rewards(self, boards: np.array, prev_boards: np.array, colors: np.array) -> np.array:
+		colors: np.array = colors.reshape(-1, 1, 1)
+		scores: np.array = np.count_nonzero(boards == colors, axis=(1, 2)) / np.count_nonzero(boards >= 0, axis=(1, 2))
+		prev_scores: np.array = np.count_nonzero(prev_boards == colors, axis=(1, 2)) / \
+		                        np.count_nonzero(prev_boards >= 0, axis=(1, 2))
+
+		return 100.0 * (scores - prev_scores)
@@ -0,0 +1,37 @@
+from typing import Union
+
+from game_logic.board import Board
+from policies.endgame_untrainable_policy import EndgameUntrainablePolicy
+from rewards.reward import Reward
+from utils.color import Color
+
+
+class EndgameReward(Reward):
+	def __init__(self, board_size: int, win: float, draw: float, loss: float, num_empties: int = 10,
+	             inner_reward: Union[Reward, None] = None):
+		assert win >= draw >= loss, f'Invalid order: win must be greater or equal to draw and draw must be greater or equal to lose'
+
+		self.win: float = win
+		self.loss: float = loss
+		self.draw: float = draw
+		# solves from the same number of free spots on as the endgame policy, earlier a solve takes far too long
+		self.endgame_policy: EndgameUntrainablePolicy = EndgameUntrainablePolicy(board_size, num_empties, exact=False)
+		# the reward before the endgame, None gives 0
+		self.inner_reward: Union[Reward, None] = inner_reward
+
+	def __str__(self) -> str:
+		return f'Endgame{super().__str__()}(inner_reward={self.inner_reward})'
+
+	def reward(self, board: Board, color: Color) -> float:
+		if not self.endgame_policy.applies(board):
+			return self.inner_reward.reward(board, color) if self.inner_reward is not None else 0.0
+
+		# the final reward of perfect play from here on, the opponent moves next
+		opponent_color: Color = Color.WHITE if color is Color.BLACK else Color.BLACK
+		score, _ = self.endgame_policy.solver.solve(board, opponent_color, exact=False)
+		if score < 0:
+			return self.win
+		elif score > 0:
+			return self.loss
+		else:
+			return self.draw
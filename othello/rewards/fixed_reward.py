@@ -1,3 +1,5 @@
+import numpy as np
+
 from game_logic.board import Board
 from rewards.reward import Reward
 from utils.color import Color
@@ -23,11 +25,18 @@ class FixedReward(Reward):
 			else:
 				return self.draw
 		elif color is Color.WHITE:
-			if board.num_black_disks < board.num_black_disks:
+			if board.num_white_disks > board.num_black_disks:
 				return self.win
-			elif board.num_black_disks > board.num_white_disks:
-				return self.draw
-			else:
+			elif board.num_white_disks < board.num_black_disks:
 				return self.loss
+			else:
+				return self.draw
 		else:
 			raise Exception(f'Invalid color: expected color to be BLACK or WHITE, but got {color.name}')
+
+	def rewards(self, boards: np.array, prev_boards: np.array, colors: np.array) -> np.array:
+		colors: np.array = colors.reshape(-1, 1, 1)
+		own: np.array = np.count_nonzero(boards == colors, axis=(1, 2))
+		opponent: np.array = np.count_nonzero(boards == 1 - colors, axis=(1, 2))
+
+		return np.where(own > opponent, self.win, np.where(own < opponent, self.loss, self.draw))
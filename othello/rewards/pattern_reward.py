@@ -0,0 +1,30 @@
+import numpy as np
+
+from game_logic.board import Board
+from rewards.reward import Reward
+from utils.color import Color
+from utils.pattern_evaluator import PatternEvaluator
+from utils.types import Location, Locations
+
+
+class PatternReward(Reward):
+	def __init__(self, evaluator: PatternEvaluator) -> None:
+		self.evaluator: PatternEvaluator = evaluator
+
+	def __str__(self) -> str:
+		return f'Pattern{super().__str__()}'
+
+	def reward(self, board: Board, color: Color) -> float:
+		if board.last_action is None:
+			return 0.0
+
+		# only the patterns through the last action changed, like WeightsReward
+		location, flipped, mover = board.last_action
+		location: Location
+		flipped: Locations
+		change: float = self.evaluator.evaluate_change(board.board, location, flipped, mover)
+
+		return change if color is Color.BLACK else -change
+
+	def rewards(self, boards: np.array, prev_boards: np.array, colors: np.array) -> np.array:
+		return self.evaluator.evaluate_boards(boards, colors) - self.evaluator.evaluate_boards(prev_boards, colors)
@@ -1,5 +1,7 @@
 from abc import abstractmethod
 
+import numpy as np
+
 from game_logic.board import Board
 from utils.color import Color
 
@@ -11,3 +13,8 @@ class Reward:
 	@abstractmethod
 	def reward(self, board: Board, color: Color) -> float:
 		raise NotImplementedError
+
+	def rewards(self, boards: np.array, prev_boards: np.array, colors: np.array) -> np.array:
+		"""e.g. (N,8,8) boards after and before a move of colors (N,) color values -> (N,) rewards, like reward"""
+		# not every reward can be computed from the disks alone, e.g. rewards that search
+		raise NotImplementedError
@@ -1,29 +1,43 @@
+from typing import List
+
 import numpy as np
 
 from game_logic.board import Board
 from rewards.reward import Reward
 from utils.color import Color
+from utils.types import Location, Locations
 
 
 class WeightsReward(Reward):
 	def __init__(self, weights: np.array) -> None:
 		self.weights: np.array = weights
+		# plain floats, indexing numpy arrays one spot at a time is slow
+		self.weight_rows: List[List[float]] = weights.tolist()
 
 	def __str__(self) -> str:
 		return f'Weights{super().__str__()}'
 
 	def evaluate_board(self, board: np.array, color: Color) -> float:
-		player_disks: np.array = np.where(board == color.value, 1, 0)
-		opponent_disks: np.array = np.where(board == 1 - color.value, -1, 0)
-		disks: np.array = np.add(player_disks, opponent_disks)
-		weighted_disks: np.array = np.multiply(disks, self.weights)
-		score: float = float(np.sum(weighted_disks))
+		return float(self.evaluate_boards(np.expand_dims(board, axis=0), np.array([color.value]))[0])
+
+	def evaluate_boards(self, boards: np.array, colors: np.array) -> np.array:
+		"""e.g. (N,8,8) boards and (N,) color values -> (N,) weighted own disks minus weighted opponent's disks"""
+		colors: np.array = colors.reshape(-1, 1, 1)
+		disks: np.array = (boards == colors).astype(np.int8) - (boards == 1 - colors).astype(np.int8)
 
-		return score
+		return np.einsum('nij,ij->n', disks, self.weights)
 
 	def reward(self, board: Board, color: Color) -> float:
-		score: float = self.evaluate_board(board.board, color)
-		prev_score: float = self.evaluate_board(board.prev_board, color)
-		reward: float = score - prev_score
+		if board.last_action is None:
+			return 0.0
+
+		# only the placed disk and the flipped disks changed, a flipped disk went from the opponent to the mover
+		location, flipped, mover = board.last_action
+		location: Location
+		flipped: Locations
+		change: float = self.weight_rows[location[0]][location[1]] + 2 * sum(self.weight_rows[i][j] for i, j in flipped)
+
+		return change if mover is color else -change
 
-		return reward
+	def rewards(self, boards: np.array, prev_boards: np.array, colors: np.array) -> np.array:
+		return self.evaluate_boards(boards, colors) - self.evaluate_boards(prev_boards, colors)
@@ -0,0 +1,77 @@
+import random
+from typing import List, Tuple
+
+import pytest
+
+from game_logic.bit_board import BitBoard
+from game_logic.board import Board
+from utils.color import Color
+from utils.endgame_solver import EndgameSolver
+from utils.types import Actions
+
+
+def final_difference(board: Board, color: Color) -> int:
+	"""Own minus opponent's disks at the end of the game after perfect play by both, by trying every line."""
+	opponent_color: Color = Color.WHITE if color is Color.BLACK else Color.BLACK
+	legal_actions: Actions = board.get_legal_actions(color)
+	if not legal_actions:
+		if not board.get_legal_actions(opponent_color):
+			own: int = board.num_black_disks if color is Color.BLACK else board.num_white_disks
+			opponent: int = board.num_white_disks if color is Color.BLACK else board.num_black_disks
+			return own - opponent
+		return -final_difference(board, opponent_color)
+
+	best_difference: int = -board.board_size ** 2
+	for location, directions in legal_actions.items():
+		board.take_action(location, directions, color)
+		best_difference: int = max(best_difference, -final_difference(board, opponent_color))
+		board.undo_action()
+
+	return best_difference
+
+
+def get_endgames(board_size: int, num_empties: int, num_games: int, seed: int = 0) -> List[Tuple[BitBoard, Color]]:
+	"""Positions of seeded random games with num_empties free spots left, or fewer after passes."""
+	generator: random.Random = random.Random(seed)
+	endgames: List[Tuple[BitBoard, Color]] = []
+	while len(endgames) < num_games:
+		board: BitBoard = BitBoard(board_size)
+		color: Color = Color.BLACK
+		while board.num_free_spots > num_empties:
+			legal_actions: Actions = board.get_legal_actions(color)
+			if legal_actions:
+				location = generator.choice(list(legal_actions))
+				board.take_action(location, legal_actions[location], color)
+			elif not board.get_legal_actions(Color.WHITE if color is Color.BLACK else Color.BLACK):
+				break
+			color: Color = Color.WHITE if color is Color.BLACK else Color.BLACK
+		if board.get_legal_actions(color):
+			endgames.append((board, color))
+
+	return endgames
+
+
+@pytest.mark.parametrize('board_size, num_empties', [(4, 8), (6, 8), (8, 7)])
+def test_solver_matches_brute_force(board_size: int, num_empties: int) -> None:
+	solver: EndgameSolver = EndgameSolver(board_size)
+	for board, color in get_endgames(board_size, num_empties, 6):
+		expected: int = final_difference(board, color)
+
+		score, location = solver.solve(board, color)
+		sign, _ = solver.solve(board, color, exact=False)
+
+		assert score == expected
+		assert sign == (expected > 0) - (expected < 0)
+		# the location reaches the score
+		board.take_action(location, board.get_legal_actions(color)[location], color)
+		assert -final_difference(board, Color.WHITE if color is Color.BLACK else Color.BLACK) == expected
+		board.undo_action()
+
+
+def test_solver_accepts_a_board() -> None:
+	# boards without bitboards are converted
+	for board, color in get_endgames(8, 6, 3, seed=1):
+		reference: Board = Board(8)
+		reference.board = board.board.copy()
+
+		assert EndgameSolver(8).solve(reference, color) == EndgameSolver(8).solve(board, color)
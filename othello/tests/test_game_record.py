@@ -0,0 +1,91 @@
+import os
+import random
+from typing import List, Tuple, Union
+
+import pytest
+
+from agents.untrainable_agent import UntrainableAgent
+from game_logic.bit_board import BitBoard
+from game_logic.board import Board
+from game_logic.game_record import GameRecordReader, GameRecordWriter, decode_move, encode_move
+from policies.random_untrainable_policy import RandomUntrainablePolicy
+from utils.color import Color
+from utils.types import Actions, Location
+
+# moves of a game, and its final number of black and white disks
+Game = Tuple[List[Union[Location, None]], int, int]
+
+
+def play(board_size: int, generator: random.Random) -> Game:
+	board: Board = BitBoard(board_size)
+	color: Color = Color.BLACK
+	locations: List[Union[Location, None]] = []
+	prev_pass: bool = False
+	while True:
+		legal_actions: Actions = board.get_legal_actions(color)
+		if legal_actions:
+			location: Location = generator.choice(list(legal_actions))
+			board.take_action(location, legal_actions[location], color)
+			prev_pass: bool = False
+		elif prev_pass:
+			# the second pass ends the game, the record keeps both
+			locations.append(None)
+			return locations, board.num_black_disks, board.num_white_disks
+		else:
+			location: None = None
+			prev_pass: bool = True
+		locations.append(location)
+		color: Color = Color.WHITE if color is Color.BLACK else Color.BLACK
+
+
+@pytest.mark.parametrize('board_size', [4, 8, 10])
+def test_move_round_trip(board_size: int) -> None:
+	assert decode_move(encode_move(None, board_size), board_size) is None
+	for row in range(board_size):
+		for col in range(board_size):
+			assert decode_move(encode_move((row, col), board_size), board_size) == (row, col)
+
+
+def test_record_round_trip(tmp_path) -> None:
+	path: str = os.path.join(tmp_path, 'games.rec')
+	generator: random.Random = random.Random(0)
+	black: UntrainableAgent = UntrainableAgent(Color.BLACK, RandomUntrainablePolicy())
+	white: UntrainableAgent = UntrainableAgent(Color.WHITE, RandomUntrainablePolicy())
+	games: List[Tuple[int, Game]] = [(board_size, play(board_size, generator)) for board_size in [8, 6, 8, 4]]
+
+	# the second writer appends to the files of the first
+	for first, last in [(0, 2), (2, 4)]:
+		with GameRecordWriter(path) as writer:
+			for board_size, (locations, num_black_disks, num_white_disks) in games[first:last]:
+				writer.write(board_size, 0, black, white, num_black_disks, num_white_disks,
+				             [encode_move(location, board_size) for location in locations])
+
+	with GameRecordReader(path) as reader:
+		assert len(reader) == len(games)
+		assert reader.agents == [str(black), str(white)]
+		for record, (board_size, (locations, num_black_disks, num_white_disks)) in zip(reader, games):
+			assert (record.board_size, record.black, record.white) == (board_size, str(black), str(white))
+			assert (record.num_black_disks, record.num_white_disks) == (num_black_disks, num_white_disks)
+			assert record.locations == locations
+			# replaying checks every move and the score
+			assert len(list(record.replay())) == len(locations)
+
+
+# a record without all of its moves, or without all of its offset
+@pytest.mark.parametrize('suffix, num_bytes', [('', 1), ('.idx', 3)])
+def test_reader_skips_an_unfinished_record(tmp_path, suffix: str, num_bytes: int) -> None:
+	path: str = os.path.join(tmp_path, 'games.rec')
+	agent: UntrainableAgent = UntrainableAgent(Color.BLACK, RandomUntrainablePolicy())
+	locations, num_black_disks, num_white_disks = play(8, random.Random(1))
+	with GameRecordWriter(path) as writer:
+		for _ in range(2):
+			writer.write(8, 0, agent, agent, num_black_disks, num_white_disks,
+			             [encode_move(location, 8) for location in locations])
+
+	# as a reader may find the files while the last record is still being written
+	with open(f'{path}{suffix}', 'r+b') as file:
+		file.truncate(os.path.getsize(f'{path}{suffix}') - num_bytes)
+
+	with GameRecordReader(path) as reader:
+		assert len(reader) == 1
+		assert reader[0].locations == locations
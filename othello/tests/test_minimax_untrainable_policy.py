@@ -0,0 +1,137 @@
+from math import inf
+from typing import List
+
+import numpy as np
+import pytest
+
+from game_logic.bit_board import BitBoard
+from game_logic.board import Board
+from game_logic.perft import Position, get_positions, set_up
+from move_orderings.killer_move_ordering import KillerMoveOrdering
+from policies.minimax_untrainable_policy import MinimaxUntrainablePolicy
+from rewards.pattern_reward import PatternReward
+from rewards.reward import Reward
+from rewards.weights_reward import WeightsReward
+from utils.color import Color
+from utils.pattern_evaluator import PatternEvaluator
+from utils.risk_regions import heur
+from utils.types import Actions, Location
+
+
+def negamax(board: Board, color: Color, depth: int, reward: Reward) -> float:
+	"""Every line to depth without pruning, scored like minimax: passes do not count as a ply."""
+	opponent_color: Color = Color.WHITE if color is Color.BLACK else Color.BLACK
+	legal_actions: Actions = board.get_legal_actions(color)
+	if not legal_actions:
+		if not board.get_legal_actions(opponent_color):
+			return MinimaxUntrainablePolicy._final_score(board, color)
+		return -negamax(board, opponent_color, depth, reward)
+
+	best_score: float = -inf
+	for location, directions in legal_actions.items():
+		board.take_action(location, directions, color)
+		score: float = reward.reward(board, color) if depth == 1 else -negamax(board, opponent_color, depth - 1, reward)
+		board.undo_action()
+		best_score: float = max(best_score, score)
+
+	return best_score
+
+
+def location_score(board: Board, color: Color, location: Location, depth: int, reward: Reward) -> float:
+	opponent_color: Color = Color.WHITE if color is Color.BLACK else Color.BLACK
+	board.take_action(location, board.get_legal_actions(color)[location], color)
+	score: float = reward.reward(board, color) if depth == 1 else -negamax(board, opponent_color, depth - 1, reward)
+	board.undo_action()
+
+	return score
+
+
+def get_test_positions() -> List[Position]:
+	# positions where the color to move has legal actions
+	return [(moves, color) for moves, color in get_positions(8)[:6]
+	        if set_up(BitBoard, 8, moves).get_legal_actions(color)]
+
+
+@pytest.mark.parametrize('depth', [1, 2, 3])
+@pytest.mark.parametrize('transposition_table_size', [0, 2 ** 12])
+def test_minimax_matches_negamax(depth: int, transposition_table_size: int) -> None:
+	reward: WeightsReward = WeightsReward(heur(8))
+	for moves, color in get_test_positions():
+		board: Board = set_up(BitBoard, 8, moves)
+		# a policy per position, so no search reuses the transposition table of another
+		policy: MinimaxUntrainablePolicy = MinimaxUntrainablePolicy(
+			reward, depth, transposition_table_size, move_ordering=KillerMoveOrdering())
+		expected: float = negamax(board, color, depth, reward)
+
+		location: Location = policy.search(board, color)
+		# searched again on the filled transposition table, for the score of the root
+		score, _ = policy.minimax(board.get_deepcopy(), color, depth)
+
+		assert location_score(board, color, location, depth, reward) == pytest.approx(expected)
+		assert score == pytest.approx(expected)
+
+
+def test_iterative_deepening_finds_a_best_location() -> None:
+	reward: WeightsReward = WeightsReward(heur(8))
+	for moves, color in get_test_positions():
+		board: Board = set_up(BitBoard, 8, moves)
+		# a budget far beyond what depth 3 takes, so every iteration completes
+		policy: MinimaxUntrainablePolicy = MinimaxUntrainablePolicy(reward, 3, time_budget=60.0)
+
+		location, _ = policy.get_action(board, board.get_legal_actions(color), color)
+
+		assert policy.completed_depth == 3
+		assert location_score(board, color, location, 3, reward) == pytest.approx(negamax(board, color, 3, reward))
+
+
+
+def test_parallel_search_finds_a_best_location() -> None:
+	reward: WeightsReward = WeightsReward(heur(8))
+	policy: MinimaxUntrainablePolicy = MinimaxUntrainablePolicy(reward, 3, num_workers=2)
+	try:
+		for moves, color in get_test_positions():
+			board: Board = set_up(BitBoard, 8, moves)
+
+			location, _ = policy.get_action(board, board.get_legal_actions(color), color)
+
+			assert location_score(board, color, location, 3, reward) == pytest.approx(negamax(board, color, 3, reward))
+	finally:
+		policy.close()
+
+
+def test_parallel_search_follows_new_weights() -> None:
+	evaluator: PatternEvaluator = PatternEvaluator(8)
+	reward: PatternReward = PatternReward(evaluator)
+	policy: MinimaxUntrainablePolicy = MinimaxUntrainablePolicy(reward, 3, num_workers=2)
+	try:
+		# the workers started with weights of zero
+		executor = policy._executor
+		evaluator.weights = np.random.default_rng(0).normal(size=evaluator.num_weights).astype(np.float32)
+		moves, color = get_test_positions()[-1]
+		board: Board = set_up(BitBoard, 8, moves)
+
+		location, _ = policy.get_action(board, board.get_legal_actions(color), color)
+
+		assert policy._executor is not executor
+		assert location_score(board, color, location, 3, reward) == pytest.approx(negamax(board, color, 3, reward))
+	finally:
+		policy.close()
+
+
+def test_parallel_search_falls_back_when_a_worker_dies() -> None:
+	reward: WeightsReward = WeightsReward(heur(8))
+	policy: MinimaxUntrainablePolicy = MinimaxUntrainablePolicy(reward, 3, num_workers=2)
+	try:
+		executor = policy._executor
+		for process in list(executor._processes.values()):
+			process.kill()
+			process.join()
+		moves, color = get_test_positions()[-1]
+		board: Board = set_up(BitBoard, 8, moves)
+
+		location, _ = policy.get_action(board, board.get_legal_actions(color), color)
+
+		assert policy._executor is None and policy.num_workers == 1
+		assert location_score(board, color, location, 3, reward) == pytest.approx(negamax(board, color, 3, reward))
+	finally:
+		policy.close()
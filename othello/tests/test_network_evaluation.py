@@ -0,0 +1,56 @@
+from typing import List
+
+import numpy as np
+import pytest
+
+# the network evaluation imports the trainable agents, which need tensorflow
+pytest.importorskip('tensorflow')
+
+from game_logic.board import Board
+from rewards.fixed_reward import FixedReward
+from rewards.reward import Reward
+from utils.color import Color
+from utils.network_evaluation import evaluate_positions
+
+
+class FakeAgent:
+	"""Stands in for a trained agent: q-values per position, the final reward each location is expected to get."""
+
+	def __init__(self, color: Color, final_reward: Reward, q_values: np.array) -> None:
+		self.color: Color = color
+		self.final_reward: Reward = final_reward
+		self.q_values: np.array = q_values
+
+	def board_to_nn_input(self, boards: np.array) -> np.array:
+		return boards
+
+	def predict(self, states: np.array) -> np.array:
+		return self.q_values[:len(states)]
+
+
+def evaluate(final_reward: Reward, q_values: List[List[float]]) -> np.array:
+	# the initial position, with the q-values of its 4 legal locations, the others get little
+	board: Board = Board(8)
+	legal_locations: List[int] = [row * 8 + col for row, col in board.get_legal_actions(Color.BLACK)]
+	outputs: np.array = np.full((len(q_values), 64), 0.001)
+	outputs[:, legal_locations] = q_values
+	agent: FakeAgent = FakeAgent(Color.BLACK, final_reward, outputs)
+
+	_, values = evaluate_positions(agent, [board.board] * len(q_values), [Color.BLACK] * len(q_values),
+	                               [legal_locations] * len(q_values))
+
+	return values
+
+
+def test_won_position_scores_higher_than_lost_position() -> None:
+	# won with several equally good locations, lost with a single location that loses least
+	won, lost = evaluate(FixedReward(1, 0.5, 0), [[0.9, 0.9, 0.9, 0.2], [0.1, 0.001, 0.001, 0.001]])
+
+	assert won > lost
+	assert -1.0 <= lost < 0.0 < won <= 1.0
+
+
+def test_values_follow_the_final_reward_range() -> None:
+	values: np.array = evaluate(FixedReward(1, 0, -1), [[1.0, 0, 0, 0], [0.0, 0, 0, 0], [-1.0, -1, -1, -1]])
+
+	assert values == pytest.approx([1.0, 0.0, -1.0])
@@ -0,0 +1,108 @@
+from math import inf
+from typing import List
+
+import numpy as np
+import pytest
+
+# the policy imports the trainable agents, which need tensorflow
+pytest.importorskip('tensorflow')
+
+from game_logic.board import Board
+from game_logic.perft import Position, get_positions, set_up
+from policies.network_minimax_untrainable_policy import NetworkMinimaxUntrainablePolicy
+from rewards.fixed_reward import FixedReward
+from rewards.reward import Reward
+from utils.color import Color
+from utils.network_evaluation import evaluate_positions
+from utils.risk_regions import heur
+from utils.types import Actions
+
+
+class FakeAgent:
+	"""Stands in for a trained agent: q-values from the weight of a location and the share of own disks."""
+
+	def __init__(self, color: Color, board_size: int) -> None:
+		self.color: Color = color
+		self.board_size: int = board_size
+		self.final_reward: Reward = FixedReward(1, 0.5, 0)
+		weights: np.array = heur(board_size).flatten().astype(np.float64)
+		self.weights: np.array = (weights - weights.min()) / (weights.max() - weights.min())
+		self.num_calls: int = 0
+
+	def board_to_nn_input(self, boards: np.array) -> np.array:
+		return boards
+
+	def predict(self, states: np.array) -> np.array:
+		self.num_calls += 1
+		boards: np.array = states.reshape(len(states), -1)
+		own: np.array = (boards == self.color.value).sum(axis=1)
+		disks: np.array = (boards >= 0).sum(axis=1)
+
+		return 0.5 * self.weights[None, :] + 0.5 * (own / disks)[:, None]
+
+
+def negamax(agent: FakeAgent, board: Board, color: Color, depth: int) -> float:
+	"""Every line to depth without pruning, each leaf valued on its own."""
+	opponent_color: Color = Color.WHITE if color is Color.BLACK else Color.BLACK
+	legal_actions: Actions = board.get_legal_actions(color)
+	if not legal_actions:
+		if not board.get_legal_actions(opponent_color):
+			own: int = board.num_black_disks if color is Color.BLACK else board.num_white_disks
+			opponent: int = board.num_white_disks if color is Color.BLACK else board.num_black_disks
+			return float(np.sign(own - opponent))
+		return -negamax(agent, board, opponent_color, depth)
+	if depth == 0:
+		locations: List[int] = [row * board.board_size + col for row, col in legal_actions]
+		_, values = evaluate_positions(agent, [board.board.copy()], [color], [locations])
+		return float(values[0])
+
+	best_value: float = -inf
+	for location, directions in legal_actions.items():
+		board.take_action(location, directions, color)
+		best_value: float = max(best_value, -negamax(agent, board, opponent_color, depth - 1))
+		board.undo_action()
+
+	return best_value
+
+
+def get_test_positions() -> List[Position]:
+	# positions where the color to move has legal actions
+	return [(moves, color) for moves, color in get_positions(8)[:4]
+	        if set_up(Board, 8, moves).get_legal_actions(color)]
+
+
+@pytest.mark.parametrize('depth', [1, 2, 3])
+def test_network_minimax_matches_negamax(depth: int) -> None:
+	agent: FakeAgent = FakeAgent(Color.WHITE, 8)
+	# small batches, so the passes hand several of them to the network
+	policy: NetworkMinimaxUntrainablePolicy = NetworkMinimaxUntrainablePolicy(agent, depth, batch_size=8)
+	for moves, color in get_test_positions():
+		board: Board = set_up(Board, 8, moves)
+		opponent_color: Color = Color.WHITE if color is Color.BLACK else Color.BLACK
+		legal_actions: Actions = board.get_legal_actions(color)
+
+		location, _ = policy.get_action(board, legal_actions, color)
+
+		values: List[float] = []
+		for other, directions in legal_actions.items():
+			board.take_action(other, directions, color)
+			value: float = -negamax(agent, board, opponent_color, depth - 1)
+			board.undo_action()
+			values.append(value)
+			if other == location:
+				location_value: float = value
+		assert location_value == pytest.approx(max(values))
+
+
+def test_network_errors_reach_the_search() -> None:
+	agent: FakeAgent = FakeAgent(Color.WHITE, 8)
+
+	def predict(states: np.array) -> np.array:
+		raise ValueError('the network failed')
+
+	agent.predict = predict
+	policy: NetworkMinimaxUntrainablePolicy = NetworkMinimaxUntrainablePolicy(agent, 3, batch_size=8)
+	board: Board = Board(8)
+
+	with pytest.raises(ValueError, match='the network failed'):
+		policy.get_action(board, board.get_legal_actions(Color.BLACK), Color.BLACK)
@@ -0,0 +1,74 @@
+import random
+from typing import List
+
+import numpy as np
+
+from agents.untrainable_agent import UntrainableAgent
+from game_logic.board import Board
+from game_logic.game import Game
+from game_logic.vectorized_game import VectorizedGame
+from policies.normalized_trainable_policy import NormalizedTrainablePolicy
+from policies.top_k_normalized_trainable_policy import TopKNormalizedTrainablePolicy
+from policies.trainable_policy import TrainablePolicy
+from policies.untrainable_policy import UntrainablePolicy
+from utils.color import Color
+from utils.config import Config
+from utils.parallel_evaluation import ParallelEvaluation, Score
+from utils.risk_regions import heur
+from utils.types import Action, Actions
+
+
+class SampledUntrainablePolicy(UntrainablePolicy):
+	"""Samples a move like a trainable policy does, with the weights of the spots as q-values instead of a network."""
+
+	def __init__(self, inner_policy: TrainablePolicy, board_size: int) -> None:
+		self.inner_policy: TrainablePolicy = inner_policy
+		self.q_values: np.array = np.expand_dims(heur(board_size).flatten().astype(float) + 50, axis=0)
+
+	def get_action(self, board: Board, legal_actions: Actions, color: Color) -> Action:
+		return self.inner_policy.get_action(legal_actions, self.q_values.copy())
+
+
+def get_agents(board_size: int) -> List[UntrainableAgent]:
+	return [UntrainableAgent(Color.BLACK, SampledUntrainablePolicy(TopKNormalizedTrainablePolicy(board_size, 3), board_size)),
+	        UntrainableAgent(Color.WHITE, SampledUntrainablePolicy(NormalizedTrainablePolicy(board_size, 2), board_size))]
+
+
+def test_workers_play_the_same_games() -> None:
+	board_size: int = 8
+	seed: int = 3
+	num_episodes: int = 24
+
+	# in this process, one game after another and in lockstep, with the global generators anywhere
+	scores: List[Score] = []
+	for num_envs in [1, 4]:
+		random.seed(num_envs)
+		np.random.seed(num_envs)
+		black, white = get_agents(board_size)
+		config: Config = Config(white, num_episodes)
+		for episode in range(1, num_episodes + 1, num_envs):
+			VectorizedGame([Game(board_size, black, config, e, seed=seed)
+			                for e in range(episode, min(episode + num_envs, num_episodes + 1))]).play()
+		scores.append((black.num_games_won, white.num_games_won))
+
+	# in 2 worker processes
+	black, white = get_agents(board_size)
+	evaluation: ParallelEvaluation = ParallelEvaluation(board_size, 2, seed)
+	try:
+		scores.append(ParallelEvaluation.result(evaluation.submit(black, Config(white, num_episodes))))
+	finally:
+		evaluation.close()
+
+	assert scores[0] == scores[1] == scores[2]
+
+
+def test_seeded_random_starts_are_reproducible() -> None:
+	black, white = get_agents(8)
+	moves: List[List[int]] = []
+	for state in range(2):
+		random.seed(state)
+		np.random.seed(state)
+		moves.append([Game(8, black, Config(white, 1), episode, random_start=True, seed=0).moves
+		              for episode in range(1, 21)])
+
+	assert moves[0] == moves[1]
@@ -0,0 +1,34 @@
+import random
+
+import numpy as np
+import pytest
+
+from game_logic.bit_board import BitBoard
+from game_logic.board import Board
+from rewards.pattern_reward import PatternReward
+from utils.color import Color
+from utils.pattern_evaluator import PatternEvaluator
+from utils.types import Actions
+
+
+@pytest.mark.parametrize('board_size', [6, 8, 10])
+@pytest.mark.parametrize('board_class', [Board, BitBoard])
+def test_reward_matches_full_evaluation(board_size: int, board_class: type) -> None:
+	num_weights: int = PatternEvaluator(board_size).num_weights
+	evaluator: PatternEvaluator = PatternEvaluator(board_size, np.random.default_rng(0).normal(size=num_weights))
+	reward: PatternReward = PatternReward(evaluator)
+	generator: random.Random = random.Random(0)
+
+	board: Board = board_class(board_size)
+	color: Color = Color.BLACK
+	assert reward.reward(board, color) == 0.0
+	while board.get_legal_actions(Color.BLACK) or board.get_legal_actions(Color.WHITE):
+		legal_actions: Actions = board.get_legal_actions(color)
+		if legal_actions:
+			location = generator.choice(list(legal_actions))
+			board.take_action(location, legal_actions[location], color)
+			for reward_color in [Color.BLACK, Color.WHITE]:
+				values: np.array = evaluator.evaluate_boards(np.stack([board.board, board.prev_board]),
+				                                             np.full(2, reward_color.value))
+				assert reward.reward(board, reward_color) == pytest.approx(values[0] - values[1], abs=1e-4)
+		color: Color = Color.WHITE if color is Color.BLACK else Color.BLACK
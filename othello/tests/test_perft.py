@@ -0,0 +1,32 @@
+from typing import List, Type
+
+import pytest
+
+from game_logic.bit_board import BitBoard
+from game_logic.board import Board
+from game_logic.perft import KNOWN_PERFT_8X8, Position, compare, get_positions, perft, set_up
+from utils.color import Color
+
+
+@pytest.mark.parametrize('board_class', [Board, BitBoard])
+@pytest.mark.parametrize('depth', range(6))
+def test_perft_matches_known_counts(board_class: Type[Board], depth: int) -> None:
+	assert perft(board_class(8), Color.BLACK, depth) == KNOWN_PERFT_8X8[depth]
+
+
+# shallower on larger boards, which have more moves per ply
+@pytest.mark.parametrize('board_size, depth', [(4, 4), (6, 3), (8, 3), (10, 2)])
+def test_bit_board_matches_board(board_size: int, depth: int) -> None:
+	# from the initial position and from later positions, some of which have to pass
+	positions: List[Position] = [([], Color.BLACK)] + get_positions(board_size)
+	for moves, color in positions:
+		num_leaves: int = compare(set_up(BitBoard, board_size, moves), set_up(Board, board_size, moves), color, depth)
+		assert num_leaves == perft(set_up(Board, board_size, moves), color, depth)
+
+
+def test_undo_restores_the_position() -> None:
+	for board_class in [Board, BitBoard]:
+		board: Board = board_class(8)
+		perft(board, Color.BLACK, 4)
+		assert (board.board == board_class(8).board).all()
+		assert board.hash == board_class(8).hash
@@ -0,0 +1,57 @@
+import random
+from typing import List, Tuple
+
+import numpy as np
+import pytest
+
+from game_logic.board import Board
+from utils.color import Color
+from utils.position_codec import decode_board, decode_flatten_negative, decode_legal_masks, decode_split, encode, \
+	num_bytes
+from utils.reshapes import flatten_negative, split
+from utils.types import Actions
+
+
+def get_positions(board_size: int, seed: int = 0) -> List[Tuple[np.array, Color, Actions]]:
+	"""Every position of a seeded random game, with the color to move and its legal actions."""
+	generator: random.Random = random.Random(seed)
+	board: Board = Board(board_size)
+	color: Color = Color.BLACK
+	positions: List[Tuple[np.array, Color, Actions]] = []
+	while True:
+		legal_actions: Actions = board.get_legal_actions(color)
+		opponent_color: Color = Color.WHITE if color is Color.BLACK else Color.BLACK
+		if not legal_actions and not board.get_legal_actions(opponent_color):
+			return positions
+		positions.append((board.board.copy(), color, legal_actions))
+		if legal_actions:
+			location = generator.choice(list(legal_actions))
+			board.take_action(location, legal_actions[location], color)
+		color: Color = opponent_color
+
+
+@pytest.mark.parametrize('board_size', [4, 6, 8, 10])
+def test_round_trip(board_size: int) -> None:
+	positions: List[Tuple[np.array, Color, Actions]] = get_positions(board_size)
+	for board, color, legal_actions in positions:
+		encoded: np.array = encode(board, color, list(legal_actions))
+		assert encoded.shape == (3, num_bytes(board_size))
+		assert encoded.dtype == np.uint8
+
+		batch: np.array = encoded[np.newaxis]
+		assert (decode_board(batch, board_size, color)[0] == board).all()
+		legal_mask: np.array = np.zeros(board_size ** 2, dtype=np.bool_)
+		legal_mask[[row * board_size + col for row, col in legal_actions]] = True
+		assert (decode_legal_masks(batch, board_size)[0] == legal_mask).all()
+
+
+@pytest.mark.parametrize('board_size', [6, 8])
+def test_decodes_like_reshapes(board_size: int) -> None:
+	positions: List[Tuple[np.array, Color, Actions]] = get_positions(board_size)
+	boards: np.array = np.array([board for board, _, _ in positions])
+	for color in [Color.BLACK, Color.WHITE]:
+		# as seen by color, whoever was to move
+		encoded: np.array = np.array([encode(board, color, list(legal_actions)) for board, _, legal_actions in positions])
+
+		assert (decode_split(encoded, board_size) == split(boards, color)).all()
+		assert (decode_flatten_negative(encoded, board_size) == flatten_negative(boards, color)).all()
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from utils.sum_tree import SumTree
+
+
+@pytest.mark.parametrize('capacity', [1, 5, 8, 100])
+def test_nodes_hold_the_sums(capacity: int) -> None:
+	tree: SumTree = SumTree(capacity)
+	priorities: np.array = np.random.default_rng(0).random(capacity)
+	tree.update(np.arange(capacity), priorities)
+	# and again for some leaves
+	tree.update(np.array([0, capacity - 1]), np.array([2.0, 3.0]))
+	priorities[[0, capacity - 1]] = [2.0, 3.0]
+
+	assert tree.total == pytest.approx(priorities.sum())
+	assert np.allclose(tree.get(np.arange(capacity)), priorities)
+	for node in range(1, tree.num_leaves):
+		assert tree.tree[node] == pytest.approx(tree.tree[2 * node] + tree.tree[2 * node + 1])
+
+
+def test_find_walks_the_cumulative_priorities() -> None:
+	tree: SumTree = SumTree(5)
+	tree.update(np.arange(5), np.array([1.0, 0.0, 2.0, 3.0, 4.0]))
+
+	# leaf i covers [sum of the priorities before it, that sum plus its own priority)
+	values: np.array = np.array([0.0, 0.99, 1.0, 2.99, 3.0, 5.99, 6.0, 9.99])
+	assert tree.find(values).tolist() == [0, 0, 2, 2, 3, 3, 4, 4]
+	# rounding past the total stays on the last leaf
+	assert tree.find(np.array([10.0])).tolist() == [4]
+
+
+def test_sampling_is_proportional_to_the_priorities() -> None:
+	capacity: int = 6
+	tree: SumTree = SumTree(capacity)
+	priorities: np.array = np.array([1.0, 2.0, 0.0, 4.0, 8.0, 1.0])
+	tree.update(np.arange(capacity), priorities)
+
+	num_samples: int = 100000
+	indices: np.array = tree.find(np.random.default_rng(0).random(num_samples) * tree.total)
+	frequencies: np.array = np.bincount(indices, minlength=capacity) / num_samples
+
+	assert frequencies[2] == 0.0
+	# within about 4 standard deviations of the expected frequencies
+	assert np.allclose(frequencies, priorities / priorities.sum(), atol=0.006)
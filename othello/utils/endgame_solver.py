@@ -0,0 +1,177 @@
+from typing import List, Tuple, Union
+
+from game_logic.bit_board import BitBoard, Shifts
+from game_logic.board import Board
+from utils.color import Color
+from utils.types import Location
+
+
+def _count(bitboard: int) -> int:
+	return bin(bitboard).count('1')
+
+
+class EndgameSolver:
+	"""Exact alpha-beta search to the end of the game on bitboards, scored as own minus opponent's disks."""
+
+	def __init__(self, board_size: int = 8, fastest_first_empties: int = 7) -> None:
+		self.board_size: int = board_size
+		# fastest-first ordering costs a move generation per child, only worth it far from the end
+		self.fastest_first_empties: int = fastest_first_empties
+
+		self.full: int = (1 << board_size ** 2) - 1
+		self.shifts: Shifts = BitBoard._get_shifts(board_size)
+
+		# parity regions are the four quadrants of the board
+		half: int = board_size // 2
+		self.quadrants: List[int] = [0, 0, 0, 0]
+		for i in range(board_size):
+			for j in range(board_size):
+				self.quadrants[(i >= half) * 2 + (j >= half)] |= 1 << (i * board_size + j)
+
+		self.num_nodes: int = 0
+
+	def solve(self, board: Board, color: Color, exact: bool = True) -> Tuple[int, Union[Location, None]]:
+		"""Return the final disk difference for color (exact) or just its sign (win/loss/draw) and the best location."""
+		bitboards: List[int] = board.bitboards if isinstance(board, BitBoard) else BitBoard.to_bitboards(board.board)
+		own: int = bitboards[color.value]
+		opponent: int = bitboards[1 - color.value]
+
+		self.num_nodes: int = 0
+		if exact:
+			alpha, beta = -self.board_size ** 2, self.board_size ** 2
+		else:
+			# a null window around a draw only tells win, draw or loss apart
+			alpha, beta = -1, 1
+
+		moves: int = self._get_moves(own, opponent)
+		if not moves:
+			score: int = self._search(own, opponent, alpha, beta)
+			return (score if exact else (score > 0) - (score < 0)), None
+
+		best_score: int = -self.board_size ** 2 - 1
+		best_bit: int = 0
+		for bit, flips in self._order(own, opponent, moves):
+			score: int = -self._search(opponent & ~flips, own | bit | flips, -beta, -alpha)
+			if score > best_score:
+				best_score, best_bit = score, bit
+			if score > alpha:
+				alpha: int = score
+			if alpha >= beta:
+				break
+
+		if not exact:
+			best_score: int = (best_score > 0) - (best_score < 0)
+		location: Location = divmod(best_bit.bit_length() - 1, self.board_size)
+
+		return best_score, location
+
+	def _search(self, own: int, opponent: int, alpha: int, beta: int) -> int:
+		self.num_nodes += 1
+		empty: int = self.full & ~(own | opponent)
+
+		# special case the last few empties: try them directly instead of generating moves
+		num_empties: int = _count(empty)
+		if num_empties <= 4:
+			empties: List[int] = []
+			parity: int = self._get_parity(empty)
+			# odd regions first
+			for bit in self._get_bits(empty & parity) + self._get_bits(empty & ~parity):
+				empties.append(bit)
+			return self._search_last(own, opponent, empties, alpha, beta, False)
+
+		moves: int = self._get_moves(own, opponent)
+		if not moves:
+			if not self._get_moves(opponent, own):
+				return _count(own) - _count(opponent)
+			# pass
+			return -self._search(opponent, own, -beta, -alpha)
+
+		best_score: int = -self.board_size ** 2 - 1
+		for bit, flips in self._order(own, opponent, moves):
+			score: int = -self._search(opponent & ~flips, own | bit | flips, -beta, -alpha)
+			if score > best_score:
+				best_score: int = score
+				if score > alpha:
+					alpha: int = score
+					if alpha >= beta:
+						break
+
+		return best_score
+
+	def _search_last(self, own: int, opponent: int, empties: List[int], alpha: int, beta: int, passed: bool) -> int:
+		self.num_nodes += 1
+
+		if len(empties) == 1:
+			# one empty left: whoever can play it does, nobody else can move anymore
+			bit: int = empties[0]
+			flips: int = BitBoard.get_flips(own, opponent, bit, self.board_size)
+			if flips:
+				num_flips: int = _count(flips)
+				return _count(own) - _count(opponent) + 2 * num_flips + 1
+			flips: int = BitBoard.get_flips(opponent, own, bit, self.board_size)
+			if flips:
+				num_flips: int = _count(flips)
+				return _count(own) - _count(opponent) - 2 * num_flips - 1
+			return _count(own) - _count(opponent)
+
+		best_score: Union[int, None] = None
+		for index, bit in enumerate(empties):
+			flips: int = BitBoard.get_flips(own, opponent, bit, self.board_size)
+			if not flips:
+				continue
+			remaining_empties: List[int] = empties[:index] + empties[index + 1:]
+			score: int = -self._search_last(opponent & ~flips, own | bit | flips, remaining_empties, -beta, -alpha, False)
+			if best_score is None or score > best_score:
+				best_score: int = score
+				if score > alpha:
+					alpha: int = score
+					if alpha >= beta:
+						break
+
+		if best_score is None:
+			if passed:
+				# nobody can move anymore
+				return _count(own) - _count(opponent)
+			# pass
+			return -self._search_last(opponent, own, empties, -beta, -alpha, True)
+
+		return best_score
+
+	def _order(self, own: int, opponent: int, moves: int) -> List[Tuple[int, int]]:
+		empty: int = self.full & ~(own | opponent)
+		parity: int = self._get_parity(empty)
+		children: List[Tuple[int, int, int, int]] = []
+		for bit in self._get_bits(moves):
+			flips: int = BitBoard.get_flips(own, opponent, bit, self.board_size)
+			if _count(empty) > self.fastest_first_empties:
+				# fastest-first: fewest opponent's replies first
+				mobility: int = _count(self._get_moves(opponent & ~flips, own | bit | flips))
+			else:
+				mobility: int = 0
+			# parity: locations in regions with an odd number of empties first
+			children.append((mobility, not bit & parity, bit, flips))
+		children.sort(key=lambda child: (child[0], child[1]))
+
+		return [(bit, flips) for _, _, bit, flips in children]
+
+	def _get_parity(self, empty: int) -> int:
+		# union of the regions with an odd number of empties
+		parity: int = 0
+		for quadrant in self.quadrants:
+			if _count(empty & quadrant) & 1:
+				parity |= quadrant
+
+		return parity
+
+	def _get_moves(self, own: int, opponent: int) -> int:
+		return BitBoard.get_moves(own, opponent, self.board_size)
+
+	@staticmethod
+	def _get_bits(bitboard: int) -> List[int]:
+		bits: List[int] = []
+		while bitboard:
+			bit: int = bitboard & -bitboard
+			bitboard ^= bit
+			bits.append(bit)
+
+		return bits
@@ -1,6 +1,8 @@
-from collections import defaultdict
+import os
+from concurrent.futures import Future
 from math import ceil
-from typing import List
+from time import perf_counter
+from typing import Iterable, List, Tuple, Union
 
 from colorama import init
 from tqdm import tqdm
@@ -8,21 +10,37 @@ from tqdm import tqdm
 from agents.agent import Agent
 from agents.human_agent import HumanAgent
 from agents.trainable_agent import TrainableAgent
+from agents.untrainable_agent import UntrainableAgent
 from game_logic.game import Game
-from gui.controller import Controller
+from game_logic.game_record import GameRecordWriter
+from game_logic.parallel_self_play import ParallelSelfPlay
+from game_logic.vectorized_game import VectorizedGame
 from policies.annealing_trainable_policy import AnnealingTrainablePolicy
 from policies.epsilon_greedy_annealing_trainable_policy import EpsilonGreedyAnnealingTrainablePolicy
 from policies.epsilon_greedy_trainable_policy import EpsilonGreedyTrainablePolicy
 from utils.color import Color
 from utils.config import Config
+from utils.metrics import Metrics, MetricsWriter
+from utils.parallel_evaluation import ParallelEvaluation, Score
 from utils.plot import Plot
+from utils.profiler import profiler
 from utils.types import Actions
 
 
 class GlobalConfig:
 	def __init__(self, board_size: int, black: Agent, train_configs: List[Config], eval_configs: List[Config],
-	             test_configs: List[Config], human_configs: List[Config]) -> None:
+	             test_configs: List[Config], human_configs: List[Config], num_envs: int = 1, num_workers: int = 0,
+	             record_path: Union[str, None] = None, num_eval_workers: int = 0, background_eval: bool = False,
+	             eval_seed: int = 0, profile: bool = False, profile_path: Union[str, None] = None,
+	             metrics_path: str = os.path.join('plots', 'metrics.jsonl'), plot: bool = True) -> None:
 		assert black.color is Color.BLACK, f'Invalid black agent: black agent\'s color is not black'
+		assert 1 <= num_envs, f'Invalid number of environments: num_envs should be at least 1, but got {num_envs}'
+		assert 0 <= num_workers, f'Invalid number of workers: num_workers should be at least 0, but got {num_workers}'
+		assert 0 <= num_eval_workers, f'Invalid number of evaluation workers: num_eval_workers should be at least 0, but got {num_eval_workers}'
+		if background_eval:
+			assert num_eval_workers > 0, f'Cannot evaluate in the background without evaluation workers'
+		if profile_path is not None:
+			assert profile, f'Cannot write a function level profile without profiling'
 
 		self.board_size: int = board_size
 		self.black = black
@@ -30,13 +48,38 @@ class GlobalConfig:
 		self.eval_configs: List[Config] = eval_configs
 		self.test_configs: List[Config] = test_configs
 		self.human_configs: List[Config] = human_configs
+		# number of games played in lockstep, with batched network calls
+		self.num_envs: int = num_envs
+		# number of processes playing the training games, 0 plays them in this process
+		self.num_workers: int = num_workers
+		# games played in this process are appended to this record file
+		self.recorder: Union[GameRecordWriter, None] = GameRecordWriter(record_path) if record_path is not None else None
+		# evaluation and test games are seeded by eval_seed and episode, wherever they are played
+		self.eval_seed: int = eval_seed
+		# processes playing the evaluation and test games, None plays them in this process
+		self.evaluation: Union[ParallelEvaluation, None] = ParallelEvaluation(board_size, num_eval_workers, eval_seed) \
+			if num_eval_workers > 0 else None
+		# keep training while the evaluation workers play against a snapshot
+		self.background_eval: bool = background_eval
+		# evaluation still running: (episode, score or games per eval agent, metrics without the win ratios yet)
+		self.pending_evals: Union[Tuple[int, List[Union[Score, List[Future]]], Metrics], None] = None
 
 		self.total_episodes: int = 0
 
-		# initialize plot
+		# time the phases of every training config, and write a cProfile file per config to profile_path if given
+		self.profile: bool = profile
+		self.profile_path: Union[str, None] = profile_path
+		if profile:
+			profiler.enable(cprofile=profile_path is not None)
+
+		# win ratios, epsilon, games per second and loss of every evaluation, written and drawn in the background
+		self.metrics: Union[MetricsWriter, None] = None
+		self.plot: Union[Plot, None] = None
 		if isinstance(self.black, TrainableAgent):
-			self.plot: Plot = Plot()
-			self.scores: defaultdict = defaultdict(list)
+			self.metrics: MetricsWriter = MetricsWriter(metrics_path)
+			if plot:
+				self.plot: Plot = Plot(metrics_path)
+				self.plot.start()
 
 		# initialize colors
 		init()
@@ -47,7 +90,11 @@ class GlobalConfig:
 
 		# train and evaluate
 		for config in self.train_configs:
-			self.train_eval(config)
+			profiler.reset()
+			with profiler.phase('total'):
+				self.train_eval(config)
+			if self.profile:
+				self.print_profile(config)
 			self.total_episodes += config.num_episodes
 
 		# set train mode
@@ -61,6 +108,24 @@ class GlobalConfig:
 		for config in self.human_configs:
 			self.human(config)
 
+		# finish the record file
+		if self.recorder is not None:
+			self.recorder.close()
+		# stop the evaluation workers
+		if self.evaluation is not None:
+			self.evaluation.close()
+		# stop the workers of the policies, e.g. of a parallel minimax search
+		for config in self.train_configs + self.eval_configs + self.test_configs + self.human_configs:
+			if isinstance(config.white, UntrainableAgent):
+				config.white.policy.close()
+		if isinstance(self.black, UntrainableAgent):
+			self.black.policy.close()
+		# write the last metrics, and draw them
+		if self.metrics is not None:
+			self.metrics.close()
+		if self.plot is not None:
+			self.plot.close()
+
 	def train_eval(self, config: Config) -> None:
 		assert isinstance(self.black, TrainableAgent)
 
@@ -69,48 +134,72 @@ class GlobalConfig:
 		white: Agent = config.white
 		if isinstance(white, TrainableAgent):
 			white.train_mode = config.train_white
-		# initialize train policy
-		if isinstance(black.train_policy, AnnealingTrainablePolicy):
-			black.train_policy.num_episodes = config.num_episodes
-		if isinstance(config.white, TrainableAgent) and isinstance(white.train_policy, AnnealingTrainablePolicy):
-			white.train_policy.num_episodes = config.num_episodes
+		# initialize train policy, the games step it when they are done
+		annealing_policies: List[AnnealingTrainablePolicy] = [
+			agent.train_policy for agent in [black, white]
+			if isinstance(agent, TrainableAgent) and agent.train_mode and isinstance(agent.train_policy, AnnealingTrainablePolicy)]
+		for policy in annealing_policies:
+			policy.start(config.num_episodes)
 		# print agents
 		print(f'\nTRAINING\n\t{black}\n\t{white}\n')
 
-		for episode in tqdm(range(1, config.num_episodes + 1)):
-			# update policies
-			if isinstance(black.train_policy, AnnealingTrainablePolicy):
-				black.train_policy.update(episode)
-			if isinstance(white, TrainableAgent) and isinstance(black.train_policy, AnnealingTrainablePolicy):
-				white.train_policy.update(episode)
-
+		eval_every: int = ceil(config.num_episodes / 10)
+		progress_bar: tqdm = tqdm(total=config.num_episodes)
+		# workers play with copies of the agents as they are now, in train mode
+		self_play: Union[ParallelSelfPlay, None] = None
+		if self.num_workers > 0:
+			self_play: ParallelSelfPlay = ParallelSelfPlay(self.board_size, black, config, self.num_workers)
+			self_play.start()
+		# games played and time spent playing and learning since the last evaluation
+		num_games: int = 0
+		train_time: float = 0.0
+		episode: int = 1
+		while episode <= config.num_episodes:
 			# evaluate every 10 % of number of episodes
-			if (episode - 1) % ceil(config.num_episodes / 10) == 0:
+			if (episode - 1) % eval_every == 0:
 				# set train mode
 				black.train_mode = False
 
-				# evaluate
+				# evaluate and plot win ratio
 				print(f'\nEVALUATING episode {episode - 1:>5}')
-				self.evals()
-
-				# plot win ratio
-				self.plot.update(self.total_episodes + episode - 1, self.scores)
+				with profiler.phase('evaluation'):
+					self.evals(self.total_episodes + episode - 1, num_games / train_time if train_time > 0 else None)
+				num_games: int = 0
+				train_time: float = 0.0
 
 				# set train mode back
 				black.train_mode = True
 
-			# play new game
-			Game(self.board_size, self.black, config, episode, random_start=True).play()
+			# play new games, but never past the next evaluation
+			next_eval: int = min(config.num_episodes, ceil(episode / eval_every) * eval_every)
+			start_time: float = perf_counter()
+			with profiler.phase('self-play'):
+				if self_play is not None:
+					# keep all workers busy until the next evaluation
+					last_episode: int = next_eval
+					self_play.play(range(episode, last_episode + 1))
+					# the workers anneal their own copies, keep the learner's schedule in step with them
+					for policy in annealing_policies:
+						policy.step(last_episode - episode + 1)
+				else:
+					last_episode: int = min(episode + self.num_envs - 1, next_eval)
+					self.play(config, range(episode, last_episode + 1), random_start=True)
+			train_time += perf_counter() - start_time
+			num_games += last_episode - episode + 1
+			progress_bar.update(last_episode - episode + 1)
+			episode: int = last_episode + 1
+		progress_bar.close()
+		if self_play is not None:
+			self_play.close()
 
 		# set train mode one last time
 		black.train_mode = False
 
-		# evaluate one last time
+		# evaluate and plot win ratio one last time, and wait for it
 		print(f'EVALUATING episode {config.num_episodes:>5}')
-		self.evals()
-
-		# plot win ratio one last time
-		self.plot.update(self.total_episodes + config.num_episodes, self.scores)
+		with profiler.phase('evaluation'):
+			self.evals(self.total_episodes + config.num_episodes, num_games / train_time if train_time > 0 else None)
+			self.finish_evals()
 
 		# set train mode back one last time
 		black.train_mode = True
@@ -120,19 +209,58 @@ class GlobalConfig:
 		if isinstance(white, TrainableAgent) and white.train_mode:
 			white.save_weights()
 
-	def evals(self) -> None:
-		# win rate for each eval agent
-		for i, config in enumerate(self.eval_configs):
-			win_ratio: float = self.eval(config)
-			self.scores[i].append(win_ratio)
+	def evals(self, episode: int, games_per_second: Union[float, None] = None) -> None:
+		# the previous snapshot first, so the scores stay in order
+		self.finish_evals()
+
+		# start the evaluation against each eval agent
+		scores: List[Union[Score, List[Future]]] = [self.eval(config) for config in self.eval_configs]
 
 		# epsilon for trainable agent
+		epsilon: Union[float, None] = None
 		if isinstance(self.black, TrainableAgent) and isinstance(self.black.train_policy, EpsilonGreedyTrainablePolicy):
-			self.scores['epsilon'].append(self.black.train_policy.epsilon*100)
+			epsilon: float = self.black.train_policy.epsilon*100
 		elif isinstance(self.black, TrainableAgent) and isinstance(self.black.train_policy, EpsilonGreedyAnnealingTrainablePolicy):
-			self.scores['epsilon'].append(self.black.train_policy.inner_policy.epsilon*100)
+			epsilon: float = self.black.train_policy.inner_policy.epsilon*100
+
+		metrics: Metrics = {
+			'episode': episode,
+			'epsilon': epsilon,
+			'games_per_second': games_per_second,
+			'loss': self.black.pop_mean_loss() if isinstance(self.black, TrainableAgent) else None,
+		}
+		self.pending_evals = (episode, scores, metrics)
+		if not self.background_eval:
+			self.finish_evals()
+
+	def finish_evals(self) -> None:
+		if self.pending_evals is None:
+			return
+		episode, scores, metrics = self.pending_evals
+		self.pending_evals = None
+		if self.background_eval:
+			print(f'\nEVALUATED episode {episode:>5}')
 
-	def eval(self, config: Config) -> float:
+		# win rate for each eval agent
+		for i, (config, score) in enumerate(zip(self.eval_configs, scores)):
+			if isinstance(score, list):
+				score: Score = ParallelEvaluation.result(score)
+			self.black.num_games_won, config.white.num_games_won = score
+			metrics[f'win_ratio_{i}'] = self.print_score(config)
+
+		# hand the metrics to the writer, the plot is drawn in its own process
+		with profiler.phase('metrics'):
+			self.metrics.write(metrics)
+
+	def print_profile(self, config: Config) -> None:
+		# phases of this process only, games played by workers are timed as a whole in self-play
+		print(profiler.summary(f'\nPROFILE\n\t{self.black}\n\t{config.white}\n'))
+		if self.profile_path is not None:
+			path: str = f'{self.profile_path}_{self.total_episodes}.prof'
+			profiler.dump(path)
+			print(f'Saved profile to {path}')
+
+	def eval(self, config: Config) -> Union[Score, List[Future]]:
 		assert isinstance(self.black, TrainableAgent)
 
 		# agents
@@ -141,26 +269,41 @@ class GlobalConfig:
 		# set train mode
 		if isinstance(white, TrainableAgent):
 			white.train_mode = False
-		# reset agents
-		black.reset()
-		white.reset()
 
-		for episode in range(1, config.num_episodes + 1):
-			# create new game
-			game: Game = Game(self.board_size, self.black, config, episode)
-			# play game
-			game.play()
+		if self.evaluation is not None:
+			# play with a snapshot of the agents in other processes
+			score: Union[Score, List[Future]] = self.evaluation.submit(black, config)
+		else:
+			# reset agents
+			black.reset()
+			white.reset()
+			if black.inference_cache is not None:
+				black.inference_cache.reset_statistics()
+
+			for episode in range(1, config.num_episodes + 1, self.num_envs):
+				# play new games
+				self.play(config, range(episode, min(episode + self.num_envs, config.num_episodes + 1)),
+				          seed=self.eval_seed)
+			score: Union[Score, List[Future]] = (black.num_games_won, white.num_games_won)
+
+			# saved network calls
+			if black.inference_cache is not None:
+				print(f'\t{black.inference_cache}')
 
-		# print score
+		# set train mode back
+		if isinstance(white, TrainableAgent):
+			white.train_mode = config.train_white
+
+		return score
+
+	def print_score(self, config: Config) -> float:
+		black: Agent = self.black
+		white: Agent = config.white
 		ties: int = config.num_episodes - black.num_games_won - white.num_games_won
 		win_ratio: float = black.num_games_won / config.num_episodes * 100
 		print(
 			f'({black.num_games_won:>4}|{white.num_games_won:>4}|{ties:>4}) / {config.num_episodes:>4} -> win ratio: {win_ratio:>6.2f} %')
 
-		# set train mode back
-		if isinstance(white, TrainableAgent):
-			white.train_mode = config.train_white
-
 		return win_ratio
 
 	def test(self, config: Config) -> None:
@@ -176,24 +319,35 @@ class GlobalConfig:
 		# print agents
 		print(f'\nTESTING\n\t{black}\n\t{white}\n')
 
-		for episode in tqdm(range(1, config.num_episodes + 1)):
-			# create new game
-			game: Game = Game(self.board_size, self.black, config, episode)
-			# play game
-			game.play()
+		if self.evaluation is not None:
+			# play with a snapshot of the agents in other processes
+			black.num_games_won, white.num_games_won = ParallelEvaluation.result(self.evaluation.submit(black, config))
+		else:
+			for episode in tqdm(range(1, config.num_episodes + 1, self.num_envs)):
+				# play new games
+				self.play(config, range(episode, min(episode + self.num_envs, config.num_episodes + 1)),
+				          seed=self.eval_seed)
 
 		# print score
-		ties: int = config.num_episodes - black.num_games_won - white.num_games_won
-		win_ratio: float = black.num_games_won / config.num_episodes * 100
-		print(
-			f'({black.num_games_won:>4}|{white.num_games_won:>4}|{ties:>4}) / {config.num_episodes:>4} -> win ratio: {win_ratio:>6.2f} %')
+		self.print_score(config)
 
 		# set train mode back
 		if isinstance(white, TrainableAgent):
 			white.train_mode = config.train_white
 
+	def play(self, config: Config, episodes: Iterable[int], random_start: bool = False,
+	         seed: Union[int, None] = None) -> None:
+		games: List[Game] = [Game(self.board_size, self.black, config, episode, random_start, recorder=self.recorder,
+		                          seed=seed) for episode in episodes]
+		if len(games) == 1:
+			games[0].play()
+		else:
+			VectorizedGame(games).play()
+
 	def human(self, config: Config) -> None:
 		assert isinstance(config.white, HumanAgent)
+		# tkinter is only imported when a human plays
+		from gui.controller import Controller
 
 		# agents
 		black = self.black
@@ -0,0 +1,127 @@
+from collections import OrderedDict
+from typing import Callable, Dict, List, Tuple, Union
+
+import numpy as np
+
+# 4 rotations, without and with a transposition first
+NUM_SYMMETRIES: int = 8
+
+
+def transform(boards: np.array, symmetry: int) -> np.array:
+	"""Apply one of the 8 board symmetries to the last two axes, e.g. (N,2,8,8)."""
+	if symmetry & 4:
+		boards: np.array = np.swapaxes(boards, -2, -1)
+	return np.rot90(boards, symmetry & 3, axes=(-2, -1))
+
+
+def inverse_transform(boards: np.array, symmetry: int) -> np.array:
+	"""Undo transform for the same symmetry."""
+	boards: np.array = np.rot90(boards, -(symmetry & 3), axes=(-2, -1))
+	if symmetry & 4:
+		boards: np.array = np.swapaxes(boards, -2, -1)
+	return boards
+
+
+class InferenceCache:
+	"""Least recently used q-values by network input, shared by the 8 symmetries of a position.
+
+	Entries remember the weights version they were computed with, an entry of another version is a miss and is
+	replaced, so changing the weights costs nothing up front.
+	"""
+
+	def __init__(self, board_size: int, size: int = 2 ** 16) -> None:
+		assert 0 < size, f'Invalid size: size should be positive, but got {size}'
+
+		self.board_size: int = board_size
+		self.size: int = size
+
+		# (weights version, q-values) of the canonical orientation of a position
+		self.entries: OrderedDict = OrderedDict()
+
+		self.num_hits: int = 0
+		self.num_misses: int = 0
+
+	def __len__(self) -> int:
+		return len(self.entries)
+
+	def __str__(self) -> str:
+		return f'InferenceCache(hits={self.num_hits}, misses={self.num_misses}, hit_rate={self.hit_rate * 100:.2f} %)'
+
+	@property
+	def hit_rate(self) -> float:
+		num_lookups: int = self.num_hits + self.num_misses
+		return self.num_hits / num_lookups if num_lookups else 0.0
+
+	def canonicalize(self, states: np.array) -> Tuple[np.array, np.array]:
+		"""e.g. (N,2,8,8) states -> (N,2,8,8) canonical states and (N,) symmetries that turn states into them"""
+		num_states: int = len(states)
+		# any input layout ends in the board, e.g. (N,2,8,8) or (N,64)
+		boards: np.array = states.reshape(num_states, -1, self.board_size, self.board_size)
+
+		# the canonical orientation is the smallest one, compared at the first spot where they differ
+		canonical: np.array = boards
+		flat_canonical: np.array = canonical.reshape(num_states, -1)
+		symmetries: np.array = np.zeros(num_states, dtype=np.int64)
+		rows: np.array = np.arange(num_states)
+		for symmetry in range(1, NUM_SYMMETRIES):
+			orientation: np.array = transform(boards, symmetry)
+			flat_orientation: np.array = orientation.reshape(num_states, -1)
+			different: np.array = flat_orientation != flat_canonical
+			first: np.array = different.argmax(axis=1)
+			smaller: np.array = different[rows, first] & (flat_orientation[rows, first] < flat_canonical[rows, first])
+			canonical: np.array = np.where(smaller.reshape((-1,) + (1,) * (boards.ndim - 1)), orientation, canonical)
+			flat_canonical: np.array = canonical.reshape(num_states, -1)
+			symmetries[smaller] = symmetry
+
+		return canonical.reshape(states.shape), symmetries
+
+	def predict(self, states: np.array, predict: Callable[[np.array], np.array], version: int = 0) -> np.array:
+		"""Q-values of a batch of network inputs, only the positions seen in no orientation are passed to predict."""
+		num_states: int = len(states)
+		canonical_states, symmetries = self.canonicalize(states)
+		# one bytes key per state, without a python loop over the spots
+		flat_states: np.array = np.ascontiguousarray(canonical_states.reshape(num_states, -1).astype(np.int8))
+		keys: List[bytes] = flat_states.view(np.dtype((np.void, flat_states.shape[1]))).ravel().tolist()
+
+		# evaluate the missing positions in one batch, each only once
+		found: Dict[bytes, np.array] = {}
+		missing: Dict[bytes, int] = {}
+		for i, key in enumerate(keys):
+			if key in found or key in missing:
+				self.num_hits += 1
+				continue
+			entry: Union[Tuple[int, np.array], None] = self.entries.get(key)
+			if entry is not None and entry[0] == version:
+				self.entries.move_to_end(key)
+				found[key] = entry[1]
+				self.num_hits += 1
+			else:
+				missing[key] = i
+				self.num_misses += 1
+		if missing:
+			indices: List[int] = list(missing.values())
+			q_values: np.array = predict(canonical_states[indices])
+			for key, q_value in zip(missing, q_values):
+				found[key] = q_value
+				# an entry of an older version is replaced in place
+				self.entries[key] = (version, q_value)
+				self.entries.move_to_end(key)
+				if len(self.entries) > self.size:
+					self.entries.popitem(last=False)
+
+		# map the q-values back from the canonical orientation, one symmetry at a time
+		q_values: np.array = np.array([found[key] for key in keys])
+		result: np.array = np.empty((num_states, self.board_size ** 2), dtype=q_values.dtype)
+		for symmetry in np.unique(symmetries):
+			rows: np.array = np.flatnonzero(symmetries == symmetry)
+			boards: np.array = q_values[rows].reshape(-1, self.board_size, self.board_size)
+			result[rows] = inverse_transform(boards, int(symmetry)).reshape(len(rows), -1)
+
+		return result
+
+	def reset_statistics(self) -> None:
+		self.num_hits: int = 0
+		self.num_misses: int = 0
+
+	def clear(self) -> None:
+		self.entries.clear()
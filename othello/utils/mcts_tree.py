@@ -0,0 +1,112 @@
+from typing import List
+
+import numpy as np
+
+# location of the only child of a node whose player has to pass
+PASS: int = -1
+
+
+class MCTSTree:
+	"""Search tree in flat arrays, the children of a node are consecutive nodes.
+
+	Values are from the point of view of the player who moved into a node, so a parent picks the child with the
+	best value for itself. Node 0 is the root.
+	"""
+
+	def __init__(self, capacity: int = 1024) -> None:
+		assert 0 < capacity, f'Invalid capacity: capacity should be positive, but got {capacity}'
+
+		self.capacity: int = capacity
+		self.visits: np.array = np.zeros(capacity, dtype=np.int32)
+		self.value_sums: np.array = np.zeros(capacity, dtype=np.float64)
+		self.priors: np.array = np.zeros(capacity, dtype=np.float32)
+		# paths of leaves waiting for their evaluation, each counts as a lost visit until then
+		self.virtual_losses: np.array = np.zeros(capacity, dtype=np.int32)
+		# location index row * board size + col of the move into a node, or PASS
+		self.locations: np.array = np.zeros(capacity, dtype=np.int16)
+		# 0 children for a node that is not expanded yet
+		self.first_children: np.array = np.zeros(capacity, dtype=np.int32)
+		self.num_children: np.array = np.zeros(capacity, dtype=np.int16)
+		# final result for the player to move in a node where nobody can play anymore
+		self.terminals: np.array = np.zeros(capacity, dtype=np.bool_)
+		self.terminal_values: np.array = np.zeros(capacity, dtype=np.float32)
+
+		# the root
+		self.num_nodes: int = 1
+
+	def __len__(self) -> int:
+		return self.num_nodes
+
+	def _grow(self, num_nodes: int) -> None:
+		# double until num_nodes fit, like a list, so adding nodes is amortized constant time
+		capacity: int = self.capacity
+		while capacity < num_nodes:
+			capacity *= 2
+		for name in ('visits', 'value_sums', 'priors', 'virtual_losses', 'locations', 'first_children',
+		             'num_children', 'terminals', 'terminal_values'):
+			array: np.array = getattr(self, name)
+			grown: np.array = np.zeros(capacity, dtype=array.dtype)
+			grown[:self.capacity] = array
+			setattr(self, name, grown)
+		self.capacity: int = capacity
+
+	def is_expanded(self, node: int) -> bool:
+		return self.num_children[node] > 0
+
+	def children(self, node: int) -> np.array:
+		return np.arange(self.first_children[node], self.first_children[node] + self.num_children[node])
+
+	def expand(self, node: int, locations: List[int], priors: np.array) -> None:
+		if self.num_nodes + len(locations) > self.capacity:
+			self._grow(self.num_nodes + len(locations))
+
+		first_child: int = self.num_nodes
+		children: slice = slice(first_child, first_child + len(locations))
+		self.locations[children] = locations
+		self.priors[children] = priors
+		self.first_children[node] = first_child
+		self.num_children[node] = len(locations)
+		self.num_nodes += len(locations)
+
+	def select(self, node: int, c_puct: float, virtual_loss: float) -> int:
+		"""Child of node with the best upper confidence bound, where pending evaluations count as losses."""
+		children: slice = slice(self.first_children[node], self.first_children[node] + self.num_children[node])
+		virtual_losses: np.array = self.virtual_losses[children]
+		visits: np.array = self.visits[children] + virtual_losses
+		values: np.array = (self.value_sums[children] - virtual_loss * virtual_losses) / np.maximum(visits, 1)
+		parent_visits: int = int(self.visits[node] + self.virtual_losses[node])
+		scores: np.array = values + c_puct * self.priors[children] * np.sqrt(max(parent_visits, 1)) / (1 + visits)
+
+		return int(self.first_children[node] + np.argmax(scores))
+
+	def backup(self, path: List[int], value: float) -> None:
+		# value is for the player to move in the last node of path, the player who moved into it sees the opposite
+		signs: np.array = np.where(np.arange(len(path))[::-1] % 2 == 0, -1.0, 1.0)
+		self.value_sums[path] += signs * value
+		self.visits[path] += 1
+
+	def best_child(self, node: int) -> int:
+		children: np.array = self.children(node)
+		return int(children[np.argmax(self.visits[children])])
+
+	def subtree(self, node: int) -> 'MCTSTree':
+		"""Copy of the subtree of node with node as root, without the rest of the tree."""
+		# breadth first, so the children of a node stay consecutive
+		old_nodes: List[int] = [node]
+		first_children: List[int] = [0]
+		index: int = 0
+		while index < len(old_nodes):
+			old_node: int = old_nodes[index]
+			first_children[index] = len(old_nodes)
+			old_nodes.extend(range(self.first_children[old_node], self.first_children[old_node] + self.num_children[old_node]))
+			first_children.extend([0] * (len(old_nodes) - len(first_children)))
+			index += 1
+
+		tree: MCTSTree = MCTSTree(max(len(old_nodes), 1024))
+		new_nodes: slice = slice(0, len(old_nodes))
+		for name in ('visits', 'value_sums', 'priors', 'locations', 'num_children', 'terminals', 'terminal_values'):
+			getattr(tree, name)[new_nodes] = getattr(self, name)[old_nodes]
+		tree.first_children[new_nodes] = first_children
+		tree.num_nodes: int = len(old_nodes)
+
+		return tree
@@ -0,0 +1,66 @@
+import json
+import os
+from queue import Queue
+from threading import Thread
+from typing import Dict, List, Union
+
+# one evaluation point: episode, win ratio per eval config, epsilon, games per second and loss, None when unknown
+Metrics = Dict[str, Union[int, float, None]]
+
+
+class MetricsWriter:
+	"""Appends metrics to a JSON lines file from a background thread, so training never waits for the disk."""
+
+	def __init__(self, path: str) -> None:
+		self.path: str = path
+
+		directory: str = os.path.dirname(path)
+		if directory:
+			os.makedirs(directory, exist_ok=True)
+		# a new run starts a new file
+		self.file = open(path, 'w')
+
+		# None stops the thread
+		self.queue: Queue = Queue()
+		self.thread: Thread = Thread(target=self._write, daemon=True)
+		self.thread.start()
+
+	def __enter__(self) -> 'MetricsWriter':
+		return self
+
+	def __exit__(self, *args) -> None:
+		self.close()
+
+	def write(self, metrics: Metrics) -> None:
+		self.queue.put(metrics)
+
+	def _write(self) -> None:
+		while True:
+			metrics: Union[Metrics, None] = self.queue.get()
+			if metrics is None:
+				break
+			self.file.write(json.dumps(metrics) + '\n')
+			# a reader may still see a partial last line, e.g. a renderer reading along, read_metrics skips it
+			if self.queue.empty():
+				self.file.flush()
+
+	def close(self) -> None:
+		self.queue.put(None)
+		self.thread.join()
+		self.file.close()
+
+
+def read_metrics(path: str) -> List[Metrics]:
+	"""Every complete line of a metrics file, a writer may still be appending."""
+	if not os.path.exists(path):
+		return []
+
+	metrics: List[Metrics] = []
+	with open(path) as file:
+		for line in file:
+			# the writer has not finished the last line yet
+			if not line.endswith('\n'):
+				break
+			metrics.append(json.loads(line))
+
+	return metrics
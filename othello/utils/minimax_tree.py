@@ -0,0 +1,116 @@
+from typing import List, Union
+
+import numpy as np
+
+from utils.mcts_tree import PASS
+from utils.transposition_table import Bound
+
+
+class MinimaxTree:
+	"""Search tree in flat arrays for alpha-beta, the children of a node are consecutive nodes.
+
+	Values are from the point of view of the player to move in a node. Node 0 is the root.
+	"""
+
+	def __init__(self, capacity: int = 1024) -> None:
+		assert 0 < capacity, f'Invalid capacity: capacity should be positive, but got {capacity}'
+
+		self.capacity: int = capacity
+		# location index row * board size + col of the move into a node, or PASS
+		self.locations: np.array = np.zeros(capacity, dtype=np.int16)
+		self.first_children: np.array = np.zeros(capacity, dtype=np.int32)
+		self.num_children: np.array = np.zeros(capacity, dtype=np.int16)
+		# the legal moves of a node are known once it is expanded, a terminal node has none
+		self.expanded: np.array = np.zeros(capacity, dtype=np.bool_)
+		self.terminals: np.array = np.zeros(capacity, dtype=np.bool_)
+		# value of the last search of a node, an estimate until all leaves below it are evaluated
+		self.values: np.array = np.zeros(capacity, dtype=np.float64)
+		# values at the depth before, which order the children during a depth
+		self.prev_values: np.array = np.zeros(capacity, dtype=np.float64)
+		# value of the network, for nodes that were a leaf
+		self.evaluated: np.array = np.zeros(capacity, dtype=np.bool_)
+		self.leaf_values: np.array = np.zeros(capacity, dtype=np.float64)
+		# depth and bound of the last search that needed no new leaf, -1 when there is none
+		self.searched_depths: np.array = np.full(capacity, -1, dtype=np.int16)
+		self.bounds: np.array = np.zeros(capacity, dtype=np.int8)
+
+		# the root
+		self.num_nodes: int = 1
+
+	def __len__(self) -> int:
+		return self.num_nodes
+
+	def _grow(self, num_nodes: int) -> None:
+		# double until num_nodes fit, like a list, so adding nodes is amortized constant time
+		capacity: int = self.capacity
+		while capacity < num_nodes:
+			capacity *= 2
+		for name in ('locations', 'first_children', 'num_children', 'expanded', 'terminals', 'values', 'prev_values',
+		             'evaluated', 'leaf_values', 'searched_depths', 'bounds'):
+			array: np.array = getattr(self, name)
+			grown: np.array = np.full(capacity, -1 if name == 'searched_depths' else 0, dtype=array.dtype)
+			grown[:self.capacity] = array
+			setattr(self, name, grown)
+		self.capacity: int = capacity
+
+	def is_pass(self, node: int) -> bool:
+		return self.num_children[node] == 1 and self.locations[self.first_children[node]] == PASS
+
+	def children(self, node: int) -> np.array:
+		return np.arange(self.first_children[node], self.first_children[node] + self.num_children[node])
+
+	def expand(self, node: int, locations: List[int]) -> None:
+		# the children start with the value of node for the opponent as estimate, in the order of locations
+		if self.num_nodes + len(locations) > self.capacity:
+			self._grow(self.num_nodes + len(locations))
+
+		first_child: int = self.num_nodes
+		children: slice = slice(first_child, first_child + len(locations))
+		self.locations[children] = locations
+		self.values[children] = -self.values[node]
+		self.first_children[node] = first_child
+		self.num_children[node] = len(locations)
+		self.expanded[node] = True
+		self.num_nodes += len(locations)
+
+	def set_terminal(self, node: int, value: float) -> None:
+		self.expanded[node] = True
+		self.terminals[node] = True
+		self.values[node] = value
+
+	def set_leaf_values(self, nodes: List[int], values: np.array) -> None:
+		self.evaluated[nodes] = True
+		self.leaf_values[nodes] = values
+		self.values[nodes] = values
+		# leaves are expanded before their value is known, their children have it as estimate from now on
+		for node, value in zip(nodes, values.tolist()):
+			self.values[self.first_children[node]:self.first_children[node] + self.num_children[node]] = -value
+
+	def new_depth(self) -> None:
+		self.prev_values[:self.num_nodes] = self.values[:self.num_nodes]
+
+	def lookup(self, node: int, depth: int, alpha: float, beta: float) -> Union[float, None]:
+		"""Value of the last search of node to depth, if it holds for the window, like a transposition table."""
+		if self.searched_depths[node] != depth:
+			return None
+		value: float = float(self.values[node])
+		bound: Bound = Bound(int(self.bounds[node]))
+		if bound is Bound.EXACT or (bound is Bound.LOWER and value >= beta) or (bound is Bound.UPPER and value <= alpha):
+			return value
+		return None
+
+	def store(self, node: int, depth: int, alpha: float, beta: float, value: float) -> None:
+		if value <= alpha:
+			bound: Bound = Bound.UPPER
+		elif value >= beta:
+			bound: Bound = Bound.LOWER
+		else:
+			bound: Bound = Bound.EXACT
+		self.values[node] = value
+		self.searched_depths[node] = depth
+		self.bounds[node] = bound.value
+
+	def set_estimate(self, node: int, value: float) -> None:
+		# a search that still waits for leaves, the last search that did not is out of date
+		self.values[node] = value
+		self.searched_depths[node] = -1
@@ -0,0 +1,31 @@
+from typing import List, Tuple
+
+import numpy as np
+
+from agents.trainable_agent import TrainableAgent
+from utils.color import Color
+
+
+def evaluate_positions(agent: TrainableAgent, boards: List[np.array], colors: List[Color],
+                       locations: List[List[int]]) -> Tuple[List[np.array], np.array]:
+	"""Priors over the legal location indices and values in [-1, 1] of positions for colors, from one network call."""
+	# the network sees the board as its own color would, so swap the colors of the opponent's positions
+	inputs: np.array = np.array([board if color is agent.color else np.where(board >= 0, 1 - board, board)
+	                             for board, color in zip(boards, colors)])
+	q_values: np.array = agent.predict(agent.board_to_nn_input(inputs))
+
+	# the network learns the final reward of every move, e.g. win=1 and loss=0 of FixedReward, so its best legal
+	# q-value mapped from that range to [-1, 1] values the position
+	win: float = getattr(agent.final_reward, 'win', 1.0)
+	loss: float = getattr(agent.final_reward, 'loss', 0.0)
+
+	priors: List[np.array] = []
+	values: np.array = np.zeros(len(boards))
+	for i, legal_locations in enumerate(locations):
+		legal_q_values: np.array = q_values[i, legal_locations]
+		total: float = float(legal_q_values.sum())
+		priors.append(legal_q_values / total if total > 1e-10 else np.full(len(legal_locations), 1 / len(legal_locations)))
+		if win > loss:
+			values[i] = min(max(2 * (float(legal_q_values.max()) - loss) / (win - loss) - 1, -1.0), 1.0)
+
+	return priors, values
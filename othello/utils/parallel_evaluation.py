@@ -0,0 +1,59 @@
+import multiprocessing
+import pickle
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import List, Tuple
+
+from agents.agent import Agent
+from game_logic.game import Game
+from utils.config import Config
+
+# (games won by black, games won by white)
+Score = Tuple[int, int]
+
+
+def _play_games(board_size: int, snapshot: bytes, episodes: List[int], seed: int) -> Score:
+	black, config = pickle.loads(snapshot)
+	black: Agent
+	config: Config
+	black.reset()
+	config.white.reset()
+
+	for episode in episodes:
+		Game(board_size, black, config, episode, seed=seed).play()
+
+	return black.num_games_won, config.white.num_games_won
+
+
+class ParallelEvaluation:
+	"""Plays evaluation games with a snapshot of the agents in a pool of worker processes."""
+
+	def __init__(self, board_size: int, num_workers: int, seed: int = 0) -> None:
+		assert 1 <= num_workers, f'Invalid number of workers: num_workers should be at least 1, but got {num_workers}'
+
+		self.board_size: int = board_size
+		self.num_workers: int = num_workers
+		# games are seeded by seed and episode, so the score does not depend on the number of workers,
+		# or on whether the games are played in this process
+		self.seed: int = seed
+
+		# spawn instead of fork, tensorflow does not survive being forked
+		self.executor: ProcessPoolExecutor = ProcessPoolExecutor(num_workers, multiprocessing.get_context('spawn'))
+
+	def submit(self, black: Agent, config: Config) -> List[Future]:
+		"""Start playing config.num_episodes games with the agents as they are now."""
+		# pickle now, the agents may change before the pool gets to the games
+		snapshot: bytes = pickle.dumps((black, config))
+		episodes: List[int] = list(range(1, config.num_episodes + 1))
+
+		return [self.executor.submit(_play_games, self.board_size, snapshot, episodes[i::self.num_workers], self.seed)
+		        for i in range(min(self.num_workers, len(episodes)))]
+
+	@staticmethod
+	def result(futures: List[Future]) -> Score:
+		"""Wait for the games of a submit and add up their scores."""
+		scores: List[Score] = [future.result() for future in futures]
+
+		return sum(score[0] for score in scores), sum(score[1] for score in scores)
+
+	def close(self) -> None:
+		self.executor.shutdown()
@@ -0,0 +1,215 @@
+from typing import Dict, Iterable, List, Tuple, Union
+
+import numpy as np
+
+from game_logic.board import Board
+from game_logic.game_record import GameRecord
+from utils.color import Color
+from utils.inference_cache import NUM_SYMMETRIES, transform
+from utils.types import Location, Locations
+
+
+def get_patterns(board_size: int) -> Dict[str, Locations]:
+	"""Squares of each pattern in the top left corner, the other corners use the same table through symmetry."""
+	block_width: int = min(5, board_size)
+	return {
+		'edge': [(0, col) for col in range(board_size)],
+		'corner': [(row, col) for row in range(3) for col in range(3)],
+		'diagonal': [(i, i) for i in range(board_size)],
+		'block': [(row, col) for row in range(2) for col in range(block_width)],
+	}
+
+
+def get_instances(board_size: int, squares: Locations) -> List[List[int]]:
+	"""Square indices of every distinct placement of a pattern under the 8 board symmetries."""
+	spots: np.array = np.arange(board_size ** 2).reshape(board_size, board_size)
+	instances: List[List[int]] = []
+	for symmetry in range(NUM_SYMMETRIES):
+		transformed: np.array = transform(spots, symmetry)
+		instance: List[int] = [int(transformed[row, col]) for row, col in squares]
+		# e.g. an edge read in both directions covers the same squares, one of them is enough
+		if all(set(instance) != set(other) for other in instances):
+			instances.append(instance)
+
+	return instances
+
+
+class PatternEvaluator:
+	"""Sum of learned values of the base-3 indices of edges, corners, diagonals and 2x5 corner blocks.
+
+	Values are disk differences from black's point of view. The indices follow a board incrementally with
+	set_board, update and undo, or are computed for a batch of boards at once with evaluate_boards.
+	"""
+
+	def __init__(self, board_size: int, weights: Union[np.array, None] = None) -> None:
+		self.board_size: int = board_size
+		self.patterns: Dict[str, Locations] = get_patterns(board_size)
+
+		# one table per pattern, all tables in one array, offsets[i] is where the table of instance i starts
+		offsets: List[int] = []
+		instances: List[List[int]] = []
+		num_weights: int = 0
+		for squares in self.patterns.values():
+			for instance in get_instances(board_size, squares):
+				offsets.append(num_weights)
+				instances.append(instance)
+			num_weights += 3 ** len(squares)
+		self.num_weights: int = num_weights
+		self.num_instances: int = len(instances)
+		self.offsets: np.array = np.array(offsets, dtype=np.int64)
+
+		# powers[s, i] is what one more in the digit of spot s adds to the index of instance i
+		# digits are 0 for an empty spot, 1 for black and 2 for white
+		self.powers: np.array = np.zeros((board_size ** 2, self.num_instances), dtype=np.int64)
+		for i, instance in enumerate(instances):
+			self.powers[instance, i] = 3 ** np.arange(len(instance))
+		# indices of many boards at once are a matrix product, which numpy only hands to BLAS for floats
+		# indices stay far below 2 ** 53, so they are exact
+		self.float_powers: np.array = self.powers.astype(np.float64)
+		# plain lists of the nonzero powers, a few instances at a time are faster without numpy
+		# (instance, power) per spot and (spot, power) per instance
+		self.spot_powers: List[List[Tuple[int, int]]] = [
+			[(int(i), int(self.powers[spot, i])) for i in np.flatnonzero(self.powers[spot])] for spot in range(board_size ** 2)]
+		self.instance_powers: List[List[Tuple[int, int]]] = [
+			[(int(spot), int(self.powers[spot, i])) for spot in np.flatnonzero(self.powers[:, i])]
+			for i in range(self.num_instances)]
+
+		if weights is None:
+			weights: np.array = np.zeros(num_weights, dtype=np.float32)
+		assert weights.shape == (num_weights,), \
+			f'Invalid weights: weights should have shape ({num_weights},), but got {weights.shape}'
+		self.weights: np.array = weights.astype(np.float32)
+
+		# indices of the followed board, with the indices before each update
+		self.indices: np.array = self.offsets.copy()
+		self.prev_indices: List[np.array] = []
+
+	def __str__(self) -> str:
+		return f'PatternEvaluator(board_size={self.board_size}, patterns={list(self.patterns)}, ' \
+		       f'instances={self.num_instances}, weights={self.num_weights})'
+
+	def __getstate__(self) -> dict:
+		# copies, e.g. in the workers of a parallel search, follow boards of their own
+		state: dict = self.__dict__.copy()
+		state['indices'] = self.offsets.copy()
+		state['prev_indices'] = []
+
+		return state
+
+	def get_indices(self, boards: np.array) -> np.array:
+		"""e.g. (N,8,8) boards -> (N,I) indices into weights of every pattern instance"""
+		digits: np.array = boards.reshape(len(boards), -1).astype(np.float64) + 1
+
+		return (digits @ self.float_powers).astype(np.int64) + self.offsets
+
+	def evaluate_boards(self, boards: np.array, colors: np.array) -> np.array:
+		"""e.g. (N,8,8) boards and (N,) color values -> (N,) values from the point of view of colors"""
+		values: np.array = self.weights[self.get_indices(boards)].sum(axis=1)
+
+		return np.where(colors == Color.BLACK.value, values, -values)
+
+	def set_board(self, board: Board) -> None:
+		# start following a board, e.g. at the root of a search
+		self.indices: np.array = self.get_indices(np.expand_dims(board.board, axis=0))[0]
+		self.prev_indices: List[np.array] = []
+
+	def update(self, location: Location, flipped: Locations, color: Color) -> None:
+		# only the indices of instances through the placed disk and the flipped disks change
+		self.prev_indices.append(self.indices)
+		digit: int = color.value + 1
+		# a flipped disk goes from the other color's digit to this color's digit
+		flip: int = 1 if color is Color.WHITE else -1
+		self.indices: np.array = self.indices + digit * self.powers[location[0] * self.board_size + location[1]]
+		if flipped:
+			spots: List[int] = [i * self.board_size + j for i, j in flipped]
+			self.indices: np.array = self.indices + flip * self.powers[spots].sum(axis=0)
+
+	def evaluate_change(self, board: np.array, location: Location, flipped: Locations, color: Color) -> float:
+		"""Change of the value of board by its last action of color at location, from black's point of view."""
+		# what update adds to the indices, only the instances through the placed disk and the flipped disks change
+		digit: int = color.value + 1
+		flip: int = 1 if color is Color.WHITE else -1
+		changes: Dict[int, int] = {}
+		for i, power in self.spot_powers[location[0] * self.board_size + location[1]]:
+			changes[i] = changes.get(i, 0) + digit * power
+		for row, col in flipped:
+			for i, power in self.spot_powers[row * self.board_size + col]:
+				changes[i] = changes.get(i, 0) + flip * power
+
+		digits: List[int] = (board.reshape(-1) + 1).tolist()
+		change: float = 0.0
+		for i, index_change in changes.items():
+			index: int = int(self.offsets[i]) + sum(digits[spot] * power for spot, power in self.instance_powers[i])
+			change += float(self.weights[index]) - float(self.weights[index - index_change])
+
+		return change
+
+	def undo(self) -> None:
+		self.indices: np.array = self.prev_indices.pop()
+
+	def evaluate(self, color: Color) -> float:
+		# value of the followed board from the point of view of color
+		value: float = float(self.weights[self.indices].sum())
+
+		return value if color is Color.BLACK else -value
+
+	def save(self, path: str) -> None:
+		np.save(path, self.weights)
+
+	@staticmethod
+	def load(board_size: int, path: str) -> 'PatternEvaluator':
+		return PatternEvaluator(board_size, np.load(path))
+
+	@staticmethod
+	def get_training_data(records: Iterable[GameRecord], board_size: int) -> Tuple[np.array, np.array]:
+		"""Every position of the recorded games on board_size, with the final disk difference for black."""
+		boards: List[np.array] = []
+		targets: List[int] = []
+		for record in records:
+			if record.board_size != board_size:
+				continue
+			num_boards: int = len(boards)
+			# replay moves the board in place, keep a copy of every position
+			for board, _, _ in record.replay():
+				boards.append(board.board.copy())
+			targets += [record.num_black_disks - record.num_white_disks] * (len(boards) - num_boards)
+
+		return np.array(boards, dtype=np.int8).reshape(-1, board_size, board_size), np.array(targets, dtype=np.float32)
+
+	def fit(self, boards: np.array, targets: np.array, l2: float = 1.0, num_iterations: int = 100,
+	        tolerance: float = 1e-6) -> float:
+		"""Least squares weights with an l2 penalty, by conjugate gradients on batches of indices. Returns the RMSE."""
+		assert 0.0 <= l2, f'Invalid l2: l2 should be at least 0, but got {l2}'
+		indices: np.array = self.get_indices(boards)
+		flat_indices: np.array = indices.ravel()
+
+		def predict(weights: np.array) -> np.array:
+			# A w, every position sums one weight per instance
+			return weights[indices].sum(axis=1)
+
+		def gradient(residuals: np.array) -> np.array:
+			# A^T r, every weight collects the residuals of the positions that use it
+			return np.bincount(flat_indices, np.repeat(residuals, self.num_instances), self.num_weights)
+
+		# conjugate gradients on the normal equations (A^T A + l2 I) w = A^T y
+		weights: np.array = self.weights.astype(np.float64)
+		residuals: np.array = gradient(targets - predict(weights)) - l2 * weights
+		direction: np.array = residuals.copy()
+		norm: float = float(residuals @ residuals)
+		initial_norm: float = norm
+		for _ in range(num_iterations):
+			if norm <= tolerance ** 2 * initial_norm:
+				break
+			product: np.array = gradient(predict(direction)) + l2 * direction
+			step: float = norm / float(direction @ product)
+			weights += step * direction
+			residuals -= step * product
+			prev_norm: float = norm
+			norm: float = float(residuals @ residuals)
+			direction: np.array = residuals + norm / prev_norm * direction
+
+		self.weights: np.array = weights.astype(np.float32)
+		self.indices: np.array = self.offsets.copy()
+		self.prev_indices: List[np.array] = []
+
+		return float(np.sqrt(np.mean((targets - predict(self.weights)) ** 2)))
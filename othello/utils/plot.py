@@ -1,32 +1,86 @@
-from collections import defaultdict
+import multiprocessing
+import os
+from multiprocessing.synchronize import Event
 from typing import List
 
-import matplotlib.pyplot as plt
 import numpy as np
 
+from utils.metrics import Metrics, read_metrics
+
+
+def render(metrics_path: str, plot_path: str) -> None:
+	"""Draw the win ratios and epsilon, and the games per second and loss, of a metrics file to an image."""
+	# no window, so rendering works on machines without a display too
+	import matplotlib
+	matplotlib.use('Agg')
+	import matplotlib.pyplot as plt
+
+	metrics: List[Metrics] = read_metrics(metrics_path)
+	if not metrics:
+		return
+	episodes: List[int] = [point['episode'] for point in metrics]
+
+	figure, (evaluation, training) = plt.subplots(2, 1, sharex=True, figsize=(8, 8))
+	for key in metrics[-1]:
+		if key.startswith('win_ratio'):
+			evaluation.plot(episodes, [point.get(key) for point in metrics], label=key)
+	evaluation.plot(episodes, [point.get('epsilon') for point in metrics], linestyle='--', label='epsilon')
+	evaluation.set_title('Evaluation')
+	evaluation.set_ylabel('win ratio')
+	evaluation.set_yticks(np.arange(0, 100 + 1, 10))
+	evaluation.legend(loc='lower right')
+
+	training.plot(episodes, [point.get('games_per_second') for point in metrics], color='tab:blue')
+	training.set_title('Training')
+	training.set_xlabel('episode')
+	training.set_ylabel('games per second', color='tab:blue')
+	loss = training.twinx()
+	loss.plot(episodes, [point.get('loss') for point in metrics], color='tab:red')
+	loss.set_ylabel('loss', color='tab:red')
+
+	# write to a temporary file first, so readers never see half an image
+	figure.savefig(f'{plot_path}.tmp.png')
+	os.replace(f'{plot_path}.tmp.png', plot_path)
+	plt.close(figure)
+
+
+def _render_loop(metrics_path: str, plot_path: str, interval: float, stop: Event) -> None:
+	# redraw whenever the metrics file changed, and once more at the end
+	last_size: int = -1
+	while True:
+		stopping: bool = stop.wait(interval)
+		size: int = os.path.getsize(metrics_path) if os.path.exists(metrics_path) else 0
+		if size != last_size:
+			render(metrics_path, plot_path)
+			last_size: int = size
+		if stopping:
+			break
+
 
 class Plot:
-	def __init__(self) -> None:
-		self.episodes: List[int] = []
-
-	def update(self, episode: int, scores: defaultdict) -> None:
-		self.episodes.append(episode)
-
-		plt.cla()
-		plt.plot(self.episodes, scores['epsilon'], linestyle='--')
-
-		for key, win_ratios in scores.items():
-			if key != 'epsilon':
-				plt.plot(self.episodes, win_ratios)
-
-		# draw
-		plt.title('Evaluation')
-		plt.xlabel('episode')
-		plt.ylabel('win ratio')
-		plt.yticks(np.arange(0, 100 + 1, 10))
-		fig = plt.gcf()
-		plt.draw()
-		plt.pause(0.001)
-
-		# save plot
-		fig.savefig('plots\\plot.png')
+	"""Renders a metrics file to an image in a separate process, so drawing never slows down training."""
+
+	def __init__(self, metrics_path: str, plot_path: str = os.path.join('plots', 'plot.png'),
+	             interval: float = 1.0) -> None:
+		self.metrics_path: str = metrics_path
+		self.plot_path: str = plot_path
+		# seconds between checks of the metrics file
+		self.interval: float = interval
+
+		directory: str = os.path.dirname(plot_path)
+		if directory:
+			os.makedirs(directory, exist_ok=True)
+
+		# spawn instead of fork, tensorflow does not survive being forked
+		context = multiprocessing.get_context('spawn')
+		self.stop: Event = context.Event()
+		self.process: multiprocessing.Process = context.Process(
+			target=_render_loop, args=(metrics_path, plot_path, interval, self.stop), daemon=True)
+
+	def start(self) -> None:
+		self.process.start()
+
+	def close(self) -> None:
+		# draws the last metrics before stopping
+		self.stop.set()
+		self.process.join()
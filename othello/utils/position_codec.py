@@ -0,0 +1,55 @@
+import numpy as np
+
+from utils.color import Color
+from utils.types import Locations
+
+# rows of an encoded position: one bit per spot, packed 8 spots per byte in row-major order
+OWN: int = 0
+OPPONENT: int = 1
+LEGAL: int = 2
+
+
+def num_bytes(board_size: int) -> int:
+	return (board_size ** 2 + 7) // 8
+
+
+def encode(board: np.array, color: Color, legal_locations: Locations) -> np.array:
+	"""e.g. (8,8) -> (3,8) bytes with own disks, opponent's disks and legal locations of color"""
+	board_size: int = board.shape[-1]
+	legal: np.array = np.zeros(board_size ** 2, dtype=np.bool_)
+	legal[[row * board_size + col for row, col in legal_locations]] = True
+	bits: np.array = np.stack([board.flatten() == color.value, board.flatten() == 1 - color.value, legal])
+
+	return np.packbits(bits, axis=-1, bitorder='little')
+
+
+def decode_bits(positions: np.array, board_size: int) -> np.array:
+	"""e.g. a batch (N,3,8) -> (N,3,64) with 0, 1"""
+	return np.unpackbits(positions, axis=-1, count=board_size ** 2, bitorder='little')
+
+
+def decode_legal_masks(positions: np.array, board_size: int) -> np.array:
+	"""e.g. a batch (N,3,8) -> (N,64) with False, True"""
+	return decode_bits(positions[:, LEGAL], board_size).astype(np.bool_)
+
+
+def decode_board(positions: np.array, board_size: int, color: Color) -> np.array:
+	"""e.g. a batch (N,3,8) -> (N,8,8) with the colors of the disks, as seen by color"""
+	bits: np.array = decode_bits(positions[:, :LEGAL], board_size)
+	board: np.array = np.full(bits.shape[:1] + bits.shape[2:], Color.EMPTY.value, dtype=np.int8)
+	board[bits[:, OWN] == 1] = color.value
+	board[bits[:, OPPONENT] == 1] = 1 - color.value
+
+	return board.reshape(-1, board_size, board_size)
+
+
+def decode_split(positions: np.array, board_size: int) -> np.array:
+	"""e.g. a batch (N,3,8) -> (N,2,8,8) with 0, 1, like reshapes.split"""
+	return decode_bits(positions[:, :LEGAL], board_size).reshape(-1, 2, board_size, board_size)
+
+
+def decode_flatten_negative(positions: np.array, board_size: int) -> np.array:
+	"""e.g. a batch (N,3,8) -> (N,64) with -1, 0, 1, like reshapes.flatten_negative"""
+	bits: np.array = decode_bits(positions[:, :LEGAL], board_size).astype(np.int8)
+
+	return bits[:, OWN] - bits[:, OPPONENT]
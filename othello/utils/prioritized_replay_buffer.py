@@ -0,0 +1,96 @@
+from typing import Tuple
+
+import numpy as np
+
+from utils.position_codec import num_bytes
+from utils.replay_buffer import ReplayBuffer
+from utils.sum_tree import SumTree
+from utils.td_targets import n_step_returns
+
+# (encoded positions, actions, discounted returns, discounts of the bootstrap q-values, encoded bootstrap positions)
+Batch = Tuple[np.array, np.array, np.array, np.array, np.array]
+
+
+class PrioritizedReplayBuffer:
+	"""Fixed capacity ring buffer of the moves of many games, sampled in proportion to their priorities."""
+
+	def __init__(self, capacity: int, board_size: int, alpha: float = 0.6, beta: float = 0.4,
+	             epsilon: float = 1e-3) -> None:
+		assert 0 < capacity, f'Invalid capacity: capacity should be positive, but got {capacity}'
+		assert 0.0 <= alpha, f'Invalid alpha: alpha should be at least 0, but got {alpha}'
+		assert 0.0 <= beta <= 1.0, f'Invalid beta: beta should be between 0 and 1, but got {beta}'
+		assert 0.0 < epsilon, f'Invalid epsilon: epsilon should be positive, but got {epsilon}'
+
+		self.capacity: int = capacity
+		self.board_size: int = board_size
+		# how much priorities matter, 0 samples uniformly
+		self.alpha: float = alpha
+		# how much the sampling bias is corrected, 1 corrects it completely
+		self.beta: float = beta
+		# keeps moves without errors from never being sampled again
+		self.epsilon: float = epsilon
+
+		# one row per move, preallocated so the buffer never grows
+		# positions are bit-packed own disks, opponent's disks and legal locations, 24 bytes on 8x8
+		self.positions: np.array = np.zeros((capacity, 3, num_bytes(board_size)), dtype=np.uint8)
+		self.actions: np.array = np.zeros(capacity, dtype=np.int16)
+		self.rewards: np.array = np.zeros(capacity, dtype=np.float32)
+		self.terminals: np.array = np.zeros(capacity, dtype=np.bool_)
+
+		self.priorities: SumTree = SumTree(capacity)
+		# new moves get the highest priority so far, so they are sampled at least once
+		self.max_priority: float = 1.0
+
+		# index of the next row to write, the oldest row once the buffer is full
+		self.index: int = 0
+		self.num_entries: int = 0
+
+	def __len__(self) -> int:
+		return self.num_entries
+
+	def add_episode(self, replay_buffer: ReplayBuffer) -> None:
+		# a whole game at once, so the move after a non terminal move is always its successor in the buffer
+		num_moves: int = len(replay_buffer.buffer)
+		assert num_moves <= self.capacity, f'Invalid episode: {num_moves} moves do not fit in a capacity of {self.capacity}'
+		if num_moves == 0:
+			return
+
+		indices: np.array = (self.index + np.arange(num_moves)) % self.capacity
+		positions, actions, rewards, terminals = replay_buffer.to_arrays(self.board_size)
+		self.positions[indices] = positions
+		self.actions[indices] = actions
+		self.rewards[indices] = rewards
+		self.terminals[indices] = terminals
+		# the game is over after its last move
+		self.terminals[indices[-1]] = True
+		self.priorities.update(indices, np.full(num_moves, self.max_priority ** self.alpha))
+
+		self.index: int = (self.index + num_moves) % self.capacity
+		self.num_entries: int = min(self.num_entries + num_moves, self.capacity)
+
+	def sample(self, batch_size: int) -> Tuple[np.array, np.array]:
+		"""Indices of a batch of moves and their importance sampling weights."""
+		assert 0 < self.num_entries, 'Cannot sample from an empty buffer'
+
+		# one value per equal segment of the total priority
+		total: float = self.priorities.total
+		values: np.array = (np.arange(batch_size) + np.random.random_sample(batch_size)) * (total / batch_size)
+		indices: np.array = np.minimum(self.priorities.find(values), self.num_entries - 1)
+
+		# correct for sampling high priorities more often than uniform sampling would
+		probabilities: np.array = self.priorities.get(indices) / total
+		weights: np.array = (self.num_entries * probabilities) ** -self.beta
+		weights /= weights.max()
+
+		return indices, weights.astype(np.float32)
+
+	def get_batch(self, indices: np.array, num_steps: int = 1, discount_factor: float = 1.0) -> Batch:
+		returns, discounts, bootstrap_indices = n_step_returns(indices, self.rewards, self.terminals, num_steps,
+		                                                       discount_factor)
+
+		return self.positions[indices], self.actions[indices], returns, discounts, self.positions[bootstrap_indices]
+
+	def update_priorities(self, indices: np.array, errors: np.array) -> None:
+		priorities: np.array = np.abs(errors) + self.epsilon
+		self.max_priority: float = max(self.max_priority, float(priorities.max()))
+		self.priorities.update(indices, priorities ** self.alpha)
@@ -0,0 +1,101 @@
+import cProfile
+from collections import defaultdict
+from time import perf_counter
+from typing import DefaultDict, List, Union
+
+
+class _Phase:
+	"""Adds the time between entering and exiting to a phase."""
+	__slots__ = ('profiler', 'name', 'start_time')
+
+	def __init__(self, profiler: 'Profiler', name: str) -> None:
+		self.profiler: Profiler = profiler
+		self.name: str = name
+		self.start_time: float = 0.0
+
+	def __enter__(self) -> None:
+		self.start_time: float = perf_counter()
+
+	def __exit__(self, *args) -> None:
+		self.profiler.times[self.name] += perf_counter() - self.start_time
+		self.profiler.calls[self.name] += 1
+
+
+class _NoPhase:
+	"""Does nothing, so disabled profiling costs one method call per phase."""
+	__slots__ = ()
+
+	def __enter__(self) -> None:
+		pass
+
+	def __exit__(self, *args) -> None:
+		pass
+
+
+_NO_PHASE: _NoPhase = _NoPhase()
+
+
+class Profiler:
+	"""Wall clock time and number of calls per phase, and counters, of this process. Disabled by default."""
+
+	def __init__(self) -> None:
+		self.enabled: bool = False
+		self.times: DefaultDict[str, float] = defaultdict(float)
+		self.calls: DefaultDict[str, int] = defaultdict(int)
+		self.counters: DefaultDict[str, int] = defaultdict(int)
+		# function level profile of everything between enable and disable, None does not profile functions
+		self.cprofile: Union[cProfile.Profile, None] = None
+
+	def enable(self, cprofile: bool = False) -> None:
+		self.enabled: bool = True
+		if cprofile:
+			self.cprofile: cProfile.Profile = cProfile.Profile()
+			self.cprofile.enable()
+
+	def disable(self) -> None:
+		self.enabled: bool = False
+		if self.cprofile is not None:
+			self.cprofile.disable()
+
+	def reset(self) -> None:
+		self.times.clear()
+		self.calls.clear()
+		self.counters.clear()
+		if self.cprofile is not None:
+			self.cprofile.disable()
+			self.cprofile: cProfile.Profile = cProfile.Profile()
+			self.cprofile.enable()
+
+	def phase(self, name: str) -> Union[_Phase, _NoPhase]:
+		# e.g. with profiler.phase('predict'): ...
+		return _Phase(self, name) if self.enabled else _NO_PHASE
+
+	def count(self, name: str, n: int = 1) -> None:
+		if self.enabled:
+			self.counters[name] += n
+
+	def summary(self, title: str, total_phase: str = 'total') -> str:
+		"""Table of the phases by time, with their share of total_phase. Phases can nest, so shares need not add up."""
+		total_time: float = self.times.get(total_phase, 0.0)
+		lines: List[str] = [
+			title,
+			f'\t{"phase":<16} {"calls":>10} {"time (s)":>10} {"per call (ms)":>14} {"share":>8}',
+		]
+		for name in sorted(self.times, key=self.times.get, reverse=True):
+			share: float = self.times[name] / total_time * 100 if total_time > 0 else 0.0
+			lines.append(f'\t{name:<16} {self.calls[name]:>10} {self.times[name]:>10.3f} '
+			             f'{self.times[name] / self.calls[name] * 1000:>14.3f} {share:>7.2f}%')
+		for name in sorted(self.counters):
+			rate: str = f'{self.counters[name] / total_time:>10.1f} /s' if total_time > 0 else ''
+			lines.append(f'\t{name:<16} {self.counters[name]:>10} {rate}')
+
+		return '\n'.join(lines)
+
+	def dump(self, path: str) -> None:
+		"""Write the function level profile so far, e.g. for python -m pstats or snakeviz."""
+		assert self.cprofile is not None, 'Cannot dump a function level profile without enabling it'
+		self.cprofile.dump_stats(path)
+
+
+# one profiler per process, phases are timed wherever they happen
+profiler: Profiler = Profiler()
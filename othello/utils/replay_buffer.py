@@ -1,10 +1,9 @@
 import collections
 import pickle
+from typing import Tuple
 
 import numpy as np
 
-from utils.types import Locations
-
 
 class ReplayBuffer:
 	def __init__(self, size: int = 10) -> None:
@@ -15,13 +14,23 @@ class ReplayBuffer:
 	def n_obs(self) -> int:
 		return len(self.buffer)
 
-	def add(self, s: np.array, a: tuple, r: float, terminal: bool, legal_locations: Locations) -> None:
-		self.buffer.append((s, a, r, terminal, legal_locations))
+	def add(self, position: np.array, a: tuple, r: float, terminal: bool) -> None:
+		# the position is encoded with utils.position_codec, with the legal locations
+		self.buffer.append((position, a, r, terminal))
 
 	def add_final_reward(self, final_reward: float) -> None:
 		last_element = self.buffer.pop()
 		if last_element is not None:
-			self.buffer.append((last_element[0], last_element[1], last_element[2] + final_reward, True, last_element[4]))
+			self.buffer.append((last_element[0], last_element[1], last_element[2] + final_reward, True))
+
+	def to_arrays(self, board_size: int) -> Tuple[np.array, np.array, np.array, np.array]:
+		"""Encoded positions, action indices, rewards and terminal flags, one row per move."""
+		positions: np.array = np.array([move[0] for move in self.buffer], dtype=np.uint8)
+		actions: np.array = np.array([row * board_size + col for _, (row, col), _, _ in self.buffer], dtype=np.int16)
+		rewards: np.array = np.array([move[2] for move in self.buffer], dtype=np.float32)
+		terminals: np.array = np.array([move[3] for move in self.buffer], dtype=np.bool_)
+
+		return positions, actions, rewards, terminals
 
 	def clear(self) -> None:
 		self.buffer.clear()
@@ -9,10 +9,10 @@ def flatten(board: np.array) -> np.array:
 
 
 def split(board: np.array, color: Color) -> np.array:
-	"""e.g. (8,8) -> (2,8,8)"""
+	"""e.g. (8,8) -> (2,8,8), or a batch (N,8,8) -> (N,2,8,8)"""
 	own: np.array = np.where(board == color.value, 1, 0)
 	opponent: np.array = np.where(board == 1 - color.value, 1, 0)
-	return np.stack([own, opponent])
+	return np.stack([own, opponent], axis=-3)
 
 
 def flatten_split(board: np.array) -> np.array:
@@ -26,8 +26,8 @@ def split_flatten(board: np.array) -> np.array:
 
 
 def flatten_negative(board: np.array, color: Color) -> np.array:
-	"""e.g. (8,8) -> (64) with -1, 0, 1"""
+	"""e.g. (8,8) -> (64) with -1, 0, 1, or a batch (N,8,8) -> (N,64)"""
 	own: np.array = np.where(board == color.value, 1, 0)
 	opponent: np.array = np.where(board == 1 - color.value, -1, 0)
 	board: np.array = np.add(own, opponent)
-	return flatten(board)
+	return board.reshape(board.shape[:-2] + (-1,))
@@ -0,0 +1,42 @@
+import numpy as np
+
+
+class SumTree:
+	"""Binary tree of priorities in one array, every node holds the sum of its children's priorities."""
+
+	def __init__(self, capacity: int) -> None:
+		assert 0 < capacity, f'Invalid capacity: capacity should be positive, but got {capacity}'
+
+		self.capacity: int = capacity
+		# leaves on a single level, padded to a power of 2 with zero priorities
+		self.num_leaves: int = 1 << (capacity - 1).bit_length()
+		self.depth: int = self.num_leaves.bit_length() - 1
+		# the root is node 1, the children of node i are 2i and 2i+1
+		self.tree: np.array = np.zeros(2 * self.num_leaves, dtype=np.float64)
+
+	@property
+	def total(self) -> float:
+		return self.tree[1]
+
+	def get(self, indices: np.array) -> np.array:
+		return self.tree[indices + self.num_leaves]
+
+	def update(self, indices: np.array, priorities: np.array) -> None:
+		# set the leaves, then recompute the sums of their ancestors level by level
+		nodes: np.array = np.asarray(indices) + self.num_leaves
+		self.tree[nodes] = priorities
+		for _ in range(self.depth):
+			nodes: np.array = np.unique(nodes // 2)
+			self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+
+	def find(self, values: np.array) -> np.array:
+		"""Indices of the leaves where the cumulative priorities reach values, for a batch of values in [0, total)."""
+		values: np.array = np.array(values, dtype=np.float64)
+		nodes: np.array = np.ones(len(values), dtype=np.int64)
+		for _ in range(self.depth):
+			left: np.array = self.tree[2 * nodes]
+			right: np.array = values >= left
+			values -= left * right
+			nodes: np.array = 2 * nodes + right
+		# rounding may walk past the last filled leaf
+		return np.minimum(nodes - self.num_leaves, self.capacity - 1)
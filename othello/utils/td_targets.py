@@ -0,0 +1,26 @@
+from typing import Tuple
+
+import numpy as np
+
+
+def n_step_returns(indices: np.array, rewards: np.array, terminals: np.array, num_steps: int,
+                   discount_factor: float) -> Tuple[np.array, np.array, np.array]:
+	"""Discounted rewards of up to num_steps consecutive moves from indices, with the discounts and indices to bootstrap from."""
+	# moves wrap around at the end of the arrays, the discount is 0 when the game ends first
+	returns: np.array = np.zeros(len(indices), dtype=np.float32)
+	discounts: np.array = np.ones(len(indices), dtype=np.float32)
+	alive: np.array = np.ones(len(indices), dtype=np.bool_)
+	current: np.array = np.asarray(indices)
+	for _ in range(num_steps):
+		returns += discounts * rewards[current]
+		alive &= ~terminals[current]
+		discounts: np.array = np.where(alive, discounts * discount_factor, 0.0).astype(np.float32)
+		current: np.array = np.where(alive, (current + 1) % len(rewards), current)
+
+	return returns, discounts, current
+
+
+def masked_max(q_values: np.array, legal_masks: np.array) -> np.array:
+	"""Maximum q-value over the legal actions of each row, 0 for rows without legal actions."""
+	max_q_values: np.array = np.where(legal_masks, q_values, -np.inf).max(axis=1)
+	return np.where(legal_masks.any(axis=1), max_q_values, 0.0)
@@ -0,0 +1,71 @@
+from enum import Enum
+from typing import List, Tuple, Union
+
+from utils.types import Location
+
+
+class Bound(Enum):
+	EXACT = 0
+	LOWER = 1  # the score failed high, the real score is at least this high
+	UPPER = 2  # the score failed low, the real score is at most this high
+
+
+# (depth, bound, score, best location)
+Entry = Tuple[int, Bound, float, Union[Location, None]]
+
+
+class TranspositionTable:
+	def __init__(self, size: int = 2 ** 18) -> None:
+		# check arguments
+		assert size > 0 and size & (size - 1) == 0, f'Invalid size: size should be a power of 2, but got {size}'
+
+		self.size: int = size
+		self.mask: int = size - 1
+
+		# one slot per index, preallocated so the table never grows
+		self.keys: List[Union[int, None]] = [None] * size
+		self.depths: List[int] = [0] * size
+		self.bounds: List[Union[Bound, None]] = [None] * size
+		self.scores: List[float] = [0.0] * size
+		self.locations: List[Union[Location, None]] = [None] * size
+		self.generations: List[int] = [0] * size
+
+		# entries of earlier searches are always replaced
+		self.generation: int = 0
+
+		self.num_hits: int = 0
+		self.num_stores: int = 0
+
+	def __len__(self) -> int:
+		return self.size - self.keys.count(None)
+
+	def lookup(self, key: int) -> Union[Entry, None]:
+		index: int = key & self.mask
+		if self.keys[index] != key:
+			return None
+
+		self.num_hits += 1
+
+		return self.depths[index], self.bounds[index], self.scores[index], self.locations[index]
+
+	def store(self, key: int, depth: int, bound: Bound, score: float, location: Union[Location, None]) -> None:
+		index: int = key & self.mask
+		# replace by depth: keep the deeper search of a different position from the current search
+		if self.keys[index] not in (None, key) and self.generations[index] == self.generation and self.depths[index] > depth:
+			return
+
+		self.keys[index] = key
+		self.depths[index] = depth
+		self.bounds[index] = bound
+		self.scores[index] = score
+		self.locations[index] = location
+		self.generations[index] = self.generation
+		self.num_stores += 1
+
+	def new_search(self) -> None:
+		self.generation += 1
+
+	def clear(self) -> None:
+		self.keys: List[Union[int, None]] = [None] * self.size
+		self.num_hits: int = 0
+		self.num_stores: int = 0
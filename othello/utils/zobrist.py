@@ -0,0 +1,38 @@
+import random
+from typing import Dict, List
+
+import numpy as np
+
+from utils.color import Color
+
+
+class Zobrist:
+	# initialize static variables
+	_instances: Dict[int, 'Zobrist'] = {}
+
+	def __init__(self, board_size: int, seed: int = 0) -> None:
+		self.board_size: int = board_size
+
+		# fixed seed, so hashes are the same in every process
+		rng: random.Random = random.Random(seed)
+		# indexed by color value and location index i * board_size + j
+		self.disk_keys: List[List[int]] = [[rng.getrandbits(64) for _ in range(board_size ** 2)] for _ in range(2)]
+		# turning a disk around removes one color and adds the other
+		self.flip_keys: List[int] = [black ^ white for black, white in zip(*self.disk_keys)]
+		# indexed by color value of the player to move
+		self.color_keys: List[int] = [rng.getrandbits(64) for _ in range(2)]
+
+	@staticmethod
+	def get(board_size: int) -> 'Zobrist':
+		if board_size not in Zobrist._instances:
+			Zobrist._instances[board_size] = Zobrist(board_size)
+
+		return Zobrist._instances[board_size]
+
+	def hash(self, board: np.array) -> int:
+		hash_value: int = 0
+		for index, value in enumerate(board.flatten()):
+			if value == Color.BLACK.value or value == Color.WHITE.value:
+				hash_value ^= self.disk_keys[value][index]
+
+		return hash_value